@@ -0,0 +1,34 @@
+"""Added polygon geometry to geofences
+
+Revision ID: 3f9c2a7d41b8
+Revises: 97a3b6fbbfa6
+Create Date: 2026-10-18 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b8'
+down_revision: Union[str, None] = '97a3b6fbbfa6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('geofences', sa.Column('vertices', sa.LargeBinary(), nullable=True))
+    op.add_column('geofences', sa.Column('min_latitude', sa.Float(), nullable=True))
+    op.add_column('geofences', sa.Column('max_latitude', sa.Float(), nullable=True))
+    op.add_column('geofences', sa.Column('min_longitude', sa.Float(), nullable=True))
+    op.add_column('geofences', sa.Column('max_longitude', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('geofences', 'max_longitude')
+    op.drop_column('geofences', 'min_longitude')
+    op.drop_column('geofences', 'max_latitude')
+    op.drop_column('geofences', 'min_latitude')
+    op.drop_column('geofences', 'vertices')
@@ -0,0 +1,27 @@
+"""Record when attendance rows are written
+
+Revision ID: 7b3d9e14a2c6
+Revises: c61f0d8e2b57
+Create Date: 2026-10-19 10:14:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3d9e14a2c6'
+down_revision: Union[str, None] = 'c61f0d8e2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('attendancerecords', sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+    op.execute("UPDATE attendancerecords SET created_at = timestamp WHERE timestamp IS NOT NULL")
+
+
+def downgrade() -> None:
+    op.drop_column('attendancerecords', 'created_at')
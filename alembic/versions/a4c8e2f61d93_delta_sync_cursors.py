@@ -0,0 +1,31 @@
+"""Delta sync cursors for geofences and attendance
+
+Revision ID: a4c8e2f61d93
+Revises: f18c6b2d9e47
+Create Date: 2026-10-18 18:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f61d93'
+down_revision: Union[str, None] = 'f18c6b2d9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('geofences', sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+    op.execute("UPDATE geofences SET updated_at = time_created WHERE time_created IS NOT NULL")
+    op.create_index('ix_geofences_updated_at_id', 'geofences', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_attendancerecords_fence_code_id', 'attendancerecords', ['fence_code', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendancerecords_fence_code_id', table_name='attendancerecords')
+    op.drop_index('ix_geofences_updated_at_id', table_name='geofences')
+    op.drop_column('geofences', 'updated_at')
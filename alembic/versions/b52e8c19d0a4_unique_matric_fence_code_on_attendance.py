@@ -0,0 +1,34 @@
+"""Unique matric_fence_code on attendance records
+
+Revision ID: b52e8c19d0a4
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-18 11:40:05.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e8c19d0a4'
+down_revision: Union[str, None] = '3f9c2a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the earliest record of any check-in that slipped through twice
+    op.execute(
+        "DELETE newer FROM attendancerecords AS newer "
+        "JOIN attendancerecords AS older "
+        "ON newer.matric_fence_code = older.matric_fence_code AND newer.id > older.id"
+    )
+    op.create_unique_constraint(
+        'matric_fence_code', 'attendancerecords', ['matric_fence_code']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('matric_fence_code', 'attendancerecords', type_='unique')
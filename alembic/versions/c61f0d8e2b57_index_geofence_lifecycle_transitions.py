@@ -0,0 +1,26 @@
+"""Index geofence lifecycle transitions
+
+Revision ID: c61f0d8e2b57
+Revises: a4c8e2f61d93
+Create Date: 2026-10-18 19:10:44.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c61f0d8e2b57'
+down_revision: Union[str, None] = 'a4c8e2f61d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_geofences_status_start_time_end_time', 'geofences', ['status', 'start_time', 'end_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_geofences_status_start_time_end_time', table_name='geofences')
@@ -0,0 +1,34 @@
+"""Indexes for hot query shapes
+
+Revision ID: d7e41a90c3f5
+Revises: b52e8c19d0a4
+Create Date: 2026-10-18 14:02:37.884120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e41a90c3f5'
+down_revision: Union[str, None] = 'b52e8c19d0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_attendancerecords_fence_code_timestamp', 'attendancerecords', ['fence_code', 'timestamp'], unique=False)
+    op.create_index('ix_attendancerecords_user_matric_timestamp', 'attendancerecords', ['user_matric', 'timestamp'], unique=False)
+    op.create_index('ix_geofences_creator_matric_start_time', 'geofences', ['creator_matric', 'start_time'], unique=False)
+    op.create_index('ix_geofences_name_start_time', 'geofences', ['name', 'start_time'], unique=False)
+    op.create_index('ix_geofences_status_end_time', 'geofences', ['status', 'end_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_geofences_status_end_time', table_name='geofences')
+    op.drop_index('ix_geofences_name_start_time', table_name='geofences')
+    op.drop_index('ix_geofences_creator_matric_start_time', table_name='geofences')
+    op.drop_index('ix_attendancerecords_user_matric_timestamp', table_name='attendancerecords')
+    op.drop_index('ix_attendancerecords_fence_code_timestamp', table_name='attendancerecords')
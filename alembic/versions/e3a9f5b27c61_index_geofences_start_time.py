@@ -0,0 +1,26 @@
+"""Index geofences start_time for paginated listings
+
+Revision ID: e3a9f5b27c61
+Revises: d7e41a90c3f5
+Create Date: 2026-10-18 15:21:09.410562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9f5b27c61'
+down_revision: Union[str, None] = 'd7e41a90c3f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_geofences_start_time', 'geofences', ['start_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_geofences_start_time', table_name='geofences')
@@ -0,0 +1,35 @@
+"""Added geofence attendance counts
+
+Revision ID: f18c6b2d9e47
+Revises: e3a9f5b27c61
+Create Date: 2026-10-18 16:48:52.031976
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f18c6b2d9e47'
+down_revision: Union[str, None] = 'e3a9f5b27c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('geofenceattendancecounts',
+    sa.Column('fence_code', sa.String(length=15), nullable=False),
+    sa.Column('attendance_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['fence_code'], ['geofences.fence_code'], ),
+    sa.PrimaryKeyConstraint('fence_code')
+    )
+    op.execute(
+        "INSERT INTO geofenceattendancecounts (fence_code, attendance_count) "
+        "SELECT fence_code, COUNT(*) FROM attendancerecords GROUP BY fence_code"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('geofenceattendancecounts')
@@ -3,7 +3,12 @@ from fastapi.security import OAuth2PasswordRequestForm
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import Annotated
 
-from .sessions import SessionHandler, get_session_handler
+from .sessions import (
+    SessionHandler,
+    SessionStore,
+    get_session_handler,
+    get_session_store,
+)
 from .APIKeys import get_api_key
 from ..utils.config import get_app_settings
 
@@ -15,6 +20,7 @@ AuthRouter = APIRouter(prefix="/auth", tags=["auth"])
 password_request_form = Annotated[OAuth2PasswordRequestForm, Depends()]
 api_key_dependency = Annotated[str, Depends(get_api_key)]
 SessionHandlerDependency = Annotated[SessionHandler, Depends(get_session_handler)]
+SessionStoreDependency = Annotated[SessionStore, Depends(get_session_store)]
 settings = get_app_settings()
 
 bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -53,11 +59,11 @@ async def login(
 
 @AuthRouter.delete("/logout")
 async def logout(
-    request: Request, response: Response, session_handler: SessionHandlerDependency
+    request: Request, response: Response, session_store: SessionStoreDependency
 ) -> dict:
     """
     This function handles the logout process for a user. It retrieves the session token from the request cookies,
-    checks if it exists, and then deactivates the session using the SessionHandler.
+    checks if it exists, and then deactivates the session using the SessionStore.
 
     Parameters:
     - request (Request): The FastAPI Request object containing the cookies.
@@ -69,7 +75,7 @@ async def logout(
     if not session_token:
         raise HTTPException(status_code=401, detail="No session token provided.")
 
-    log_out_message = await session_handler.deactivate_session(session_token)
+    log_out_message = await session_store.deactivate_session(session_token)
 
     response.delete_cookie("session_token")
     return {"message": log_out_message}
@@ -77,14 +83,14 @@ async def logout(
 
 @AuthRouter.get("/get_user_by_token")
 async def get_user_by_session_token(
-    request: Request, session_handler: SessionHandlerDependency
+    request: Request, session_store: SessionStoreDependency
 ):
     session_token = request.cookies.get("session_token")
 
     if not session_token:
         raise HTTPException(status_code=401, detail="No session token provided")
 
-    user_data = await session_handler.get_user_by_session(session_token)
+    user_data = await session_store.get_user_by_session(session_token)
 
     if not user_data:
         raise HTTPException(status_code=401, detail="Session expired")
@@ -0,0 +1,274 @@
+import logging
+import time
+from typing import Annotated
+import uuid
+
+from fastapi import HTTPException, Depends
+from jose import JWTError, jwt
+from redis.asyncio import Redis
+
+from ...redis import get_redis_client
+from ...redis.SessionCache import (
+    SESSION_INVALIDATION_CHANNEL,
+    SESSION_TTL,
+    session_local_cache,
+)
+from ...redis.SessionRevocations import SessionRevocations, session_revocations
+from ...utils.config import get_app_settings
+from ...utils.TTLCache import TTLCache
+
+# Dependencies
+RedisClientDependency = Annotated[Redis, Depends(get_redis_client)]
+logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+SESSION_PREFIX = "session:"
+USER_SESSION_PREFIX = "user:"
+
+# The scripts below build the session key from the stored token, so they
+# assume a single Redis node rather than a cluster.
+
+# KEYS[1] user -> token; KEYS[2] new session
+# ARGV[1] session prefix, ARGV[2] new token, ARGV[3] TTL in seconds, then field/value pairs
+_CREATE_SESSION_SCRIPT = """
+local existing = redis.call('GET', KEYS[1])
+if existing and redis.call('EXISTS', ARGV[1] .. existing) == 1 then
+    return existing
+end
+redis.call('HSET', KEYS[2], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return ARGV[2]
+"""
+
+# KEYS[1] session; ARGV[1] token, ARGV[2] user prefix, ARGV[3] invalidation channel
+_DESTROY_SESSION_SCRIPT = """
+local user_matric = redis.call('HGET', KEYS[1], 'user_matric')
+if not user_matric then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+local user_key = ARGV[2] .. user_matric
+if redis.call('GET', user_key) == ARGV[1] then
+    redis.call('DEL', user_key)
+end
+redis.call('PUBLISH', ARGV[3], ARGV[1])
+return 1
+"""
+
+# KEYS[1] user -> token; ARGV[1] session prefix, ARGV[2] invalidation channel
+_END_USER_SESSION_SCRIPT = """
+local token = redis.call('GET', KEYS[1])
+if not token then
+    return false
+end
+redis.call('DEL', KEYS[1], ARGV[1] .. token)
+redis.call('PUBLISH', ARGV[2], token)
+return token
+"""
+
+
+def _is_signed_token(session_token: str) -> bool:
+    # Random session tokens are UUIDs, which never contain a dot
+    return session_token.count(".") == 2
+
+
+def _encode_session_token(user_matric: str, email: str, role: str) -> str:
+    issued_at = time.time()
+    claims = {
+        "sub": user_matric,
+        "email": email,
+        "role": role,
+        "jti": uuid.uuid4().hex,
+        "iat": issued_at,
+        "exp": issued_at + SESSION_TTL.total_seconds(),
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def _decode_session_token(session_token: str) -> dict | None:
+    try:
+        return jwt.decode(
+            session_token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+            options={"require_iat": True, "require_exp": True, "require_jti": True},
+        )
+    except JWTError:
+        return None
+
+
+class SessionStore:
+    """Sessions as kept in Redis. Needs no database, so validating a session
+    never touches the connection pool.
+
+    A session is a hash under `session:{token}`, alongside a `user:{matric}`
+    key pointing back at it. Both keys are created and removed together by a
+    single script call, so they cannot drift apart and each login or logout is
+    one round trip.
+
+    With `SIGNED_SESSION_TOKENS` on, new sessions are instead signed tokens
+    carrying the user's details, checked without any I/O against this worker's
+    copy of the revocation lists. Random tokens issued earlier keep working
+    until they expire.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        local_cache: TTLCache = session_local_cache,
+        revocations: SessionRevocations = session_revocations,
+        signed_tokens: bool = settings.SIGNED_SESSION_TOKENS,
+    ):
+        self.redis_client = redis_client
+        self.local_cache = local_cache
+        self.revocations = revocations
+        self.signed_tokens = signed_tokens
+
+    async def get_user_by_session(self, session_token: str) -> dict[str, str] | None:
+        """Retrieves the user information from the session token stored in the redis database.
+
+        Found sessions are kept in this worker's cache for a few seconds, so most
+        requests skip Redis entirely.
+        """
+        if self.signed_tokens and _is_signed_token(session_token):
+            return await self._get_user_by_signed_token(session_token)
+
+        user_data = self.local_cache.get(session_token)
+        if user_data is not None:
+            return dict(user_data)
+
+        session = await self.redis_client.hgetall(f"{SESSION_PREFIX}{session_token}")
+        if not session:
+            return None
+
+        user_data = {
+            "user_matric": session["user_matric"],
+            "email": session["email"],
+            "username": session["username"],
+            "role": session["role"],
+        }
+        self.local_cache.set(session_token, user_data)
+        return dict(user_data)
+
+    async def _get_user_by_signed_token(
+        self, session_token: str
+    ) -> dict[str, str] | None:
+        claims = _decode_session_token(session_token)
+        if claims is None:
+            return None
+        if await self.revocations.is_revoked(
+            self.redis_client, claims["jti"], claims["sub"], claims["iat"]
+        ):
+            return None
+        return {
+            "user_matric": claims["sub"],
+            "email": claims["email"],
+            "username": claims["sub"],
+            "role": claims["role"],
+        }
+
+    async def get_user_session_by_matric(self, user_matric: str) -> str:
+        """Used to get user session details by their matric.
+
+        Made possible with the reverse mapping using the user matric as the key.
+        """
+        existing_user_session = await self.redis_client.get(
+            f"{USER_SESSION_PREFIX}{user_matric}"
+        )
+        return existing_user_session
+
+    async def create_new_session(self, user_matric: str, email: str, role: str) -> str:
+        """Creates a new session for the user and stores it in the redis database.
+
+        If the user is already logged in, the token of the existing session is
+        returned instead.
+        """
+        # if settings.WANT_SINGLE_SIGNIN: #Flag to enable/disable single sign in
+        #     raise HTTPException(
+        #         status_code=400,
+        #         detail=f"Already logged in. Sign out of other devices before logging in again",
+        #     )
+        if self.signed_tokens:
+            # Nothing to store; signed tokens are never reused across logins
+            return _encode_session_token(user_matric, email, role)
+
+        session_token: str = str(uuid.uuid4())
+        user_data: dict = {
+            "user_matric": user_matric,
+            "email": email,
+            "username": user_matric,
+            "role": role,
+        }
+        fields = [item for pair in user_data.items() for item in pair]
+
+        create_session = self.redis_client.register_script(_CREATE_SESSION_SCRIPT)
+        return await create_session(
+            keys=[
+                f"{USER_SESSION_PREFIX}{user_matric}",
+                f"{SESSION_PREFIX}{session_token}",
+            ],
+            args=[
+                SESSION_PREFIX,
+                session_token,
+                int(SESSION_TTL.total_seconds()),
+                *fields,
+            ],
+        )
+
+    # Method for logging out a user
+    async def deactivate_session(self, session_token: str) -> str:
+        """Deactivatves a session by deleting it from the redis database"""
+        if self.signed_tokens and _is_signed_token(session_token):
+            return await self._revoke_signed_token(session_token)
+
+        destroy_session = self.redis_client.register_script(_DESTROY_SESSION_SCRIPT)
+        try:
+            destroyed = await destroy_session(
+                keys=[f"{SESSION_PREFIX}{session_token}"],
+                args=[session_token, USER_SESSION_PREFIX, SESSION_INVALIDATION_CHANNEL],
+            )
+        except Exception as e:
+            logger.error(e)
+            raise HTTPException(status_code=500, detail=f"Failed to deactivate session")
+
+        if not destroyed:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        self.local_cache.pop(session_token)
+        return "Logged out successfully"
+
+    async def _revoke_signed_token(self, session_token: str) -> str:
+        claims = _decode_session_token(session_token)
+        if claims is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        try:
+            await self.revocations.revoke_token(
+                self.redis_client, claims["jti"], claims["exp"]
+            )
+        except Exception as e:
+            logger.error(e)
+            raise HTTPException(status_code=500, detail=f"Failed to deactivate session")
+        return "Logged out successfully"
+
+    async def end_user_session(self, user_matric: str) -> str | None:
+        """Ends whatever session the user has open, on every worker. Returns the
+        ended session's token, if there was one.
+
+        Signed tokens issued to the user so far are revoked too.
+        """
+        if self.signed_tokens:
+            await self.revocations.end_user_sessions(
+                self.redis_client, user_matric, time.time()
+            )
+        end_session = self.redis_client.register_script(_END_USER_SESSION_SCRIPT)
+        session_token = await end_session(
+            keys=[f"{USER_SESSION_PREFIX}{user_matric}"],
+            args=[SESSION_PREFIX, SESSION_INVALIDATION_CHANNEL],
+        )
+        if session_token:
+            self.local_cache.pop(session_token)
+        return session_token
+
+
+def get_session_store(redis_client: RedisClientDependency) -> SessionStore:
+    return SessionStore(redis_client=redis_client)
@@ -1 +1,2 @@
-from .SessionHandler import SessionHandler, get_session_handler
\ No newline at end of file
+from .SessionStore import SessionStore, get_session_store
+from .SessionHandler import SessionHandler, get_session_handler
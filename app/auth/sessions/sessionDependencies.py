@@ -1,6 +1,6 @@
 from typing import Annotated
 from fastapi import Depends, Request, HTTPException
-from . import SessionHandler, get_session_handler
+from . import SessionStore, get_session_store
 
 
 def get_session_id(request: Request):
@@ -12,13 +12,14 @@ def get_session_id(request: Request):
 
 
 async def authenticate_user_by_session_token(
-    session_handler: Annotated[SessionHandler, Depends(get_session_handler)],
+    session_store: Annotated[SessionStore, Depends(get_session_store)],
     session_token: str = Depends(get_session_id),
 ):
+    """Redis only; a route gets a database session just if it asks for one."""
     if not session_token:
         raise HTTPException(status_code=401, detail="No session token provided")
 
-    user_data = await session_handler.get_user_by_session(session_token)
+    user_data = await session_store.get_user_by_session(session_token)
 
     return user_data
 
@@ -64,10 +64,13 @@ class DatabaseSessionManager:
             await session.close()
 
 
-sessionmanager = DatabaseSessionManager(DATABASE_URL, {"echo": settings.echo_sql})
+sessionmanager = DatabaseSessionManager(DATABASE_URL, {"echo": settings.ECHO_SQL})
 
 
 async def get_db_session():
-
+    """Request-scoped session. An AsyncSession only checks a connection out of the
+    pool on its first query, so a dependency that is resolved but never queried,
+    or a request that fails before reaching the database, costs no connection.
+    """
     async with sessionmanager.session() as session:
         yield session
@@ -1,4 +1,7 @@
+import asyncio
 import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -10,10 +13,79 @@ from .auth.APIKeys import get_api_key
 
 from .routers import *
 from .auth.AuthRouter import AuthRouter
+from .database import sessionmanager
+from .redis import (
+    AttendanceStream,
+    GeofenceCache,
+    StudentRecordsCache,
+    get_redis_client,
+    listen_for_attendance_events,
+    listen_for_geofence_index_events,
+    listen_for_session_invalidations,
+    refresh_session_revocations,
+)
+from .repositories import GeofenceRepository
+from .services import AttendanceFlusher, GeofenceLifecycleScheduler
+from .utils import get_app_settings
+from .utils.GeofenceIndex import get_geofence_index
+from .utils.PasswordHasher import get_password_hasher
 
 logger=logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+
+async def load_geofence_index():
+    """Fills the in-memory index used for check-ins without a fence code."""
+    try:
+        async with sessionmanager.session() as session:
+            snapshots = await GeofenceRepository(session).get_open_geofence_snapshots(
+                datetime.now(ZoneInfo("UTC"))
+            )
+        get_geofence_index().replace_all(snapshots)
+        logger.info(f"Loaded {len(snapshots)} geofences into the spatial index")
+    except Exception as e:
+        logger.error(f"Failed to load geofence index: {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start listening before loading so fences created in between are not missed
+    index_listener = asyncio.create_task(
+        listen_for_geofence_index_events(get_redis_client(), get_geofence_index())
+    )
+    await load_geofence_index()
+
+    background_tasks = [
+        index_listener,
+        asyncio.create_task(listen_for_attendance_events(get_redis_client())),
+        asyncio.create_task(listen_for_session_invalidations(get_redis_client())),
+        asyncio.create_task(
+            GeofenceLifecycleScheduler(
+                get_redis_client(), geofence_cache=GeofenceCache(get_redis_client())
+            ).run()
+        ),
+    ]
+    if settings.ATTENDANCE_WRITE_BEHIND:
+        flusher = AttendanceFlusher(
+            AttendanceStream(get_redis_client()),
+            records_cache=StudentRecordsCache(get_redis_client()),
+        )
+        background_tasks.append(asyncio.create_task(flusher.run()))
+    if settings.SIGNED_SESSION_TOKENS:
+        background_tasks.append(
+            asyncio.create_task(refresh_session_revocations(get_redis_client()))
+        )
+
+    yield
+
+    # Unflushed stream entries stay pending and are claimed by another worker
+    for task in background_tasks:
+        task.cancel()
+    get_password_hasher().close()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Ave Geofencing",
     description="A smart solution for student attendance",
     version="1.0.1",
@@ -76,6 +148,7 @@ app.include_router(AuthRouter)
 app.include_router(AdminRouter)
 app.include_router(StudentRouter)
 app.include_router(GeofenceRouter)
+app.include_router(AnalyticsRouter)
 
 if __name__ == "__main__":
     uvicorn.run(__name__ + ":app", host="0.0.0.0", port=8000, reload=True)
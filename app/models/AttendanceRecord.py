@@ -1,10 +1,13 @@
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from sqlalchemy import (
     TIMESTAMP,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
+    func,
 )
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from ..database import Base
@@ -12,6 +15,13 @@ from ..database import Base
 
 class AttendanceRecord(Base):
     __tablename__ = "attendancerecords"
+    __table_args__ = (
+        # A fence's register and a student's history, both read in time order
+        Index("ix_attendancerecords_fence_code_timestamp", "fence_code", "timestamp"),
+        Index("ix_attendancerecords_user_matric_timestamp", "user_matric", "timestamp"),
+        # Delta sync of a fence's register: check-ins after a given id
+        Index("ix_attendancerecords_fence_code_id", "fence_code", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_matric: Mapped[str] = mapped_column(
@@ -22,7 +32,14 @@ class AttendanceRecord(Base):
     )
     geofence_name: Mapped[str] = mapped_column(String(60))
     timestamp: Mapped[datetime] = mapped_column(DateTime)
-    matric_fence_code: Mapped[str] = mapped_column(String(60))
+    matric_fence_code: Mapped[str] = mapped_column(String(60), unique=True)
+    # When the row was written, which with write-behind can be well after the
+    # check-in's timestamp
+    created_at: Mapped[TIMESTAMP] = mapped_column(
+        TIMESTAMP(timezone=True),
+        default=lambda: datetime.now(tz=ZoneInfo("UTC")),
+        server_default=func.current_timestamp(),
+    )
 
     user = relationship("User", back_populates="attendances")
     geofence = relationship("Geofence", back_populates="student_attendances")
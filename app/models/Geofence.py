@@ -1,12 +1,42 @@
 from datetime import datetime
+from typing import Optional
 from zoneinfo import ZoneInfo
-from sqlalchemy import TIMESTAMP, ForeignKey, Integer, String, Float, DateTime, func
+from sqlalchemy import (
+    TIMESTAMP,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Float,
+    DateTime,
+    func,
+)
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from ..database import Base
 
 
 class Geofence(Base):
     __tablename__ = "geofences"
+    __table_args__ = (
+        # Newest-first listings, paginated on (start_time, id)
+        Index("ix_geofences_start_time", "start_time"),
+        Index("ix_geofences_creator_matric_start_time", "creator_matric", "start_time"),
+        # Course-and-day lookups; the day is a start_time range, never DATE()
+        Index("ix_geofences_name_start_time", "name", "start_time"),
+        # Open fences, loaded at startup to build the geofence index, and fences
+        # the lifecycle scheduler expires
+        Index("ix_geofences_status_end_time", "status", "end_time"),
+        # Scheduled fences due to be activated by the lifecycle scheduler
+        Index(
+            "ix_geofences_status_start_time_end_time",
+            "status",
+            "start_time",
+            "end_time",
+        ),
+        # Delta sync: fences created or changed after an (updated_at, id) cursor
+        Index("ix_geofences_updated_at_id", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     fence_code: Mapped[str] = mapped_column(String(15), unique=True)
@@ -15,6 +45,12 @@ class Geofence(Base):
     longitude: Mapped[float] = mapped_column(Float)
     radius: Mapped[float] = mapped_column(Float)
     fence_type: Mapped[str] = mapped_column(String(60))
+    # Packed (lat, lng) float64 pairs, only set for polygon fences
+    vertices: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    min_latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    min_longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     start_time: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True))
     end_time: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True))
     status: Mapped[str] = mapped_column(String(60))
@@ -24,6 +60,13 @@ class Geofence(Base):
     creator_matric: Mapped[str] = mapped_column(
         String(50), ForeignKey("users.user_matric")
     )
+    # Bumped by every ORM and Core UPDATE of the row
+    updated_at: Mapped[TIMESTAMP] = mapped_column(
+        TIMESTAMP(timezone=True),
+        default=lambda: datetime.now(tz=ZoneInfo("UTC")),
+        onupdate=lambda: datetime.now(tz=ZoneInfo("UTC")),
+        server_default=func.current_timestamp(),
+    )
 
     creator = relationship("User", back_populates="geofences")
     student_attendances = relationship("AttendanceRecord", back_populates="geofence")
@@ -0,0 +1,15 @@
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from ..database import Base
+
+
+class GeofenceAttendanceCount(Base):
+    """How many students have checked into a fence, kept up to date on every write
+    to attendancerecords so counting never scans the records themselves."""
+
+    __tablename__ = "geofenceattendancecounts"
+
+    fence_code: Mapped[str] = mapped_column(
+        String(15), ForeignKey("geofences.fence_code"), primary_key=True
+    )
+    attendance_count: Mapped[int] = mapped_column(Integer, default=0)
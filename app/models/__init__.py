@@ -1,4 +1,5 @@
 from .AttendanceRecord import AttendanceRecord
+from .GeofenceAttendanceCount import GeofenceAttendanceCount
 from .Geofence import Geofence
 from .User import User
 from .PasswordResetToken import PasswordResetToken
@@ -9,5 +10,6 @@ __all__ = [
     "User",
     "Geofence",
     "AttendanceRecord",
+    "GeofenceAttendanceCount",
     "PasswordResetToken",
 ]
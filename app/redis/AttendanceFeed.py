@@ -0,0 +1,84 @@
+import asyncio
+import json
+import logging
+
+from redis.asyncio import Redis
+
+from ..utils import get_app_settings
+
+logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+ATTENDANCE_FEED_PREFIX = "attendance:feed:"
+
+
+async def publish_attendance_event(redis_client: Redis, fence_code: str, event: dict):
+    """Announces an accepted check-in to whoever is watching the fence live."""
+    await redis_client.publish(
+        f"{ATTENDANCE_FEED_PREFIX}{fence_code}", json.dumps(event)
+    )
+
+
+class AttendanceFeedHub:
+    """Fans check-in events out to the live feeds open on this worker.
+
+    Each feed gets a bounded queue. A feed that falls behind loses events rather
+    than holding up the others; its client can catch up from get_attendances.
+    """
+
+    def __init__(self, queue_size: int = settings.ATTENDANCE_FEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._feeds: dict[str, set[asyncio.Queue]] = {}
+
+    def subscribe(self, fence_code: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._feeds.setdefault(fence_code, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, fence_code: str, queue: asyncio.Queue):
+        feeds = self._feeds.get(fence_code)
+        if feeds is None:
+            return
+        feeds.discard(queue)
+        if not feeds:
+            del self._feeds[fence_code]
+
+    def dispatch(self, fence_code: str, raw_event: str):
+        for queue in self._feeds.get(fence_code, ()):
+            try:
+                queue.put_nowait(raw_event)
+            except asyncio.QueueFull:
+                logger.warning(f"Live feed of {fence_code} is behind, dropping event")
+
+
+attendance_feed_hub = AttendanceFeedHub()
+
+
+def get_attendance_feed_hub() -> AttendanceFeedHub:
+    return attendance_feed_hub
+
+
+async def listen_for_attendance_events(
+    redis_client: Redis,
+    hub: AttendanceFeedHub = attendance_feed_hub,
+    retry_seconds: float = 5,
+):
+    """Relays check-ins published by any worker to the feeds open on this one.
+
+    One pattern subscription per worker, however many feeds are open. Runs until
+    cancelled, resubscribing if the Redis connection drops.
+    """
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.psubscribe(f"{ATTENDANCE_FEED_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    fence_code = message["channel"].removeprefix(ATTENDANCE_FEED_PREFIX)
+                    hub.dispatch(fence_code, message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Attendance feed listener lost Redis connection: {str(e)}")
+            await asyncio.sleep(retry_seconds)
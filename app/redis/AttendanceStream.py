@@ -0,0 +1,118 @@
+import os
+import socket
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import Depends
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from .RedisClient import get_redis_client
+
+RedisClientDependency = Annotated[Redis, Depends(get_redis_client)]
+
+ATTENDANCE_STREAM = "attendance:stream"
+ATTENDANCE_CONSUMER_GROUP = "attendance-flushers"
+# Entries that could not be written however often they were retried
+ATTENDANCE_DEAD_STREAM = "attendance:stream:dead"
+
+
+class AttendanceStream:
+    """Redis Stream holding accepted check-ins until they are written to MySQL.
+
+    Entries are read through a consumer group and only deleted once the batch
+    they belong to is committed, so a crashed flusher's entries stay pending and
+    are claimed by another worker (at-least-once delivery).
+    """
+
+    def __init__(self, redis_client: Redis, consumer_name: str | None = None):
+        self.redis_client = redis_client
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+
+    @staticmethod
+    def encode(
+        user_matric: str,
+        fence_code: str,
+        geofence_name: str,
+        matric_fence_code: str,
+        timestamp: datetime,
+    ) -> dict[str, str]:
+        return {
+            "user_matric": user_matric,
+            "fence_code": fence_code,
+            "geofence_name": geofence_name,
+            "matric_fence_code": matric_fence_code,
+            "timestamp": timestamp.isoformat(),
+        }
+
+    @staticmethod
+    def decode(fields: dict[str, str]) -> dict:
+        return {**fields, "timestamp": datetime.fromisoformat(fields["timestamp"])}
+
+    async def append(self, record: dict[str, str]) -> str:
+        return await self.redis_client.xadd(ATTENDANCE_STREAM, record)
+
+    async def ensure_group(self):
+        try:
+            await self.redis_client.xgroup_create(
+                ATTENDANCE_STREAM, ATTENDANCE_CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read_new(self, count: int, block_ms: int) -> list[tuple[str, dict]]:
+        response = await self.redis_client.xreadgroup(
+            ATTENDANCE_CONSUMER_GROUP,
+            self.consumer_name,
+            {ATTENDANCE_STREAM: ">"},
+            count=count,
+            block=block_ms,
+        )
+        return response[0][1] if response else []
+
+    async def claim_stale(self, count: int, min_idle_ms: int) -> list[tuple[str, dict]]:
+        """Takes over entries another consumer read but never acknowledged."""
+        _, entries, *_ = await self.redis_client.xautoclaim(
+            ATTENDANCE_STREAM,
+            ATTENDANCE_CONSUMER_GROUP,
+            self.consumer_name,
+            min_idle_time=min_idle_ms,
+            start_id="0-0",
+            count=count,
+        )
+        return [(entry_id, fields) for entry_id, fields in entries if fields]
+
+    async def ack(self, entry_ids: list[str]):
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(ATTENDANCE_STREAM, ATTENDANCE_CONSUMER_GROUP, *entry_ids)
+            pipe.xdel(ATTENDANCE_STREAM, *entry_ids)
+            await pipe.execute()
+
+    async def delivery_counts(self, entry_ids: list[str]) -> dict[str, int]:
+        """How many times each pending entry has been handed to a consumer."""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for entry_id in entry_ids:
+                pipe.xpending_range(
+                    ATTENDANCE_STREAM, ATTENDANCE_CONSUMER_GROUP, entry_id, entry_id, 1
+                )
+            responses = await pipe.execute()
+        return {
+            pending["message_id"]: pending["times_delivered"]
+            for response in responses
+            for pending in response
+        }
+
+    async def dead_letter(self, entries: list[tuple[str, dict]]):
+        """Moves entries to the dead stream, so they are no longer redelivered."""
+        entry_ids = [entry_id for entry_id, _ in entries]
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for entry_id, fields in entries:
+                pipe.xadd(ATTENDANCE_DEAD_STREAM, {**fields, "entry_id": entry_id})
+            pipe.xack(ATTENDANCE_STREAM, ATTENDANCE_CONSUMER_GROUP, *entry_ids)
+            pipe.xdel(ATTENDANCE_STREAM, *entry_ids)
+            await pipe.execute()
+
+
+def get_attendance_stream(redis_client: RedisClientDependency) -> AttendanceStream:
+    return AttendanceStream(redis_client=redis_client)
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from typing import Annotated, Iterable, Optional
+
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from .AttendanceStream import ATTENDANCE_STREAM
+from .RedisClient import get_redis_client
+
+RedisClientDependency = Annotated[Redis, Depends(get_redis_client)]
+
+ATTENDEES_PREFIX = "geofence:attendees:"
+# Always present in a loaded set, so an empty fence is told apart from a set
+# that expired or was never built
+LOADED_MARKER = "__loaded__"
+
+# Sets outlive their fence a little so late client retries are still rejected
+ATTENDEE_SET_GRACE = timedelta(hours=1)
+
+CLAIM_NOT_LOADED = -1
+CLAIM_DUPLICATE = 0
+CLAIM_ACCEPTED = 1
+
+# KEYS[1] attendee set, KEYS[2] (optional) attendance stream
+# ARGV[1] matric, ARGV[2] expiry as a unix timestamp, ARGV[3..] stream fields
+_CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('EXPIREAT', KEYS[1], ARGV[2])
+if #KEYS > 1 then
+    redis.call('XADD', KEYS[2], '*', unpack(ARGV, 3))
+end
+return 1
+"""
+
+# Members per SADD when loading; unpack() fails on a few thousand values
+LOAD_CHUNK_SIZE = 1000
+
+# KEYS[1] attendee set; ARGV[1] expiry as a unix timestamp, ARGV[2] chunk size,
+# ARGV[3..] members
+_LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+local chunk_size = tonumber(ARGV[2])
+for first = 3, #ARGV, chunk_size do
+    local last = math.min(first + chunk_size - 1, #ARGV)
+    redis.call('SADD', KEYS[1], unpack(ARGV, first, last))
+end
+redis.call('EXPIREAT', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class AttendeeSetStore:
+    """Per-fence Redis sets of the matrics that have checked in.
+
+    Claiming a seat is one atomic script call, which answers "already checked
+    in?" without touching MySQL. In write-behind mode the same call also queues
+    the record on the attendance stream, so the two can never disagree.
+    """
+
+    def __init__(self, redis_client: Redis):
+        self.redis_client = redis_client
+        self._claim = redis_client.register_script(_CLAIM_SCRIPT)
+        self._load = redis_client.register_script(_LOAD_SCRIPT)
+
+    @staticmethod
+    def key(fence_code: str) -> str:
+        return f"{ATTENDEES_PREFIX}{fence_code}"
+
+    async def claim(
+        self,
+        fence_code: str,
+        user_matric: str,
+        fence_end_time: datetime,
+        stream_record: Optional[dict[str, str]] = None,
+    ) -> int:
+        """Returns CLAIM_ACCEPTED, CLAIM_DUPLICATE or CLAIM_NOT_LOADED."""
+        keys = [self.key(fence_code)]
+        args = [user_matric, self._expire_at(fence_end_time)]
+        if stream_record is not None:
+            keys.append(ATTENDANCE_STREAM)
+            for field, value in stream_record.items():
+                args.extend((field, value))
+
+        return int(await self._claim(keys=keys, args=args))
+
+    async def load(
+        self, fence_code: str, user_matrics: Iterable[str], fence_end_time: datetime
+    ):
+        """Rebuilds a fence's set from MySQL, unless another worker beat us to it."""
+        await self._load(
+            keys=[self.key(fence_code)],
+            args=[
+                self._expire_at(fence_end_time),
+                LOAD_CHUNK_SIZE,
+                LOADED_MARKER,
+                *user_matrics,
+            ],
+        )
+
+    async def count(self, fence_code: str) -> Optional[int]:
+        """Students checked in so far, or None if the set is not loaded."""
+        size = await self.redis_client.scard(self.key(fence_code))
+        if size == 0:
+            return None
+        return size - 1  # the loaded marker
+
+    async def release(self, fence_code: str, user_matric: str):
+        """Undoes a claim whose database write failed."""
+        await self.redis_client.srem(self.key(fence_code), user_matric)
+
+    @staticmethod
+    def _expire_at(fence_end_time: datetime) -> int:
+        return int((fence_end_time + ATTENDEE_SET_GRACE).timestamp())
+
+
+def get_attendee_set_store(redis_client: RedisClientDependency) -> AttendeeSetStore:
+    return AttendeeSetStore(redis_client=redis_client)
@@ -0,0 +1,59 @@
+import hashlib
+import json
+from typing import Annotated, Optional
+
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from .RedisClient import get_redis_client
+from ..utils import get_app_settings
+
+settings = get_app_settings()
+
+RedisClientDependency = Annotated[Redis, Depends(get_redis_client)]
+
+COURSE_ANALYTICS_PREFIX = "analytics:course:"
+
+
+class CourseAnalyticsCache:
+    """Who attended which session of a course, as last read from MySQL.
+
+    The state is `{"watermark": <highest attendance id read>, "attended":
+    {fence_code: [user_matric, ...]}}`. Readers fold in only the check-ins
+    above the watermark and write the merged state back, so it is never
+    rebuilt from scratch while it is in use.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        ttl_seconds: int = settings.COURSE_ANALYTICS_CACHE_TTL_SECONDS,
+    ):
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(creator_matric: str, course_title: str, start, end) -> str:
+        scope = json.dumps([creator_matric, course_title, start, end], default=str)
+        return f"{COURSE_ANALYTICS_PREFIX}{hashlib.sha1(scope.encode()).hexdigest()}"
+
+    async def get(
+        self, creator_matric: str, course_title: str, start, end
+    ) -> Optional[dict]:
+        raw = await self.redis_client.get(
+            self._key(creator_matric, course_title, start, end)
+        )
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, creator_matric: str, course_title: str, start, end, state):
+        await self.redis_client.set(
+            self._key(creator_matric, course_title, start, end),
+            json.dumps(state),
+            ex=self.ttl_seconds,
+        )
+
+
+def get_course_analytics_cache(
+    redis_client: RedisClientDependency,
+) -> CourseAnalyticsCache:
+    return CourseAnalyticsCache(redis_client=redis_client)
@@ -0,0 +1,121 @@
+import logging
+from datetime import datetime
+from typing import Annotated
+from zoneinfo import ZoneInfo
+
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from .RedisClient import get_redis_client
+from ..schemas import GeofenceSnapshot
+from ..utils import get_app_settings
+from ..utils.TTLCache import TTLCache
+
+logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+RedisClientDependency = Annotated[Redis, Depends(get_redis_client)]
+
+GEOFENCE_CACHE_PREFIX = "geofence:snapshot:"
+GEOFENCE_VERSION_PREFIX = "geofence:version:"
+# Outlives any read that could still be in flight when the fence changes
+GEOFENCE_VERSION_TTL_SECONDS = 3600
+
+# KEYS[1] snapshot, KEYS[2] version; ARGV[1] version read before the database,
+# ARGV[2] snapshot, ARGV[3] TTL in seconds
+_SET_IF_UNCHANGED_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# Per-worker layer in front of Redis. Entries are dropped by the geofence index
+# listener whenever any worker creates or deactivates a fence, and expire after a
+# short TTL in case an event is missed.
+geofence_local_cache = TTLCache(
+    maxsize=settings.GEOFENCE_CACHE_LOCAL_MAXSIZE,
+    ttl_seconds=settings.GEOFENCE_CACHE_LOCAL_TTL_SECONDS,
+)
+
+
+class GeofenceCache:
+    """Read-through cache of geofence snapshots keyed by fence code.
+
+    Snapshots live in Redis until the fence's end_time, with a small in-process
+    LRU in front so repeated check-ins on a worker skip the network entirely.
+
+    Every invalidation bumps the fence's version. A snapshot read from the
+    database is only written back if the version is still the one seen before
+    the read, so a lookup racing a status change cannot cache the old status.
+    """
+
+    def __init__(
+        self, redis_client: Redis, local_cache: TTLCache = geofence_local_cache
+    ):
+        self.redis_client = redis_client
+        self.local_cache = local_cache
+        self._set_if_unchanged = redis_client.register_script(_SET_IF_UNCHANGED_SCRIPT)
+
+    async def get(self, fence_code: str) -> GeofenceSnapshot | None:
+        snapshot = self.local_cache.get(fence_code)
+        if snapshot is not None:
+            return snapshot
+
+        raw = await self.redis_client.get(f"{GEOFENCE_CACHE_PREFIX}{fence_code}")
+        if raw is None:
+            return None
+
+        snapshot = GeofenceSnapshot.from_json(raw)
+        self.local_cache.set(fence_code, snapshot, self._seconds_left(snapshot))
+        return snapshot
+
+    async def version(self, fence_code: str) -> str:
+        """To be read before loading the fence from the database, and passed
+        back to `set`."""
+        version = await self.redis_client.get(f"{GEOFENCE_VERSION_PREFIX}{fence_code}")
+        return version or "0"
+
+    async def set(self, snapshot: GeofenceSnapshot, version: str) -> bool:
+        """Caches the snapshot unless the fence was invalidated since `version`
+        was read."""
+        ttl = self._seconds_left(snapshot)
+        if ttl <= 0:
+            return False
+
+        stored = await self._set_if_unchanged(
+            keys=[
+                f"{GEOFENCE_CACHE_PREFIX}{snapshot.fence_code}",
+                f"{GEOFENCE_VERSION_PREFIX}{snapshot.fence_code}",
+            ],
+            args=[version, snapshot.to_json(), int(ttl) + 1],
+        )
+        if not stored:
+            return False
+        self.local_cache.set(snapshot.fence_code, snapshot, ttl)
+        return True
+
+    async def invalidate(self, fence_code: str):
+        await self.invalidate_many([fence_code])
+
+    async def invalidate_many(self, fence_codes: list[str]):
+        for fence_code in fence_codes:
+            self.local_cache.pop(fence_code)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for fence_code in fence_codes:
+                pipe.delete(f"{GEOFENCE_CACHE_PREFIX}{fence_code}")
+                pipe.incr(f"{GEOFENCE_VERSION_PREFIX}{fence_code}")
+                pipe.expire(
+                    f"{GEOFENCE_VERSION_PREFIX}{fence_code}",
+                    GEOFENCE_VERSION_TTL_SECONDS,
+                )
+            await pipe.execute()
+
+    @staticmethod
+    def _seconds_left(snapshot: GeofenceSnapshot) -> float:
+        return (snapshot.end_time - datetime.now(ZoneInfo("UTC"))).total_seconds()
+
+
+def get_geofence_cache(redis_client: RedisClientDependency) -> GeofenceCache:
+    return GeofenceCache(redis_client=redis_client)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import logging
+
+from redis.asyncio import Redis
+
+from .GeofenceCache import geofence_local_cache
+from ..schemas import GeofenceSnapshot
+from ..utils.GeofenceIndex import GeofenceGridIndex
+from ..utils.TTLCache import TTLCache
+
+logger = logging.getLogger("uvicorn")
+
+GEOFENCE_INDEX_CHANNEL = "geofence:index"
+
+
+async def publish_geofence_upsert(redis_client: Redis, snapshot: GeofenceSnapshot):
+    """Tells every worker to add or refresh a fence in its in-memory index."""
+    await redis_client.publish(
+        GEOFENCE_INDEX_CHANNEL,
+        json.dumps({"op": "upsert", "geofence": snapshot.to_json()}),
+    )
+
+
+async def publish_geofence_upserts(
+    redis_client: Redis, snapshots: list[GeofenceSnapshot]
+):
+    """`publish_geofence_upsert` for many fences in one round trip."""
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for snapshot in snapshots:
+            pipe.publish(
+                GEOFENCE_INDEX_CHANNEL,
+                json.dumps({"op": "upsert", "geofence": snapshot.to_json()}),
+            )
+        await pipe.execute()
+
+
+async def publish_geofence_removal(redis_client: Redis, fence_code: str):
+    """Tells every worker to drop a fence from its in-memory index."""
+    await redis_client.publish(
+        GEOFENCE_INDEX_CHANNEL, json.dumps({"op": "remove", "fence_code": fence_code})
+    )
+
+
+async def publish_geofence_removals(redis_client: Redis, fence_codes: list[str]):
+    """`publish_geofence_removal` for many fences in one round trip."""
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for fence_code in fence_codes:
+            pipe.publish(
+                GEOFENCE_INDEX_CHANNEL,
+                json.dumps({"op": "remove", "fence_code": fence_code}),
+            )
+        await pipe.execute()
+
+
+def apply_geofence_index_event(
+    index: GeofenceGridIndex, raw_message: str, local_cache: TTLCache = None
+):
+    event = json.loads(raw_message)
+    if event["op"] == "upsert":
+        snapshot = GeofenceSnapshot.from_json(event["geofence"])
+        index.upsert(snapshot)
+        fence_code = snapshot.fence_code
+    elif event["op"] == "remove":
+        index.remove(event["fence_code"])
+        fence_code = event["fence_code"]
+    else:
+        return
+
+    if local_cache is not None:
+        local_cache.pop(fence_code)
+
+
+async def listen_for_geofence_index_events(
+    redis_client: Redis,
+    index: GeofenceGridIndex,
+    local_cache: TTLCache = geofence_local_cache,
+    retry_seconds: float = 5,
+):
+    """Keeps this worker's index in step with fences created or deactivated elsewhere.
+
+    The same events evict the fence from this worker's local snapshot cache. Runs
+    until cancelled, resubscribing if the Redis connection drops.
+    """
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(GEOFENCE_INDEX_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        apply_geofence_index_event(
+                            index, message["data"], local_cache
+                        )
+                    except Exception as e:
+                        logger.error(f"Ignoring bad geofence index event: {str(e)}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Geofence index listener lost Redis connection: {str(e)}")
+            await asyncio.sleep(retry_seconds)
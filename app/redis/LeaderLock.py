@@ -0,0 +1,54 @@
+import uuid
+
+from redis.asyncio import Redis
+
+LEADER_LOCK_PREFIX = "leader:"
+
+# KEYS[1] lock; ARGV[1] this instance's token, ARGV[2] lease in milliseconds
+_HOLD_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if holder then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+# KEYS[1] lock; ARGV[1] this instance's token
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLock:
+    """Elects one instance, across workers and nodes, to run a periodic job.
+
+    Each instance calls `hold()` every round. The current leader's lease is
+    extended and anyone else is turned away; once a leader stops renewing, its
+    lease lapses and the next caller takes over. Checking and extending are a
+    single script call, so a lease can never be extended by an instance that
+    lost it.
+    """
+
+    def __init__(self, redis_client: Redis, name: str, lease_ms: int):
+        self.redis_client = redis_client
+        self.key = f"{LEADER_LOCK_PREFIX}{name}"
+        self.lease_ms = lease_ms
+        self.token = uuid.uuid4().hex
+        self._hold = redis_client.register_script(_HOLD_SCRIPT)
+        self._release = redis_client.register_script(_RELEASE_SCRIPT)
+
+    async def hold(self) -> bool:
+        """Takes or renews leadership; False if another instance holds it."""
+        return bool(await self._hold(keys=[self.key], args=[self.token, self.lease_ms]))
+
+    async def release(self):
+        """Steps down so another instance can take over without waiting."""
+        await self._release(keys=[self.key], args=[self.token])
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import timedelta
+import logging
+
+from redis.asyncio import Redis
+
+from ..utils import get_app_settings
+from ..utils.TTLCache import TTLCache
+
+logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+SESSION_INVALIDATION_CHANNEL = "session:invalidate"
+SESSION_TTL = timedelta(days=1)
+
+# Per-worker cache of session token -> user data, so most requests authenticate
+# without a Redis round trip. Logouts and password changes are broadcast to
+# every worker; the short TTL bounds how long a missed broadcast can matter.
+session_local_cache = TTLCache(
+    maxsize=settings.SESSION_CACHE_LOCAL_MAXSIZE,
+    ttl_seconds=settings.SESSION_CACHE_LOCAL_TTL_SECONDS,
+)
+
+
+async def publish_session_invalidation(
+    redis_client: Redis,
+    session_token: str,
+    local_cache: TTLCache = session_local_cache,
+):
+    """Drops a session from this worker's cache at once and tells the others."""
+    local_cache.pop(session_token)
+    await redis_client.publish(SESSION_INVALIDATION_CHANNEL, session_token)
+
+
+async def listen_for_session_invalidations(
+    redis_client: Redis,
+    local_cache: TTLCache = session_local_cache,
+    retry_seconds: float = 5,
+):
+    """Evicts sessions ended on other workers. Runs until cancelled, resubscribing
+    if the Redis connection drops."""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(SESSION_INVALIDATION_CHANNEL)
+                # Anything broadcast while disconnected was missed
+                local_cache.clear()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    local_cache.pop(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(
+                f"Session invalidation listener lost Redis connection: {str(e)}"
+            )
+            await asyncio.sleep(retry_seconds)
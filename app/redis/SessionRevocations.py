@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+
+from redis.asyncio import Redis
+
+from ..utils import get_app_settings
+from .SessionCache import SESSION_TTL
+
+logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+# Logged-out token ids, scored by when the token would have expired anyway
+REVOKED_SESSIONS_KEY = "session:revoked"
+# User matrics, scored by when all their sessions were ended
+USER_SESSION_EPOCHS_KEY = "session:epochs"
+
+
+class SessionRevocations:
+    """This worker's copy of the revocation lists for signed session tokens.
+
+    A token is revoked if its id was logged out, or if it was issued before its
+    user's sessions were last ended (e.g. by a password change). Entries are
+    dropped once no token they could match is still live, so both lists stay
+    small enough to copy whole on every refresh.
+
+    Checks are answered from memory while the copy is fresh. If refreshing has
+    stalled, they go to Redis instead, so a revocation is never missed for
+    longer than a few refresh intervals.
+    """
+
+    def __init__(
+        self,
+        token_ttl_seconds: float = SESSION_TTL.total_seconds(),
+        max_age_seconds: float = settings.SESSION_REVOCATION_REFRESH_SECONDS * 3,
+    ):
+        self.token_ttl_seconds = token_ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.revoked: set[str] = set()
+        self.epochs: dict[str, float] = {}
+        self.refreshed_at: float | None = None
+
+    def is_fresh(self) -> bool:
+        return (
+            self.refreshed_at is not None
+            and time.monotonic() - self.refreshed_at <= self.max_age_seconds
+        )
+
+    async def is_revoked(
+        self, redis_client: Redis, token_id: str, user_matric: str, issued_at: float
+    ) -> bool:
+        if self.is_fresh():
+            revoked = token_id in self.revoked
+            epoch = self.epochs.get(user_matric)
+        else:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zscore(REVOKED_SESSIONS_KEY, token_id)
+                pipe.zscore(USER_SESSION_EPOCHS_KEY, user_matric)
+                revoked_score, epoch = await pipe.execute()
+            revoked = revoked_score is not None
+        return revoked or (epoch is not None and issued_at <= epoch)
+
+    async def revoke_token(self, redis_client: Redis, token_id: str, expires_at: float):
+        await redis_client.zadd(REVOKED_SESSIONS_KEY, {token_id: expires_at})
+        self.revoked.add(token_id)
+
+    async def end_user_sessions(
+        self, redis_client: Redis, user_matric: str, ended_at: float
+    ):
+        await redis_client.zadd(USER_SESSION_EPOCHS_KEY, {user_matric: ended_at})
+        self.epochs[user_matric] = ended_at
+
+    async def refresh(self, redis_client: Redis):
+        now = time.time()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(REVOKED_SESSIONS_KEY, "-inf", now)
+            pipe.zremrangebyscore(
+                USER_SESSION_EPOCHS_KEY, "-inf", now - self.token_ttl_seconds
+            )
+            pipe.zrange(REVOKED_SESSIONS_KEY, 0, -1)
+            pipe.zrange(USER_SESSION_EPOCHS_KEY, 0, -1, withscores=True)
+            _, _, revoked, epochs = await pipe.execute()
+        self.revoked = set(revoked)
+        self.epochs = dict(epochs)
+        self.refreshed_at = time.monotonic()
+
+
+session_revocations = SessionRevocations()
+
+
+def get_session_revocations() -> SessionRevocations:
+    return session_revocations
+
+
+async def refresh_session_revocations(
+    redis_client: Redis,
+    revocations: SessionRevocations = session_revocations,
+    interval_seconds: float = settings.SESSION_REVOCATION_REFRESH_SECONDS,
+):
+    """Keeps this worker's revocation lists current. Runs until cancelled."""
+    while True:
+        try:
+            await revocations.refresh(redis_client)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to refresh session revocations: {str(e)}")
+        await asyncio.sleep(interval_seconds)
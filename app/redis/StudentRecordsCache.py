@@ -0,0 +1,67 @@
+import json
+from typing import Annotated, Iterable, Optional
+
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from .RedisClient import get_redis_client
+from ..utils import get_app_settings
+
+settings = get_app_settings()
+
+RedisClientDependency = Annotated[Redis, Depends(get_redis_client)]
+
+STUDENT_RECORDS_PREFIX = "student:records:"
+
+
+class StudentRecordsCache:
+    """Cached pages of a student's attendance history.
+
+    Each student has a version counter, bumped once their new check-ins are
+    readable from MySQL. Pages are filed in a hash under the version current when
+    they were read, so a bump retires every cached page at once, and a page read
+    just before a check-in committed can never be served after it. Retired
+    hashes simply expire.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        ttl_seconds: int = settings.STUDENT_RECORDS_CACHE_TTL_SECONDS,
+    ):
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _version_key(user_matric: str) -> str:
+        return f"{STUDENT_RECORDS_PREFIX}{user_matric}:version"
+
+    @staticmethod
+    def _pages_key(user_matric: str, version: str) -> str:
+        return f"{STUDENT_RECORDS_PREFIX}{user_matric}:v{version}"
+
+    async def version(self, user_matric: str) -> str:
+        return await self.redis_client.get(self._version_key(user_matric)) or "0"
+
+    async def get(self, user_matric: str, version: str, query: str) -> Optional[dict]:
+        raw = await self.redis_client.hget(self._pages_key(user_matric, version), query)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, user_matric: str, version: str, query: str, page: dict):
+        key = self._pages_key(user_matric, version)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, query, json.dumps(page))
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def invalidate(self, user_matrics: Iterable[str]):
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for user_matric in user_matrics:
+                pipe.incr(self._version_key(user_matric))
+            await pipe.execute()
+
+
+def get_student_records_cache(
+    redis_client: RedisClientDependency,
+) -> StudentRecordsCache:
+    return StudentRecordsCache(redis_client=redis_client)
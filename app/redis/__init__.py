@@ -1 +1,29 @@
 from .RedisClient import RedisClient, get_redis_client
+from .GeofenceCache import GeofenceCache, get_geofence_cache
+from .AttendanceStream import AttendanceStream, get_attendance_stream
+from .AttendeeSets import AttendeeSetStore, get_attendee_set_store
+from .StudentRecordsCache import StudentRecordsCache, get_student_records_cache
+from .GeofenceIndexEvents import (
+    publish_geofence_upsert,
+    publish_geofence_upserts,
+    publish_geofence_removal,
+    publish_geofence_removals,
+    listen_for_geofence_index_events,
+)
+from .CourseAnalyticsCache import CourseAnalyticsCache, get_course_analytics_cache
+from .LeaderLock import LeaderLock
+from .SessionCache import (
+    publish_session_invalidation,
+    listen_for_session_invalidations,
+)
+from .SessionRevocations import (
+    SessionRevocations,
+    get_session_revocations,
+    refresh_session_revocations,
+)
+from .AttendanceFeed import (
+    AttendanceFeedHub,
+    get_attendance_feed_hub,
+    publish_attendance_event,
+    listen_for_attendance_events,
+)
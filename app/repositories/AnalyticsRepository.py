@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import Annotated
+
+from ..database import get_db_session
+from ..models import AttendanceRecord, Geofence, GeofenceAttendanceCount
+
+from fastapi import Depends
+from sqlalchemy import and_, func, tuple_
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DatabaseDependency = Annotated[AsyncSession, Depends(get_db_session)]
+
+
+def _held_between(start: datetime, end: datetime):
+    """Sessions that started within [start, end), i.e. took place in the term."""
+    return and_(Geofence.start_time >= start, Geofence.start_time < end)
+
+
+class AnalyticsRepository:
+    """Set-based attendance aggregates. Every method is a single SELECT that
+    returns plain rows; nothing is loaded into ORM objects."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_course_sessions(
+        self, creator_matric: str, course_title: str, start: datetime, end: datetime
+    ):
+        """The course's sessions in [start, end), oldest first, with head counts."""
+        stmt = (
+            select(
+                Geofence.fence_code,
+                Geofence.start_time,
+                func.coalesce(GeofenceAttendanceCount.attendance_count, 0).label(
+                    "attendance_count"
+                ),
+            )
+            .outerjoin(
+                GeofenceAttendanceCount,
+                GeofenceAttendanceCount.fence_code == Geofence.fence_code,
+            )
+            .filter(
+                Geofence.name == course_title,
+                Geofence.creator_matric == creator_matric,
+                _held_between(start, end),
+            )
+            .order_by(Geofence.start_time, Geofence.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_session_attendees(
+        self, fence_codes: list[str], after_id: int | None = None
+    ):
+        """(id, user_matric, fence_code) of every check-in into the given sessions,
+        or only those with an id above `after_id`."""
+        stmt = select(
+            AttendanceRecord.id,
+            AttendanceRecord.user_matric,
+            AttendanceRecord.fence_code,
+        ).filter(AttendanceRecord.fence_code.in_(fence_codes))
+        if after_id is not None:
+            stmt = stmt.filter(AttendanceRecord.id > after_id)
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_student_attended_counts(
+        self, user_matric: str, start: datetime, end: datetime
+    ):
+        """(lecturer, course, sessions attended) for each course the student
+        checked into. A course is a title under one lecturer, as in
+        `get_course_sessions`."""
+        stmt = (
+            select(
+                Geofence.creator_matric, Geofence.name, func.count().label("attended")
+            )
+            .select_from(AttendanceRecord)
+            .join(Geofence, Geofence.fence_code == AttendanceRecord.fence_code)
+            .filter(
+                AttendanceRecord.user_matric == user_matric, _held_between(start, end)
+            )
+            .group_by(Geofence.creator_matric, Geofence.name)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_session_counts(
+        self, courses: list[tuple[str, str]], start: datetime, end: datetime
+    ):
+        """(lecturer, course, sessions held) for each of the given
+        (lecturer, course) pairs."""
+        stmt = (
+            select(
+                Geofence.creator_matric, Geofence.name, func.count().label("sessions")
+            )
+            .filter(
+                tuple_(Geofence.creator_matric, Geofence.name).in_(courses),
+                _held_between(start, end),
+            )
+            .group_by(Geofence.creator_matric, Geofence.name)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+
+def get_analytics_repository(db_session: DatabaseDependency) -> AnalyticsRepository:
+    return AnalyticsRepository(session=db_session)
@@ -1,19 +1,91 @@
-from datetime import datetime
-from typing import Annotated
+from datetime import date, datetime, time, timedelta
+from typing import Annotated, AsyncIterator
 from zoneinfo import ZoneInfo
 
 from ..database import get_db_session
-from ..models import Geofence, AttendanceRecord
-from ..schemas import AttendanceRecordModel, GeofenceCreateModel
+from ..models import Geofence, AttendanceRecord, GeofenceAttendanceCount, User
+from ..schemas import GeofenceCreateModel, GeofenceShapeModel, GeofenceSnapshot
 
 from fastapi import Depends
-from sqlalchemy import and_, func
+from sqlalchemy import Select, and_, func, insert, or_, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 DatabaseDependency = Annotated[AsyncSession, Depends(get_db_session)]
 
+GEOFENCE_SNAPSHOT_COLUMNS = [
+    getattr(Geofence, field) for field in GeofenceSnapshot._fields
+]
+
+
+def _day_range(date: datetime) -> tuple[datetime, datetime]:
+    """The half-open [midnight, next midnight) range covering `date`'s calendar day.
+
+    Filtering on a range instead of DATE(column) lets the database seek an index.
+    """
+    day_start = datetime.combine(date.date(), time.min)
+    return day_start, day_start + timedelta(days=1)
+
+
+def _initial_status(start_time_utc, end_time_utc, NOW) -> str:
+    if NOW < start_time_utc:
+        return "scheduled"
+    return "active" if start_time_utc <= NOW < end_time_utc else "inactive"
+
+
+def _course_day_filter(course_title: str, date: datetime):
+    day_start, day_end = _day_range(date)
+    return and_(
+        Geofence.name == course_title,
+        Geofence.start_time >= day_start,
+        Geofence.start_time < day_end,
+    )
+
+
+def _insert_new_attendance(dialect_name: str):
+    """An attendance INSERT that skips rows already recorded for the student.
+
+    Unlike INSERT IGNORE, only the unique matric_fence_code collision is skipped;
+    foreign key violations and truncation still fail the statement.
+    """
+    if dialect_name == "mysql":
+        stmt = mysql.insert(AttendanceRecord)
+        return stmt.on_duplicate_key_update(id=AttendanceRecord.id)
+    return sqlite.insert(AttendanceRecord).on_conflict_do_nothing(
+        index_elements=["matric_fence_code"]
+    )
+
+
+def _is_duplicate_attendance(error: IntegrityError) -> bool:
+    # MySQL reports any duplicate key as 1062; SQLite names the column
+    code = error.orig.args[0] if error.orig.args else None
+    return code == 1062 or "attendancerecords.matric_fence_code" in str(error.orig)
+
+
+def _on_duplicate_fence(dialect_name: str, stmt, attendance_count):
+    if dialect_name == "mysql":
+        return stmt.on_duplicate_key_update(attendance_count=attendance_count)
+    return stmt.on_conflict_do_update(
+        index_elements=["fence_code"], set_={"attendance_count": attendance_count}
+    )
+
+
+def _recount_attendance(dialect_name: str, fence_codes: set[str] | Select):
+    dialect_insert = mysql.insert if dialect_name == "mysql" else sqlite.insert
+    counts = (
+        select(AttendanceRecord.fence_code, func.count())
+        .filter(AttendanceRecord.fence_code.in_(fence_codes))
+        .group_by(AttendanceRecord.fence_code)
+    )
+    stmt = dialect_insert(GeofenceAttendanceCount).from_select(
+        ["fence_code", "attendance_count"], counts
+    )
+    incoming = stmt.inserted if dialect_name == "mysql" else stmt.excluded
+    return _on_duplicate_fence(dialect_name, stmt, incoming.attendance_count)
+
 
 class GeofenceRepository:
     def __init__(self, session: AsyncSession):
@@ -27,22 +99,17 @@ class GeofenceRepository:
         start_time_utc,
         end_time_utc,
         NOW,
+        geometry: dict,
     ):
         new_geofence = Geofence(
             fence_code=fence_code,
             name=geofence.name,
             creator_matric=creator_matric,
-            latitude=geofence.latitude,
-            longitude=geofence.longitude,
-            radius=geofence.radius,
             fence_type=geofence.fence_type,
+            **geometry,
             start_time=start_time_utc,
             end_time=end_time_utc,
-            status=(
-                "scheduled"
-                if NOW < start_time_utc
-                else "active" if start_time_utc <= NOW < end_time_utc else "inactive"
-            ),
+            status=_initial_status(start_time_utc, end_time_utc, NOW),
             time_created=NOW,
         )
 
@@ -52,66 +119,256 @@ class GeofenceRepository:
 
         return new_geofence
 
-    async def get_all_geofences(self):
-        stmt = select(Geofence)
-        result = await self.session.execute(stmt)
+    async def create_geofences(
+        self,
+        geofence: GeofenceShapeModel,
+        fence_codes: list[str],
+        creator_matric: str,
+        occurrences: list[tuple[datetime, datetime]],
+        NOW,
+        geometry: dict,
+    ) -> list[GeofenceSnapshot]:
+        """Inserts one fence per (start, end) occurrence in a single transaction."""
+        rows = [
+            {
+                "fence_code": fence_code,
+                "name": geofence.name,
+                "creator_matric": creator_matric,
+                "fence_type": geofence.fence_type,
+                **geometry,
+                "start_time": start_time_utc,
+                "end_time": end_time_utc,
+                "status": _initial_status(start_time_utc, end_time_utc, NOW),
+                "time_created": NOW,
+            }
+            for fence_code, (start_time_utc, end_time_utc) in zip(
+                fence_codes, occurrences
+            )
+        ]
+        await self.session.execute(insert(Geofence), rows)
+        await self.session.commit()
 
-        geofences = result.scalars().all()
-        return geofences
+        return [GeofenceSnapshot.from_row(Geofence(**row)) for row in rows]
 
-    async def get_all_geofences_by_user(self, user_id: str):
-        stmt = select(Geofence).filter(Geofence.creator_matric == user_id)
+    async def get_taken_fence_codes(self, fence_codes: list[str]) -> set[str]:
+        stmt = select(Geofence.fence_code).filter(Geofence.fence_code.in_(fence_codes))
         result = await self.session.execute(stmt)
-        geofence_by_user = result.scalars().all()
+        return set(result.scalars())
 
-        return geofence_by_user
+    async def get_course_days(
+        self, course_title: str, first: datetime, last: datetime
+    ) -> set[date]:
+        """Calendar days from `first`'s through `last`'s that already have a fence
+        named `course_title`."""
+        stmt = select(Geofence.start_time).filter(
+            Geofence.name == course_title,
+            Geofence.start_time >= _day_range(first)[0],
+            Geofence.start_time < _day_range(last)[1],
+        )
+        result = await self.session.execute(stmt)
+        return {start_time.date() for start_time in result.scalars()}
 
-    async def get_geofence(self, course_title: str, date: datetime) -> Geofence:
-        stmt = (
-            select(Geofence)
-            .options(selectinload(Geofence.student_attendances))
-            .filter(
-                and_(
-                    Geofence.name == course_title,
-                    func.date(Geofence.start_time) == date.date(),
-                )
+    async def get_all_geofences(
+        self,
+        limit: int,
+        cursor: tuple[datetime, int] | None = None,
+        creator_matric: str | None = None,
+    ):
+        """One page of fences, newest first, keyset-paginated on (start_time, id).
+
+        Each row is (Geofence, attendance_count). Returns up to `limit + 1` rows
+        so the caller can tell whether another page follows.
+        """
+        stmt = select(
+            Geofence,
+            func.coalesce(GeofenceAttendanceCount.attendance_count, 0).label(
+                "attendance_count"
+            ),
+        ).outerjoin(
+            GeofenceAttendanceCount,
+            GeofenceAttendanceCount.fence_code == Geofence.fence_code,
+        )
+        if creator_matric is not None:
+            stmt = stmt.filter(Geofence.creator_matric == creator_matric)
+        if cursor is not None:
+            start_time, geofence_id = cursor
+            # The plain range bound is what lets the index seek to the cursor;
+            # the OR only breaks ties between fences starting at the same time
+            stmt = stmt.filter(
+                Geofence.start_time <= start_time,
+                or_(Geofence.start_time < start_time, Geofence.id < geofence_id),
             )
+        stmt = stmt.order_by(Geofence.start_time.desc(), Geofence.id.desc()).limit(
+            limit + 1
         )
+        result = await self.session.execute(stmt)
+
+        geofences = result.all()
+        return geofences
+
+    async def get_all_geofences_by_user(
+        self, user_id: str, limit: int, cursor: tuple[datetime, int] | None = None
+    ):
+        return await self.get_all_geofences(limit, cursor, creator_matric=user_id)
+
+    async def get_geofence(
+        self, course_title: str, date: datetime, with_attendances: bool = False
+    ) -> Geofence:
+        """The course's fence on `date`'s day, with its attendance records only if
+        asked for."""
+        stmt = select(Geofence).filter(_course_day_filter(course_title, date))
+        if with_attendances:
+            stmt = stmt.options(selectinload(Geofence.student_attendances))
 
         result = await self.session.execute(stmt)
         geofence = result.scalars().one_or_none()
 
         return geofence
 
-    async def get_geofence_by_fence_code(self, fence_code: str):
-        stmt = (
-            select(Geofence)
-            .options(selectinload(Geofence.student_attendances))
-            .filter(Geofence.fence_code == fence_code)
+    async def get_geofence_snapshot_for_day(
+        self, course_title: str, date: datetime
+    ) -> GeofenceSnapshot | None:
+        stmt = select(*GEOFENCE_SNAPSHOT_COLUMNS).filter(
+            _course_day_filter(course_title, date)
         )
         result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        return GeofenceSnapshot.from_row(row) if row is not None else None
+
+    async def get_geofence_by_fence_code(
+        self, fence_code: str, with_attendances: bool = False
+    ):
+        stmt = select(Geofence).filter(Geofence.fence_code == fence_code)
+        if with_attendances:
+            stmt = stmt.options(selectinload(Geofence.student_attendances))
+        result = await self.session.execute(stmt)
         geofence = result.scalars().one_or_none()
         return geofence
 
+    async def get_open_geofence_snapshots(
+        self, now: datetime
+    ) -> list[GeofenceSnapshot]:
+        """Snapshots of every fence that is active, or scheduled and not yet over."""
+        stmt = select(*GEOFENCE_SNAPSHOT_COLUMNS).filter(
+            and_(
+                Geofence.status.in_(["active", "scheduled"]),
+                Geofence.end_time > now,
+            )
+        )
+        result = await self.session.execute(stmt)
+        return [GeofenceSnapshot.from_row(row) for row in result]
+
+    async def get_geofence_snapshot(self, fence_code: str) -> GeofenceSnapshot | None:
+        """Lean lookup of the columns needed to validate a check-in."""
+        stmt = select(*GEOFENCE_SNAPSHOT_COLUMNS).filter(
+            Geofence.fence_code == fence_code
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        return GeofenceSnapshot.from_row(row) if row is not None else None
+
     async def record_geofence_attendance(
         self,
-        attendance: AttendanceRecordModel,
+        fence_code: str,
         user_matric: str,
         geofence_name: str,
         matric_fence_code: str,
-    ):
-        attendance = AttendanceRecord(
+    ) -> bool:
+        """Inserts an attendance record unless one already exists for the student.
+
+        Duplicates are settled by the unique index on matric_fence_code inside the
+        INSERT itself, so concurrent retries cannot both succeed. Returns whether
+        a row was written; any other integrity error is raised.
+
+        The fence's count is left to `recount_open_attendance`, so a check-in is
+        the INSERT and its COMMIT, with no shared counter row to wait on.
+
+        A plain INSERT is used because the driver reports found rather than
+        changed rows, so an upsert's rowcount cannot tell a duplicate apart.
+        """
+        stmt = insert(AttendanceRecord).values(
             user_matric=user_matric,
-            fence_code=attendance.fence_code,
+            fence_code=fence_code,
             geofence_name=geofence_name,
             timestamp=datetime.now(ZoneInfo("UTC")),
             matric_fence_code=matric_fence_code,
         )
-        self.session.add(attendance)
+        try:
+            await self.session.execute(stmt)
+        except IntegrityError as e:
+            await self.session.rollback()
+            if _is_duplicate_attendance(e):
+                return False
+            raise
+
         await self.session.commit()
-        await self.session.refresh(attendance)
+        return True
 
-        return attendance
+    async def bulk_record_geofence_attendances(self, records: list[dict]):
+        """Writes a batch of check-ins in one statement and one commit.
+
+        Records already present (e.g. redelivered stream entries) are skipped by
+        the unique index, which makes replaying a batch harmless. Counts for the
+        fences in the batch are recounted from their records in the same
+        transaction, so they stay exact however many rows were skipped.
+        """
+        if not records:
+            return
+
+        dialect_name = self.session.get_bind().dialect.name
+        await self.session.execute(_insert_new_attendance(dialect_name), records)
+        await self.session.execute(
+            _recount_attendance(
+                dialect_name,
+                {record["fence_code"] for record in records},
+            )
+        )
+        await self.session.commit()
+
+    async def recount_open_attendance(
+        self, now: datetime, ended_fence_codes: list[str]
+    ):
+        """Recounts the fences open at `now`, plus the given ones that just ended,
+        from their records in one statement.
+
+        Single check-ins do not touch the counts table, so this is run every
+        lifecycle round to bring it up to date. Fences are picked by their times
+        rather than their status, so one deactivated early still gets a final
+        count.
+        """
+        open_fences = select(Geofence.fence_code).filter(
+            or_(
+                and_(Geofence.start_time <= now, Geofence.end_time > now),
+                Geofence.fence_code.in_(ended_fence_codes),
+            )
+        )
+        await self.session.execute(
+            _recount_attendance(self.session.get_bind().dialect.name, open_fences)
+        )
+        await self.session.commit()
+
+    async def get_attendance_count(self, fence_code: str) -> int:
+        stmt = select(GeofenceAttendanceCount.attendance_count).filter(
+            GeofenceAttendanceCount.fence_code == fence_code
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() or 0
+
+    async def get_geofence_attendee_matrics(self, fence_code: str) -> list[str]:
+        stmt = select(AttendanceRecord.user_matric).filter(
+            AttendanceRecord.fence_code == fence_code
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def attendance_exists(self, matric_fence_code: str) -> bool:
+        stmt = (
+            select(AttendanceRecord.id)
+            .filter(AttendanceRecord.matric_fence_code == matric_fence_code)
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.first() is not None
 
     async def get_attendance_record_for_student_for_geofence(
         self, matric_fence_code: str
@@ -124,26 +381,195 @@ class GeofenceRepository:
 
         return attendance_record
 
-    async def deactivate_geofence(self, geofence_name: str, date: datetime):
-        geofence = await self.get_geofence(course_title=geofence_name, date=date)
+    async def transition_geofence_statuses(
+        self, now: datetime
+    ) -> tuple[list[GeofenceSnapshot], list[str]]:
+        """Activates scheduled fences that have started and expires fences that have
+        ended, one set-based UPDATE each, in one transaction.
 
-        geofence.status = "inactive"
+        Returns snapshots of the activated fences and the codes of the expired
+        ones, so caches and indexes can follow.
+        """
+        due = and_(
+            Geofence.status == "scheduled",
+            Geofence.start_time <= now,
+            Geofence.end_time > now,
+        )
+        over = and_(
+            Geofence.status.in_(["scheduled", "active"]), Geofence.end_time <= now
+        )
+
+        result = await self.session.execute(
+            select(*GEOFENCE_SNAPSHOT_COLUMNS).filter(due)
+        )
+        activated = [
+            GeofenceSnapshot.from_row(row)._replace(status="active") for row in result
+        ]
+        result = await self.session.execute(select(Geofence.fence_code).filter(over))
+        expired = list(result.scalars())
 
-        self.session.add(geofence)
+        # Restricted to the rows read above, so what is reported is what changed
+        if activated:
+            await self.session.execute(
+                update(Geofence)
+                .filter(Geofence.fence_code.in_([s.fence_code for s in activated]), due)
+                .values(status="active")
+            )
+        if expired:
+            await self.session.execute(
+                update(Geofence)
+                .filter(Geofence.fence_code.in_(expired), over)
+                .values(status="inactive")
+            )
+        await self.session.commit()
+        return activated, expired
+
+    async def deactivate_geofence(self, fence_code: str):
+        stmt = (
+            update(Geofence)
+            .filter(Geofence.fence_code == fence_code)
+            .values(status="inactive")
+        )
+        await self.session.execute(stmt)
         await self.session.commit()
-        await self.session.refresh(geofence)
 
-    async def get_geofence_attendances(self, fence_code: str):
+    async def get_geofence_attendances(
+        self,
+        fence_code: str,
+        limit: int,
+        cursor: tuple[datetime, int] | None = None,
+    ):
+        """One page of a fence's register in check-in order, keyed on (timestamp, id).
+
+        Only the columns the register shows are selected, with the student's name
+        joined in rather than loading each User. Returns up to `limit + 1` rows.
+        """
         stmt = (
-            select(AttendanceRecord)
-            .options(selectinload(AttendanceRecord.user))
+            select(
+                AttendanceRecord.id,
+                AttendanceRecord.user_matric,
+                AttendanceRecord.fence_code,
+                AttendanceRecord.timestamp,
+                User.username,
+            )
+            .join(User, User.user_matric == AttendanceRecord.user_matric)
             .filter(AttendanceRecord.fence_code == fence_code)
         )
+        if cursor is not None:
+            timestamp, attendance_id = cursor
+            stmt = stmt.filter(
+                AttendanceRecord.timestamp >= timestamp,
+                or_(
+                    AttendanceRecord.timestamp > timestamp,
+                    AttendanceRecord.id > attendance_id,
+                ),
+            )
+        stmt = stmt.order_by(AttendanceRecord.timestamp, AttendanceRecord.id).limit(
+            limit + 1
+        )
         result = await self.session.execute(stmt)
 
-        attendances = result.scalars().all()
+        attendances = result.all()
         return attendances
 
+    async def get_attendance_changes(
+        self,
+        fence_code: str,
+        after_id: int | None,
+        limit: int,
+        settled_before: datetime,
+    ):
+        """Check-ins to a fence with an id above `after_id`, in id order, each
+        flagged `settled` if it was written before `settled_before`.
+
+        Check-ins are never updated, so new ids are the only changes to a
+        register. Returns up to `limit + 1` rows.
+        """
+        stmt = (
+            select(
+                AttendanceRecord.id,
+                AttendanceRecord.user_matric,
+                AttendanceRecord.fence_code,
+                AttendanceRecord.timestamp,
+                User.username,
+                (AttendanceRecord.created_at < settled_before).label("settled"),
+            )
+            .join(User, User.user_matric == AttendanceRecord.user_matric)
+            .filter(AttendanceRecord.fence_code == fence_code)
+        )
+        if after_id is not None:
+            stmt = stmt.filter(AttendanceRecord.id > after_id)
+        stmt = stmt.order_by(AttendanceRecord.id).limit(limit + 1)
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_geofence_changes(
+        self,
+        limit: int,
+        cursor: tuple[datetime, int] | None,
+        settled_before: datetime,
+    ):
+        """Fences created or changed after an (updated_at, id) cursor, oldest change
+        first, leaving out changes made at or after `settled_before`. Returns up to
+        `limit + 1` rows.
+        """
+        stmt = select(Geofence).filter(Geofence.updated_at < settled_before)
+        if cursor is not None:
+            updated_at, geofence_id = cursor
+            stmt = stmt.filter(
+                Geofence.updated_at >= updated_at,
+                or_(Geofence.updated_at > updated_at, Geofence.id > geofence_id),
+            )
+        stmt = stmt.order_by(Geofence.updated_at, Geofence.id).limit(limit + 1)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def stream_attendance_export(
+        self,
+        creator_matric: str,
+        fence_code: str | None = None,
+        course_title: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[list]:
+        """Yields batches of attendance rows for a lecturer's fences.
+
+        Rows come through a server-side cursor `batch_size` at a time, so the
+        whole export is never held in memory. `start`/`end` bound the fences'
+        start_time as a half-open range.
+        """
+        stmt = (
+            select(
+                AttendanceRecord.user_matric,
+                User.username,
+                AttendanceRecord.fence_code,
+                AttendanceRecord.geofence_name,
+                AttendanceRecord.timestamp,
+            )
+            .join(Geofence, Geofence.fence_code == AttendanceRecord.fence_code)
+            .join(User, User.user_matric == AttendanceRecord.user_matric)
+            .filter(Geofence.creator_matric == creator_matric)
+        )
+        if fence_code is not None:
+            stmt = stmt.filter(Geofence.fence_code == fence_code)
+        if course_title is not None:
+            stmt = stmt.filter(Geofence.name == course_title)
+        if start is not None:
+            stmt = stmt.filter(Geofence.start_time >= start)
+        if end is not None:
+            stmt = stmt.filter(Geofence.start_time < end)
+        stmt = stmt.order_by(
+            Geofence.start_time,
+            Geofence.id,
+            AttendanceRecord.timestamp,
+            AttendanceRecord.id,
+        ).execution_options(yield_per=batch_size)
+
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
 
 def get_geofence_repository(db_session: DatabaseDependency) -> GeofenceRepository:
     return GeofenceRepository(session=db_session)
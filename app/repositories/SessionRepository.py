@@ -2,6 +2,8 @@ from typing import Annotated
 
 from ..models import User
 from ..database import get_db_session
+from ..schemas.UserSchema import UserCredentials
+from .UserRepository import UserRepository
 
 from fastapi import Depends
 from sqlalchemy import and_, delete, or_
@@ -19,12 +21,13 @@ class SessionRepository:
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
-    async def get_user_by_email_or_matric(self, email: str = None, matric: str = None):
-        stmt = select(User).filter(or_(User.email == email, User.user_matric == matric))
-        result = await self.db_session.execute(stmt)
-        user = result.scalars().first()
-
-        return user
+    async def get_user_credentials(
+        self, email: str = None, matric: str = None
+    ) -> UserCredentials | None:
+        """Just the columns login needs, without building a User."""
+        return await UserRepository(self.db_session).get_user_credentials(
+            email=email, matric=matric
+        )
 
     # async def get_user_session_by_token(self, session_token):
     #     stmt = (
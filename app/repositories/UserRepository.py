@@ -1,36 +1,94 @@
+from datetime import datetime
 from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import or_
+from sqlalchemy import or_, update
 
-from ..schemas.UserSchema import UserCreateModel
-from ..models import User
+from ..schemas.UserSchema import UserCreateModel, UserCredentials
+from ..models import AttendanceRecord, User
 from ..database import get_db_session
 
 
 # Dependencies
 DatabaseDependency = Annotated[AsyncSession, Depends(get_db_session)]
 
+USER_CREDENTIAL_COLUMNS = [getattr(User, field) for field in UserCredentials._fields]
+
 
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_user_by_email_or_matric(
-        self, email: str = None, matric: str = None
+        self, email: str = None, matric: str = None, with_attendances: bool = False
     ) -> User:
+        """Loads the user row, plus every attendance record only if asked to."""
+        stmt = select(User).filter(or_(User.email == email, User.user_matric == matric))
+        if with_attendances:
+            stmt = stmt.options(selectinload(User.attendances))
+        result = await self.session.execute(stmt)
+
+        user: User = result.scalars().first()
+
+        return user
+
+    async def get_user_credentials(
+        self, email: str = None, matric: str = None
+    ) -> UserCredentials | None:
         stmt = (
-            select(User)
-            .options(selectinload(User.attendances))
+            select(*USER_CREDENTIAL_COLUMNS)
             .filter(or_(User.email == email, User.user_matric == matric))
+            .limit(1)
         )
         result = await self.session.execute(stmt)
+        row = result.first()
+        return UserCredentials(*row) if row is not None else None
 
-        user: User = result.scalars().first()
+    async def get_user_attendances(
+        self,
+        user_matric: str,
+        limit: int,
+        cursor: tuple[datetime, int] | None = None,
+        geofence_name: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ):
+        """One page of a student's check-ins, newest first, keyed on (timestamp, id).
 
-        return user
+        Every filter is applied in the one query, which walks the
+        (user_matric, timestamp) index. `start`/`end` bound the check-in time as a
+        half-open range. Returns up to `limit + 1` rows.
+        """
+        stmt = select(
+            AttendanceRecord.id,
+            AttendanceRecord.user_matric,
+            AttendanceRecord.fence_code,
+            AttendanceRecord.geofence_name,
+            AttendanceRecord.timestamp,
+        ).filter(AttendanceRecord.user_matric == user_matric)
+        if geofence_name is not None:
+            stmt = stmt.filter(AttendanceRecord.geofence_name == geofence_name)
+        if start is not None:
+            stmt = stmt.filter(AttendanceRecord.timestamp >= start)
+        if end is not None:
+            stmt = stmt.filter(AttendanceRecord.timestamp < end)
+        if cursor is not None:
+            timestamp, attendance_id = cursor
+            stmt = stmt.filter(
+                AttendanceRecord.timestamp <= timestamp,
+                or_(
+                    AttendanceRecord.timestamp < timestamp,
+                    AttendanceRecord.id < attendance_id,
+                ),
+            )
+        stmt = stmt.order_by(
+            AttendanceRecord.timestamp.desc(), AttendanceRecord.id.desc()
+        ).limit(limit + 1)
+        result = await self.session.execute(stmt)
+
+        return result.all()
 
     async def create_new_user(self, user: UserCreateModel, password_hash: str):
         new_user: User = User(
@@ -47,9 +105,12 @@ class UserRepository:
         return new_user
 
     async def change_user_password(self, user_email: str, new_hashed_password: str):
-        user: User = await self.get_user_by_email_or_matric(email=user_email)
-
-        user.hashed_password = new_hashed_password
+        stmt = (
+            update(User)
+            .filter(User.email == user_email)
+            .values(hashed_password=new_hashed_password)
+        )
+        await self.session.execute(stmt)
         await self.session.commit()
 
         return {"message": "Successfully changed password"}
@@ -5,3 +5,4 @@ from .ResetTokensRepository import (
     get_password_reset_token_repository,
 )
 from .GeofenceRepository import GeofenceRepository, get_geofence_repository
+from .AnalyticsRepository import AnalyticsRepository, get_analytics_repository
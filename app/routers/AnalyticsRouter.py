@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Annotated
+from fastapi import APIRouter, Depends
+
+from ..auth.sessions.sessionDependencies import (
+    authenticate_admin_user,
+    authenticate_student_user,
+)
+from ..services import AnalyticsService, get_analytics_service
+
+authenticate_admin = Annotated[dict, Depends(authenticate_admin_user)]
+authenticate_student = Annotated[dict, Depends(authenticate_student_user)]
+AnalyticsServiceDependency = Annotated[AnalyticsService, Depends(get_analytics_service)]
+
+
+AnalyticsRouter = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@AnalyticsRouter.get("/course_attendance")
+async def get_course_attendance(
+    course_title: str,
+    start: datetime,
+    end: datetime,
+    admin: authenticate_admin,
+    analytics_service: AnalyticsServiceDependency,
+):
+    """Returns the student x session attendance matrix and each student's attendance
+    rate for one of your courses, over sessions started within [start, end)"""
+    return await analytics_service.get_course_analytics(
+        admin["user_matric"], course_title, start, end
+    )
+
+
+@AnalyticsRouter.get("/my_attendance_rates")
+async def get_my_attendance_rates(
+    start: datetime,
+    end: datetime,
+    student: authenticate_student,
+    analytics_service: AnalyticsServiceDependency,
+):
+    """Returns the share of sessions started within [start, end) you attended, per
+    course"""
+    return await analytics_service.get_student_attendance_rates(
+        student["user_matric"], start, end
+    )
@@ -1,19 +1,36 @@
 from datetime import datetime
-from typing import Annotated, Dict, List
-from fastapi import APIRouter, Depends
-
-from ..schemas import GeofenceCreateModel, AttendanceRecordModel, AttendanceRecordOut
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Query
+
+from ..schemas import (
+    GeofenceCreateModel,
+    GeofenceScheduleModel,
+    AttendanceRecordModel,
+    AttendancePageOut,
+)
 from ..database import get_db_session
 from ..auth.sessions.sessionDependencies import (
     authenticate_admin_user,
     authenticate_student_user,
     authenticate_user_by_session_token,
 )
-from ..services import GeofenceService, get_geofence_service, get_user_service
+from ..services import (
+    AttendanceExporter,
+    GeofenceService,
+    get_attendance_exporter,
+    get_geofence_service,
+    get_user_service,
+)
+from ..services.AttendanceExporter import ExportFormat
+from ..utils.Pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 authenticate_admin = Annotated[dict, Depends(authenticate_admin_user)]
 authenticate_student = Annotated[dict, Depends(authenticate_student_user)]
 GeofenceServiceDependency = Annotated[GeofenceService, Depends(get_geofence_service)]
+AttendanceExporterDependency = Annotated[
+    AttendanceExporter, Depends(get_attendance_exporter)
+]
+PageSize = Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)]
 
 
 GeofenceRouter = APIRouter(prefix="/geofence", tags=["Geofences"])
@@ -29,6 +46,20 @@ async def create_geofence(
     return result
 
 
+@GeofenceRouter.post("/create_geofence_schedule")
+async def create_geofence_schedule(
+    schedule: GeofenceScheduleModel,
+    geofence_service: GeofenceServiceDependency,
+    admin: authenticate_admin,
+):
+    """Creates a geofence for every session of a weekly schedule, e.g. Mon and Wed
+    at 10:00 for 14 weeks"""
+    result = await geofence_service.create_geofence_schedule(
+        admin["user_matric"], schedule
+    )
+    return result
+
+
 @GeofenceRouter.get("/get_geofence", dependencies=[Depends(authenticate_admin_user)])
 async def get_geofence(
     course_title: str, date: datetime, geofence_service: GeofenceServiceDependency
@@ -41,21 +72,48 @@ async def get_geofence(
 @GeofenceRouter.get(
     "/get_geofences", dependencies=[Depends(authenticate_user_by_session_token)]
 )
-async def get_geofences(geofence_service: GeofenceServiceDependency):
-    """Returns all the geofences created"""
-    geofences_response = await geofence_service.get_all_geofences()
+async def get_geofences(
+    geofence_service: GeofenceServiceDependency,
+    limit: PageSize = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """Returns the geofences created, newest first, one page at a time"""
+    geofences_response = await geofence_service.get_all_geofences(
+        limit=limit, cursor=cursor
+    )
     return geofences_response
 
 
 @GeofenceRouter.get("/get_my_geofences")
 async def get_my_geofences_created(
-    admin: authenticate_admin, geofence_service: GeofenceServiceDependency
+    admin: authenticate_admin,
+    geofence_service: GeofenceServiceDependency,
+    limit: PageSize = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ):
-    """Returns a list of all geofences created by the given admin"""
-    geofences_response = await geofence_service.get_all_geofences(admin["user_matric"])
+    """Returns a page of the geofences created by the given admin, newest first"""
+    geofences_response = await geofence_service.get_all_geofences(
+        admin["user_matric"], limit=limit, cursor=cursor
+    )
     return geofences_response
 
 
+@GeofenceRouter.get(
+    "/geofence_changes", dependencies=[Depends(authenticate_user_by_session_token)]
+)
+async def get_geofence_changes(
+    geofence_service: GeofenceServiceDependency,
+    limit: PageSize = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """Returns geofences created or changed since the cursor from the previous call,
+    and a cursor for the next one. Omit the cursor for a first full sync"""
+    changes_response = await geofence_service.get_geofence_changes(
+        limit=limit, cursor=cursor
+    )
+    return changes_response
+
+
 @GeofenceRouter.post("/record_attendance")
 async def record_attendance(
     attendance: AttendanceRecordModel,
@@ -66,25 +124,95 @@ async def record_attendance(
     recorded_attendance_response = await geofence_service.record_geofence_attendance(
         user_matric=student["user_matric"],
         attendance=attendance,
+        username=student["username"],
     )
 
     return recorded_attendance_response
 
 
-@GeofenceRouter.get(
-    "/get_attendances", response_model=Dict[str, List[AttendanceRecordOut]]
-)
+@GeofenceRouter.get("/get_attendances", response_model=AttendancePageOut)
 async def get_geofence_attendances(
-    fence_code, admin: authenticate_admin, geofence_service: GeofenceServiceDependency
+    fence_code,
+    admin: authenticate_admin,
+    geofence_service: GeofenceServiceDependency,
+    limit: PageSize = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ):
-    """Returns the attendances for a given course"""
+    """Returns a page of the attendances for a given course, in check-in order"""
     attendances_response = await geofence_service.get_geofence_attendances(
-        fence_code=fence_code, user_id=admin["user_matric"]
+        fence_code=fence_code,
+        user_id=admin["user_matric"],
+        limit=limit,
+        cursor=cursor,
     )
 
     return attendances_response
 
 
+@GeofenceRouter.get("/attendance_changes")
+async def get_attendance_changes(
+    fence_code: str,
+    admin: authenticate_admin,
+    geofence_service: GeofenceServiceDependency,
+    limit: PageSize = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """Returns the check-ins since the cursor from the previous call, and a cursor for
+    the next one. Omit the cursor for a first full sync"""
+    changes_response = await geofence_service.get_attendance_changes(
+        fence_code=fence_code,
+        user_id=admin["user_matric"],
+        limit=limit,
+        cursor=cursor,
+    )
+    return changes_response
+
+
+@GeofenceRouter.get("/attendance_count")
+async def get_attendance_count(
+    fence_code: str,
+    admin: authenticate_admin,
+    geofence_service: GeofenceServiceDependency,
+):
+    """Returns how many students have checked into a geofence so far"""
+    count_response = await geofence_service.get_attendance_count(
+        fence_code=fence_code, user_id=admin["user_matric"]
+    )
+    return count_response
+
+
+@GeofenceRouter.get("/attendance_feed")
+async def get_attendance_feed(
+    fence_code: str,
+    admin: authenticate_admin,
+    geofence_service: GeofenceServiceDependency,
+):
+    """Streams each check-in to your geofence as Server-Sent Events while it is open,
+    instead of polling get_attendances"""
+    return await geofence_service.get_attendance_feed(
+        fence_code=fence_code, user_id=admin["user_matric"]
+    )
+
+
+@GeofenceRouter.get("/export_attendances")
+async def export_geofence_attendances(
+    admin: authenticate_admin,
+    exporter: AttendanceExporterDependency,
+    format: ExportFormat = "csv",
+    fence_code: Optional[str] = None,
+    course_title: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Streams the attendances of the admin's geofences as CSV or NDJSON.
+
+    Narrow it down to one fence, one course, and/or fences starting within [start, end).
+    """
+    return exporter.export(
+        admin["user_matric"], format, fence_code, course_title, start, end
+    )
+
+
 @GeofenceRouter.put("/deactivate")
 async def deactivate_geofence(
     admin: authenticate_admin,
@@ -1,9 +1,11 @@
+from datetime import datetime
 from typing import Annotated, Optional
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
 from ..services import UserService, get_user_service
 from fastapi import Depends
 from ..auth.sessions.sessionDependencies import authenticate_student_user
+from ..utils.Pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 StudentRouter = APIRouter(prefix="/user/student", tags=["Users/Student"])
 
@@ -13,11 +15,17 @@ UserServiceDependency = Annotated[UserService, Depends(get_user_service)]
 
 @StudentRouter.get("/get_my_records")
 async def get_my_records(
-    course_title: str | None,
     student: authenticate_student,
     user_service: UserServiceDependency,
+    course_title: str | None = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ):
+    """Returns a page of the student's check-ins, newest first, optionally only for
+    one course and/or checked in within [start, end)"""
     user_records = await user_service.get_user_records(
-        student["user_matric"], course_title
+        student["user_matric"], course_title, start, end, limit, cursor
     )
     return user_records
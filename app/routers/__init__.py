@@ -2,5 +2,12 @@ from .StudentRouter import StudentRouter
 from .AdminRouter import AdminRouter
 from .GeneralUserRouter import GeneralUserRouter
 from .GeofenceRouter import GeofenceRouter
+from .AnalyticsRouter import AnalyticsRouter
 
-__all__ = ["StudentRouter", "AdminRouter", "GeneralUserRouter", "GeofenceRouter"]
+__all__ = [
+    "StudentRouter",
+    "AdminRouter",
+    "GeneralUserRouter",
+    "GeofenceRouter",
+    "AnalyticsRouter",
+]
@@ -1,13 +1,21 @@
+from typing import List, Optional
 from pydantic import BaseModel
 
 
 class AttendanceRecordModel(BaseModel):
     lat: float
     long: float
-    fence_code: str
+    # When omitted, the active geofence containing (lat, long) is used
+    fence_code: Optional[str] = None
 
 
 class AttendanceRecordOut(BaseModel):
     username: str
     user_matric: str
     fence_code: str
+
+
+class AttendancePageOut(BaseModel):
+    attendance: List[AttendanceRecordOut]
+    # Pass back as `cursor` for the next page; None on the last page
+    next_cursor: Optional[str] = None
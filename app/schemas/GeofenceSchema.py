@@ -1,14 +1,161 @@
-from pydantic import BaseModel, ConfigDict, Field, AwareDatetime
+import base64
+import json
+from datetime import date, datetime, time, timezone
+from typing import List, Literal, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    AwareDatetime,
+    field_validator,
+    model_validator,
+)
 
-class GeofenceCreateModel(BaseModel):
+from ..utils.GeofenceUtils import FENCE_TYPE_POLYGON, unpack_vertices
+from ..utils.Recurrence import WEEKDAYS
+
+MAX_POLYGON_VERTICES = 256
+MAX_SCHEDULE_WEEKS = 52
+
+
+class GeofenceShapeModel(BaseModel):
+    name: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    radius: Optional[float] = None
+    fence_type: str
+    # (latitude, longitude) pairs, required when fence_type is "polygon"
+    vertices: Optional[List[Tuple[float, float]]] = Field(
+        default=None, max_length=MAX_POLYGON_VERTICES
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode="after")
+    def check_shape(self):
+        if self.fence_type.lower() == FENCE_TYPE_POLYGON:
+            if not self.vertices or len(self.vertices) < 3:
+                raise ValueError("Polygon geofences need at least 3 vertices")
+        elif None in (self.latitude, self.longitude, self.radius):
+            raise ValueError("Circular geofences need a latitude, longitude and radius")
+        return self
+
+
+class GeofenceCreateModel(GeofenceShapeModel):
+    start_time: AwareDatetime
+    end_time: AwareDatetime
+
+
+class GeofenceScheduleModel(GeofenceShapeModel):
+    """A fence repeated weekly, e.g. Mon and Wed at 10:00 for 14 weeks."""
+
+    starts_on: date
+    days: List[Literal[WEEKDAYS]] = Field(min_length=1, max_length=7)
+    # Wall-clock time in `time_zone`
+    start_time: time
+    duration_minutes: int = Field(gt=0, le=24 * 60)
+    weeks: int = Field(ge=1, le=MAX_SCHEDULE_WEEKS)
+    time_zone: str = "UTC"
+
+    @field_validator("time_zone")
+    @classmethod
+    def check_time_zone(cls, value):
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone: {value}")
+        return value
+
+
+class AttendanceSummaryOut(BaseModel):
+    user_matric: str
+    fence_code: str
+    geofence_name: str
+    timestamp: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GeofenceOut(BaseModel):
+    id: int
+    fence_code: str
     name: str
     latitude: float
     longitude: float
     radius: float
     fence_type: str
-    start_time: AwareDatetime
-    end_time: AwareDatetime
+    vertices: Optional[List[Tuple[float, float]]] = None
+    start_time: datetime
+    end_time: datetime
+    status: str
+    time_created: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    creator_matric: str
+    attendance_count: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("vertices", mode="before")
+    @classmethod
+    def unpack(cls, value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return unpack_vertices(bytes(value))
+        return value
+
+
+class GeofenceDetailOut(GeofenceOut):
+    student_attendances: List[AttendanceSummaryOut] = []
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # MySQL hands TIMESTAMP columns back as naive datetimes in UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class GeofenceSnapshot(NamedTuple):
+    """The columns needed to check a student against a fence, detached from the ORM."""
+
+    fence_code: str
+    name: str
+    latitude: float
+    longitude: float
+    radius: float
+    fence_type: str
+    vertices: Optional[bytes]
+    min_latitude: Optional[float]
+    max_latitude: Optional[float]
+    min_longitude: Optional[float]
+    max_longitude: Optional[float]
+    start_time: datetime
+    end_time: datetime
+    status: str
+    creator_matric: str
+
+    @classmethod
+    def from_row(cls, row) -> "GeofenceSnapshot":
+        """Builds a snapshot from a `Geofence` instance or a row with the same columns."""
+        values = {field: getattr(row, field) for field in cls._fields}
+        values["start_time"] = _as_utc(values["start_time"])
+        values["end_time"] = _as_utc(values["end_time"])
+        return cls(**values)
+
+    def to_json(self) -> str:
+        values = self._asdict()
+        values["start_time"] = self.start_time.isoformat()
+        values["end_time"] = self.end_time.isoformat()
+        if self.vertices is not None:
+            values["vertices"] = base64.b64encode(self.vertices).decode()
+        return json.dumps(values)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "GeofenceSnapshot":
+        values = json.loads(raw)
+        values["start_time"] = datetime.fromisoformat(values["start_time"])
+        values["end_time"] = datetime.fromisoformat(values["end_time"])
+        if values["vertices"] is not None:
+            values["vertices"] = base64.b64decode(values["vertices"])
+        return cls(**values)
@@ -1,3 +1,5 @@
+from typing import NamedTuple
+
 from pydantic import BaseModel, ConfigDict, EmailStr
 
 
@@ -17,4 +19,14 @@ class UserOutputModel(BaseModel):
     user_matric: str
     role: str
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserCredentials(NamedTuple):
+    """The columns needed to log a user in or address them, detached from the ORM."""
+
+    user_matric: str
+    email: str
+    username: str
+    role: str
+    hashed_password: str
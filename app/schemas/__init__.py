@@ -1,3 +1,15 @@
-from .UserSchema import UserCreateModel, UserOutputModel
-from .GeofenceSchema import GeofenceCreateModel
-from .AttendanceRecordSchema import AttendanceRecordModel, AttendanceRecordOut
+from .UserSchema import UserCreateModel, UserOutputModel, UserCredentials
+from .GeofenceSchema import (
+    GeofenceCreateModel,
+    GeofenceScheduleModel,
+    GeofenceShapeModel,
+    AttendanceSummaryOut,
+    GeofenceOut,
+    GeofenceDetailOut,
+    GeofenceSnapshot,
+)
+from .AttendanceRecordSchema import (
+    AttendanceRecordModel,
+    AttendanceRecordOut,
+    AttendancePageOut,
+)
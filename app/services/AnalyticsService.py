@@ -0,0 +1,265 @@
+from datetime import datetime, timezone
+import json
+import logging
+from typing import Annotated, Any, Dict, Optional
+
+from fastapi import Depends, HTTPException
+
+from ..redis import (
+    CourseAnalyticsCache,
+    get_course_analytics_cache,
+    StudentRecordsCache,
+    get_student_records_cache,
+)
+from ..repositories import AnalyticsRepository, get_analytics_repository
+from ..utils.Pagination import naive_utc
+
+logger = logging.getLogger("uvicorn")
+
+# Check-ins are re-read this far below the watermark on refresh. Ids are handed
+# out at insert but become visible at commit, so a concurrent transaction can
+# surface a row below an id already seen. Re-reading them is harmless since
+# merging is a set union.
+WATERMARK_LOOKBACK = 1000
+
+# Dependencies
+AnalyticsRepositoryDependency = Annotated[
+    AnalyticsRepository, Depends(get_analytics_repository)
+]
+CourseAnalyticsCacheDependency = Annotated[
+    CourseAnalyticsCache, Depends(get_course_analytics_cache)
+]
+StudentRecordsCacheDependency = Annotated[
+    StudentRecordsCache, Depends(get_student_records_cache)
+]
+
+
+def _rate(attended: int, held: int) -> float:
+    return round(attended / held, 4) if held else 0.0
+
+
+class AnalyticsService:
+    def __init__(
+        self,
+        analytics_repository: AnalyticsRepository,
+        course_cache: Optional[CourseAnalyticsCache] = None,
+        records_cache: Optional[StudentRecordsCache] = None,
+        watermark_lookback: int = WATERMARK_LOOKBACK,
+    ):
+        self.analytics_repository: AnalyticsRepository = analytics_repository
+        self.course_cache: CourseAnalyticsCache = course_cache
+        self.records_cache: StudentRecordsCache = records_cache
+        self.watermark_lookback = watermark_lookback
+
+    @staticmethod
+    def _term(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+        start, end = naive_utc(start), naive_utc(end)
+        if start >= end:
+            raise HTTPException(status_code=400, detail="start must be before end")
+        return start, end
+
+    @staticmethod
+    def _held_until(end: datetime) -> datetime:
+        """Sessions that have not started yet do not count against anyone."""
+        return min(end, datetime.now(timezone.utc).replace(tzinfo=None))
+
+    async def get_course_analytics(
+        self, creator_matric: str, course_title: str, start: datetime, end: datetime
+    ) -> Dict[str, Any]:
+        """Student x session attendance matrix and per-student rates for one of the
+        admin's courses, over sessions started within [start, end).
+
+        Only students who attended at least one session appear, as there is no
+        enrolment list to compare against.
+        """
+        start, end = self._term(start, end)
+        try:
+            sessions = await self.analytics_repository.get_course_sessions(
+                creator_matric, course_title, start, self._held_until(end)
+            )
+            attended = await self._get_attended(
+                creator_matric, course_title, start, end, sessions
+            )
+        except Exception as e:
+            logger.error(
+                f"Error computing analytics for {course_title}: {str(e)}", exc_info=True
+            )
+            raise HTTPException(
+                status_code=500, detail="Something went wrong, contact admin."
+            )
+
+        fence_codes = [session.fence_code for session in sessions]
+        students = sorted(
+            set().union(*(attended.get(fence_code, ()) for fence_code in fence_codes))
+        )
+        matrix = {
+            student: [
+                int(student in attended.get(fence_code, ()))
+                for fence_code in fence_codes
+            ]
+            for student in students
+        }
+        return {
+            "course_title": course_title,
+            "sessions": [
+                {
+                    "fence_code": session.fence_code,
+                    "start_time": session.start_time.replace(tzinfo=timezone.utc),
+                    "attendance_count": session.attendance_count,
+                }
+                for session in sessions
+            ],
+            "students": [
+                {
+                    "user_matric": student,
+                    "attended": sum(matrix[student]),
+                    "attendance_rate": _rate(sum(matrix[student]), len(sessions)),
+                }
+                for student in students
+            ],
+            # One row per student, one column per entry of "sessions"
+            "matrix": matrix,
+        }
+
+    async def _get_attended(
+        self, creator_matric, course_title, start, end, sessions
+    ) -> Dict[str, set]:
+        """Attendees of each session, from the cached state plus whatever was
+        checked in since it was saved."""
+        if not sessions:
+            return {}
+
+        state = None
+        if self.course_cache is not None:
+            try:
+                state = await self.course_cache.get(
+                    creator_matric, course_title, start, end
+                )
+            except Exception as e:
+                logger.error(
+                    f"Analytics cache unavailable for {course_title}: {str(e)}"
+                )
+
+        if state is None:
+            watermark, after_id, attended = 0, None, {}
+        else:
+            watermark = state["watermark"]
+            after_id = max(watermark - self.watermark_lookback, 0)
+            attended = {
+                fence_code: set(matrics)
+                for fence_code, matrics in state["attended"].items()
+            }
+
+        rows = await self.analytics_repository.get_session_attendees(
+            [session.fence_code for session in sessions], after_id
+        )
+        for row in rows:
+            attended.setdefault(row.fence_code, set()).add(row.user_matric)
+            watermark = max(watermark, row.id)
+
+        if self.course_cache is not None and (state is None or rows):
+            try:
+                await self.course_cache.set(
+                    creator_matric,
+                    course_title,
+                    start,
+                    end,
+                    {
+                        "watermark": watermark,
+                        "attended": {
+                            fence_code: sorted(matrics)
+                            for fence_code, matrics in attended.items()
+                        },
+                    },
+                )
+            except Exception as e:
+                logger.error(
+                    f"Analytics cache write failed for {course_title}: {str(e)}"
+                )
+        return attended
+
+    async def get_student_attendance_rates(
+        self, user_matric: str, start: datetime, end: datetime
+    ) -> Dict[str, Any]:
+        """The share of each course's sessions in [start, end) the student attended,
+        for every course they checked into. Cached until their next check-in."""
+        start, end = self._term(start, end)
+
+        # Filed among the student's cached record pages, so check-ins retire it too
+        query = json.dumps(["rates", start, end], default=str)
+        version = None
+        if self.records_cache is not None:
+            try:
+                version = await self.records_cache.version(user_matric)
+                cached = await self.records_cache.get(user_matric, version, query)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                logger.error(f"Records cache unavailable for {user_matric}: {str(e)}")
+
+        try:
+            held_until = self._held_until(end)
+            attended = {
+                (creator_matric, course_title): count
+                for creator_matric, course_title, count in (
+                    await self.analytics_repository.get_student_attended_counts(
+                        user_matric, start, held_until
+                    )
+                )
+            }
+            held = (
+                {
+                    (creator_matric, course_title): count
+                    for creator_matric, course_title, count in (
+                        await self.analytics_repository.get_session_counts(
+                            list(attended), start, held_until
+                        )
+                    )
+                }
+                if attended
+                else {}
+            )
+        except Exception as e:
+            logger.error(
+                f"Error computing attendance rates for {user_matric}", exc_info=True
+            )
+            raise HTTPException(
+                status_code=500, detail="Something went wrong, contact admin."
+            )
+
+        rates = {
+            "courses": [
+                {
+                    "course_title": course_title,
+                    "creator_matric": creator_matric,
+                    "attended": attended[(creator_matric, course_title)],
+                    "sessions": held.get((creator_matric, course_title), 0),
+                    "attendance_rate": _rate(
+                        attended[(creator_matric, course_title)],
+                        held.get((creator_matric, course_title), 0),
+                    ),
+                }
+                for creator_matric, course_title in sorted(
+                    attended, key=lambda course: (course[1], course[0])
+                )
+            ]
+        }
+
+        if version is not None:
+            try:
+                await self.records_cache.set(user_matric, version, query, rates)
+            except Exception as e:
+                logger.error(f"Records cache write failed for {user_matric}: {str(e)}")
+        return rates
+
+
+def get_analytics_service(
+    analytics_repository: AnalyticsRepositoryDependency,
+    course_cache: CourseAnalyticsCacheDependency,
+    records_cache: StudentRecordsCacheDependency,
+) -> AnalyticsService:
+    return AnalyticsService(
+        analytics_repository=analytics_repository,
+        course_cache=course_cache,
+        records_cache=records_cache,
+    )
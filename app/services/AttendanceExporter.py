@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from typing import AsyncIterator, Literal, Optional
+
+from fastapi.responses import StreamingResponse
+
+from ..database import sessionmanager
+from ..repositories import GeofenceRepository
+from ..utils.Pagination import naive_utc
+
+logger = logging.getLogger("uvicorn")
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_COLUMNS = ("user_matric", "username", "fence_code", "geofence_name", "timestamp")
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _timestamp(value: datetime) -> str:
+    # Stored as naive UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def format_csv_rows(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row[:-1] + (_timestamp(row.timestamp),))
+    return buffer.getvalue()
+
+
+def format_ndjson_rows(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row[:-1] + (_timestamp(row.timestamp),))))
+        + "\n"
+        for row in rows
+    )
+
+
+class AttendanceExporter:
+    """Streams attendance records out as CSV or NDJSON.
+
+    The body is produced after the request's dependencies have been torn down,
+    so the exporter opens its own session for the lifetime of the stream. Rows
+    are read and written one batch at a time, keeping memory flat however large
+    the export is.
+    """
+
+    def __init__(self, session_factory=sessionmanager.session):
+        self.session_factory = session_factory
+
+    async def stream(
+        self,
+        creator_matric: str,
+        export_format: ExportFormat = "csv",
+        fence_code: Optional[str] = None,
+        course_title: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> AsyncIterator[str]:
+        if export_format == "csv":
+            yield format_csv_rows((), header=True)
+
+        async with self.session_factory() as session:
+            batches = GeofenceRepository(session).stream_attendance_export(
+                creator_matric,
+                fence_code,
+                course_title,
+                naive_utc(start),
+                naive_utc(end),
+            )
+            try:
+                async for rows in batches:
+                    if export_format == "csv":
+                        yield format_csv_rows(rows)
+                    else:
+                        yield format_ndjson_rows(rows)
+            except Exception as e:
+                # Headers are already sent, so all we can do is cut the stream short
+                logger.error(f"Attendance export failed part way: {str(e)}")
+                raise
+
+    def export(
+        self,
+        creator_matric: str,
+        export_format: ExportFormat = "csv",
+        fence_code: Optional[str] = None,
+        course_title: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> StreamingResponse:
+        label = re.sub(r"[^A-Za-z0-9_-]+", "-", fence_code or course_title or "export")
+        filename = f"attendance-{label}"
+        return StreamingResponse(
+            self.stream(
+                creator_matric, export_format, fence_code, course_title, start, end
+            ),
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="{filename}.{export_format}"'
+                )
+            },
+        )
+
+
+def get_attendance_exporter() -> AttendanceExporter:
+    return AttendanceExporter()
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from ..database import sessionmanager
+from ..redis import AttendanceStream, StudentRecordsCache
+from ..repositories import GeofenceRepository
+from ..utils import get_app_settings
+
+logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+# Entries a consumer has held this long without acknowledging are presumed lost
+STALE_ENTRY_IDLE_MS = 60_000
+# Entries still failing after this many deliveries are moved to the dead stream
+MAX_ENTRY_DELIVERIES = 5
+# Failures caused by an entry itself rather than by Redis or MySQL being down
+# (malformed fields, foreign key violations, truncation)
+ENTRY_ERRORS = (KeyError, ValueError, IntegrityError, DataError)
+
+
+class AttendanceFlusher:
+    """Drains the attendance stream into MySQL in batches.
+
+    Every worker runs one flusher in the same consumer group, so batches are
+    spread across workers and a dead worker's pending entries are claimed by the
+    others. Each batch is one INSERT skipping duplicates and one commit; entries are only
+    acknowledged after the commit.
+
+    If an entry itself breaks the batch, the batch is retried one entry at a
+    time so the rest still get through. The bad entry stays pending and is
+    retried with later claims, until after `max_deliveries` it is moved to the
+    dead stream.
+    """
+
+    def __init__(
+        self,
+        stream: AttendanceStream,
+        batch_size: int = settings.ATTENDANCE_FLUSH_BATCH_SIZE,
+        block_ms: int = settings.ATTENDANCE_FLUSH_BLOCK_MS,
+        session_factory=sessionmanager.session,
+        records_cache: StudentRecordsCache = None,
+        max_deliveries: int = MAX_ENTRY_DELIVERIES,
+    ):
+        self.stream = stream
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.session_factory = session_factory
+        self.records_cache = records_cache
+        self.max_deliveries = max_deliveries
+
+    async def flush_once(self) -> int:
+        entries = await self.stream.claim_stale(self.batch_size, STALE_ENTRY_IDLE_MS)
+        if not entries:
+            entries = await self.stream.read_new(self.batch_size, self.block_ms)
+        if not entries:
+            return 0
+
+        try:
+            records = [AttendanceStream.decode(fields) for _, fields in entries]
+            await self._write(records)
+        except ENTRY_ERRORS as e:
+            logger.warning(
+                f"Attendance batch of {len(entries)} failed, "
+                f"writing it one entry at a time: {str(e)}"
+            )
+            entries, records = await self._write_one_at_a_time(entries)
+            if not entries:
+                return 0
+
+        await self.stream.ack([entry_id for entry_id, _ in entries])
+        if self.records_cache is not None:
+            # Their new check-ins are only readable now
+            await self.records_cache.invalidate(
+                {record["user_matric"] for record in records}
+            )
+        return len(entries)
+
+    async def _write(self, records: list[dict]):
+        async with self.session_factory() as session:
+            await GeofenceRepository(session).bulk_record_geofence_attendances(records)
+
+    async def _write_one_at_a_time(
+        self, entries: list[tuple[str, dict]]
+    ) -> tuple[list[tuple[str, dict]], list[dict]]:
+        """Writes each entry in its own transaction. Returns the entries that were
+        written and their records; the ones that failed are left pending, or
+        dead-lettered once they have used up their deliveries."""
+        written, records, failed = [], [], []
+        for entry_id, fields in entries:
+            try:
+                record = AttendanceStream.decode(fields)
+                await self._write([record])
+            except ENTRY_ERRORS as e:
+                logger.error(f"Attendance entry {entry_id} was not written: {str(e)}")
+                failed.append((entry_id, fields))
+                continue
+            written.append((entry_id, fields))
+            records.append(record)
+
+        if failed:
+            deliveries = await self.stream.delivery_counts(
+                [entry_id for entry_id, _ in failed]
+            )
+            exhausted = [
+                (entry_id, fields)
+                for entry_id, fields in failed
+                if deliveries.get(entry_id, 0) >= self.max_deliveries
+            ]
+            if exhausted:
+                await self.stream.dead_letter(exhausted)
+                logger.error(
+                    f"Moved {len(exhausted)} attendance entries to the dead stream"
+                )
+        return written, records
+
+    async def run(self, retry_seconds: float = 5):
+        """Flushes until cancelled, backing off when Redis or MySQL is unavailable."""
+        while True:
+            try:
+                await self.stream.ensure_group()
+                while True:
+                    flushed = await self.flush_once()
+                    if flushed:
+                        logger.info(f"Flushed {flushed} attendance records")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Attendance flusher failed, retrying: {str(e)}")
+                await asyncio.sleep(retry_seconds)
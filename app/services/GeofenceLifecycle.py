@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from redis.asyncio import Redis
+
+from ..database import sessionmanager
+from ..redis import (
+    GeofenceCache,
+    LeaderLock,
+    publish_geofence_removals,
+    publish_geofence_upserts,
+)
+from ..repositories import GeofenceRepository
+from ..utils import get_app_settings
+
+logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+
+class GeofenceLifecycleScheduler:
+    """Moves fences from scheduled to active to inactive as their times pass.
+
+    Every worker runs one, but only the holder of a Redis leader lock does the
+    work, so each round is two UPDATEs and one recount of the open fences'
+    attendance however many workers or nodes there are. The lease covers a few
+    rounds, so when the leader dies another worker takes over shortly after it
+    lapses.
+
+    Cached snapshots of changed fences are dropped, and every worker's index
+    is told. Check-ins go by the fences' times, so a late round only delays
+    the status that lecturers see.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        geofence_cache: GeofenceCache = None,
+        interval_seconds: float = settings.GEOFENCE_LIFECYCLE_INTERVAL_SECONDS,
+        session_factory=sessionmanager.session,
+    ):
+        self.redis_client = redis_client
+        self.geofence_cache = geofence_cache
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+        self.leader_lock = LeaderLock(
+            redis_client, "geofence-lifecycle", lease_ms=int(interval_seconds * 3000)
+        )
+
+    async def transition_once(self) -> tuple[int, int]:
+        async with self.session_factory() as session:
+            now = datetime.now(ZoneInfo("UTC"))
+            repository = GeofenceRepository(session)
+            activated, expired = await repository.transition_geofence_statuses(now)
+            await repository.recount_open_attendance(now, expired)
+
+        changed = [snapshot.fence_code for snapshot in activated] + expired
+        if not changed:
+            return 0, 0
+
+        if self.geofence_cache is not None:
+            await self.geofence_cache.invalidate_many(changed)
+        if activated:
+            await publish_geofence_upserts(self.redis_client, activated)
+        if expired:
+            await publish_geofence_removals(self.redis_client, expired)
+        return len(activated), len(expired)
+
+    async def run(self):
+        """Runs a round every interval until cancelled, then steps down."""
+        try:
+            while True:
+                try:
+                    if await self.leader_lock.hold():
+                        activated, expired = await self.transition_once()
+                        if activated or expired:
+                            logger.info(
+                                f"Activated {activated} and expired {expired} geofences"
+                            )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Geofence lifecycle round failed: {str(e)}")
+                await asyncio.sleep(self.interval_seconds)
+        finally:
+            try:
+                await self.leader_lock.release()
+            except Exception as e:
+                logger.error(f"Failed to release geofence lifecycle lock: {str(e)}")
@@ -1,29 +1,166 @@
-from datetime import datetime, timezone
+import asyncio
+from datetime import datetime, timedelta, timezone
 import logging
 import random
 import string
-from typing import Annotated, Dict, Optional
+from typing import Annotated, AsyncIterator, Dict, Optional
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from redis.asyncio import Redis
 from ..exceptions import *
-from ..schemas import GeofenceCreateModel, AttendanceRecordModel
-from ..services import get_user_service, UserService
+from ..schemas import (
+    GeofenceCreateModel,
+    GeofenceScheduleModel,
+    AttendanceRecordModel,
+    GeofenceOut,
+    GeofenceDetailOut,
+    GeofenceSnapshot,
+)
+from ..redis import (
+    AttendanceStream,
+    get_attendance_stream,
+    AttendeeSetStore,
+    get_attendee_set_store,
+    GeofenceCache,
+    get_geofence_cache,
+    get_redis_client,
+    publish_geofence_upsert,
+    publish_geofence_upserts,
+    publish_geofence_removal,
+    StudentRecordsCache,
+    get_student_records_cache,
+    AttendanceFeedHub,
+    get_attendance_feed_hub,
+    publish_attendance_event,
+)
+from ..redis.AttendeeSets import CLAIM_ACCEPTED, CLAIM_NOT_LOADED
 from ..repositories import GeofenceRepository, get_geofence_repository
-from ..utils import check_user_in_circular_geofence
+from ..utils import check_user_in_geofence, build_geofence_geometry, get_app_settings
+from ..utils.GeofenceIndex import GeofenceGridIndex, get_geofence_index
+from ..utils.Recurrence import expand_weekly_rule
+from ..utils.Pagination import (
+    DEFAULT_PAGE_SIZE,
+    InvalidCursorError,
+    decode_cursor,
+    decode_id_cursor,
+    encode_cursor,
+    encode_id_cursor,
+    naive_utc,
+    split_page,
+)
 
 
 logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+FENCE_CODE_CHARACTERS = string.ascii_lowercase + string.digits
+FENCE_CODE_LENGTH = 6
 
 # Dependencies
 GeofenceRepositoryDependency = Annotated[
     GeofenceRepository, Depends(get_geofence_repository)
 ]
+RedisClientDependency = Annotated[Redis, Depends(get_redis_client)]
+GeofenceIndexDependency = Annotated[GeofenceGridIndex, Depends(get_geofence_index)]
+GeofenceCacheDependency = Annotated[GeofenceCache, Depends(get_geofence_cache)]
+AttendanceStreamDependency = Annotated[AttendanceStream, Depends(get_attendance_stream)]
+AttendeeSetDependency = Annotated[AttendeeSetStore, Depends(get_attendee_set_store)]
+StudentRecordsCacheDependency = Annotated[
+    StudentRecordsCache, Depends(get_student_records_cache)
+]
+AttendanceFeedDependency = Annotated[
+    AttendanceFeedHub, Depends(get_attendance_feed_hub)
+]
 
 
 class GeofenceService:
-    def __init__(self, geofence_repository: GeofenceRepository):
+    def __init__(
+        self,
+        geofence_repository: GeofenceRepository,
+        redis_client: Optional[Redis] = None,
+        geofence_index: Optional[GeofenceGridIndex] = None,
+        geofence_cache: Optional[GeofenceCache] = None,
+        attendance_stream: Optional[AttendanceStream] = None,
+        attendee_sets: Optional[AttendeeSetStore] = None,
+        records_cache: Optional[StudentRecordsCache] = None,
+        attendance_feed: Optional[AttendanceFeedHub] = None,
+    ):
         self.geofenceRepository: GeofenceRepository = geofence_repository
+        self.redis_client: Redis = redis_client
+        self.geofence_index: GeofenceGridIndex = geofence_index
+        self.geofence_cache: GeofenceCache = geofence_cache
+        # When set, accepted check-ins are queued for AttendanceFlusher instead
+        # of being committed in the request
+        self.attendance_stream: AttendanceStream = attendance_stream
+        self.attendee_sets: AttendeeSetStore = attendee_sets
+        self.records_cache: StudentRecordsCache = records_cache
+        self.attendance_feed: AttendanceFeedHub = attendance_feed
+
+    async def _invalidate_cached_geofence(self, fence_code: str):
+        if self.geofence_cache is not None:
+            try:
+                await self.geofence_cache.invalidate(fence_code)
+            except Exception as e:
+                logger.error(f"Failed to invalidate cached {fence_code}: {str(e)}")
+
+    async def _index_geofence(self, snapshot: GeofenceSnapshot):
+        """Adds a fence to this worker's index and tells the other workers."""
+        await self._invalidate_cached_geofence(snapshot.fence_code)
+        if self.geofence_index is not None:
+            self.geofence_index.upsert(snapshot)
+        if self.redis_client is not None:
+            try:
+                await publish_geofence_upsert(self.redis_client, snapshot)
+            except Exception as e:
+                logger.error(
+                    f"Failed to publish geofence {snapshot.fence_code}: {str(e)}"
+                )
+
+    async def _index_new_geofences(self, snapshots: list[GeofenceSnapshot]):
+        """`_index_geofence` for freshly inserted fences, which nothing has cached
+        yet, publishing them all in one round trip."""
+        if self.geofence_index is not None:
+            for snapshot in snapshots:
+                self.geofence_index.upsert(snapshot)
+        if self.redis_client is not None:
+            try:
+                await publish_geofence_upserts(self.redis_client, snapshots)
+            except Exception as e:
+                logger.error(f"Failed to publish {len(snapshots)} geofences: {str(e)}")
+
+    async def _unindex_geofence(self, fence_code: str):
+        await self._invalidate_cached_geofence(fence_code)
+        if self.geofence_index is not None:
+            self.geofence_index.remove(fence_code)
+        if self.redis_client is not None:
+            try:
+                await publish_geofence_removal(self.redis_client, fence_code)
+            except Exception as e:
+                logger.error(f"Failed to publish removal of {fence_code}: {str(e)}")
+
+    async def _get_geofence_snapshot(self, fence_code: str) -> GeofenceSnapshot | None:
+        """Read-through lookup: local LRU, then Redis, then the database."""
+        if self.geofence_cache is None:
+            return await self.geofenceRepository.get_geofence_snapshot(fence_code)
+
+        version = None
+        try:
+            snapshot = await self.geofence_cache.get(fence_code)
+            if snapshot is not None:
+                return snapshot
+            version = await self.geofence_cache.version(fence_code)
+        except Exception as e:
+            logger.error(f"Geofence cache read failed for {fence_code}: {str(e)}")
+
+        snapshot = await self.geofenceRepository.get_geofence_snapshot(fence_code)
+        if snapshot is not None and version is not None:
+            try:
+                await self.geofence_cache.set(snapshot, version)
+            except Exception as e:
+                logger.error(f"Geofence cache write failed for {fence_code}: {str(e)}")
+        return snapshot
 
     async def create_geofence(
         self,
@@ -31,11 +168,10 @@ class GeofenceService:
         geofence: GeofenceCreateModel,
     ):  # SINGULAR
         try:
-            characters = string.ascii_letters + string.digits
-            fence_code = "".join(random.choice(characters) for _ in range(6)).lower()
-
-            existing_geofence = await self.geofenceRepository.get_geofence(
-                geofence.name, geofence.start_time
+            existing_geofence = (
+                await self.geofenceRepository.get_geofence_snapshot_for_day(
+                    geofence.name, geofence.start_time
+                )
             )
             if existing_geofence:
                 raise GeofenceAlreadyExistException(
@@ -53,9 +189,25 @@ class GeofenceService:
             if end_time_utc < NOW:
                 raise InvalidDurationException("End time cannot be in the past.")
 
+            geometry = build_geofence_geometry(
+                geofence.fence_type,
+                geofence.latitude,
+                geofence.longitude,
+                geofence.radius,
+                geofence.vertices,
+            )
+
+            (fence_code,) = await self._generate_fence_codes(1)
             added_geofence = await self.geofenceRepository.create_geofence(
-                geofence, fence_code, creator_matric, start_time_utc, end_time_utc, NOW
+                geofence,
+                fence_code,
+                creator_matric,
+                start_time_utc,
+                end_time_utc,
+                NOW,
+                geometry,
             )
+            await self._index_geofence(GeofenceSnapshot.from_row(added_geofence))
 
             return {"Code": fence_code, "name": added_geofence.name}
         except GeofenceAlreadyExistException as e:
@@ -74,20 +226,124 @@ class GeofenceService:
                 status_code=500, detail="Something went wrong. Contact admin"
             )
 
+    async def create_geofence_schedule(
+        self, creator_matric: str, schedule: GeofenceScheduleModel
+    ):
+        """Creates every occurrence of a weekly schedule in one transaction."""
+        try:
+            occurrences = expand_weekly_rule(
+                schedule.starts_on,
+                schedule.days,
+                schedule.start_time,
+                timedelta(minutes=schedule.duration_minutes),
+                schedule.weeks,
+                schedule.time_zone,
+            )
+            NOW = datetime.now(ZoneInfo("UTC"))
+            if not occurrences:
+                raise InvalidDurationException(
+                    "The schedule has no sessions. Please check its days and weeks."
+                )
+            if occurrences[0][1] < NOW:
+                raise InvalidDurationException(
+                    "The first session has already ended. Please start the schedule later."
+                )
+
+            # One geofence per course per day, as with create_geofence
+            taken_days = await self.geofenceRepository.get_course_days(
+                schedule.name,
+                naive_utc(occurrences[0][0]),
+                naive_utc(occurrences[-1][0]),
+            )
+            clashes = [
+                start.date().isoformat()
+                for start, _ in occurrences
+                if start.date() in taken_days
+            ]
+            if clashes:
+                raise GeofenceAlreadyExistException(
+                    f"Geofence '{schedule.name}' already exist on {', '.join(clashes)}"
+                )
+
+            geometry = build_geofence_geometry(
+                schedule.fence_type,
+                schedule.latitude,
+                schedule.longitude,
+                schedule.radius,
+                schedule.vertices,
+            )
+            fence_codes = await self._generate_fence_codes(len(occurrences))
+            snapshots = await self.geofenceRepository.create_geofences(
+                schedule, fence_codes, creator_matric, occurrences, NOW, geometry
+            )
+            await self._index_new_geofences(snapshots)
+
+            return {
+                "name": schedule.name,
+                "geofences": [
+                    {
+                        "Code": snapshot.fence_code,
+                        "start_time": snapshot.start_time,
+                        "end_time": snapshot.end_time,
+                    }
+                    for snapshot in snapshots
+                ],
+            }
+        except (GeofenceAlreadyExistException, InvalidDurationException) as e:
+            logger.error(
+                f"Error while attempting to schedule geofence {schedule.name}: {str(e)}"
+            )
+            raise HTTPException(status_code=400, detail=f"{str(e)}")
+        except Exception as e:
+            logger.error(f"Something went wrong with scheduling geofences: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail="Something went wrong. Contact admin"
+            )
+
+    async def _generate_fence_codes(self, count: int) -> list[str]:
+        """`count` distinct fence codes not yet in use, checked in one query per
+        round. Collisions are rare, so a second round is seldom needed."""
+        fence_codes = set()
+        while len(fence_codes) < count:
+            candidates = {
+                "".join(random.choices(FENCE_CODE_CHARACTERS, k=FENCE_CODE_LENGTH))
+                for _ in range(count - len(fence_codes))
+            } - fence_codes
+            taken = await self.geofenceRepository.get_taken_fence_codes(
+                list(candidates)
+            )
+            fence_codes |= candidates - taken
+        return list(fence_codes)
+
     async def get_all_geofences(
-        self, user_id: Optional[str] = None
+        self,
+        user_id: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
     ) -> Dict[str, any]:  # PLURAL
+        keyset = self._decode_cursor(cursor)
         try:
             if user_id is not None:
                 geofences = await self.geofenceRepository.get_all_geofences_by_user(
-                    user_id
+                    user_id, limit, keyset
                 )
             else:
-                geofences = await self.geofenceRepository.get_all_geofences()
+                geofences = await self.geofenceRepository.get_all_geofences(
+                    limit, keyset
+                )
 
-            if not geofences:
-                return {"geofences": []}
-            return {"geofences": geofences}
+            rows, next_cursor = split_page(
+                geofences, limit, lambda row: (row.Geofence.start_time, row.Geofence.id)
+            )
+            return {
+                "geofences": [
+                    GeofenceOut.model_validate(row.Geofence).model_copy(
+                        update={"attendance_count": row.attendance_count}
+                    )
+                    for row in rows
+                ],
+                "next_cursor": next_cursor,
+            }
 
         except Exception as e:
             logger.error(f"Error fetching all geofences : {str(e)}")
@@ -99,11 +355,15 @@ class GeofenceService:
         self, course_title: str, date: datetime
     ) -> Dict[str, any]:  # SINGULAR
         try:
-            geofence = await self.geofenceRepository.get_geofence(course_title, date)
+            geofence = await self.geofenceRepository.get_geofence(
+                course_title, date, with_attendances=True
+            )
             if not geofence:
                 return None
 
-            return {"geofence": geofence}
+            geofence_out = GeofenceDetailOut.model_validate(geofence)
+            geofence_out.attendance_count = len(geofence_out.student_attendances)
+            return {"geofence": geofence_out}
 
         except Exception as e:
             logger.error(f"Something went wrong in fetching geofence: {str(e)}")
@@ -130,38 +390,32 @@ class GeofenceService:
             )
 
     async def get_geofence_attendances(
-        self, fence_code: str, user_id: str
+        self,
+        fence_code: str,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
     ) -> Dict[str, any]:
-        geofence = await self.geofenceRepository.get_geofence_by_fence_code(
-            fence_code=fence_code
-        )
-        if not geofence:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Geofence with fence code {fence_code} not found",
-            )
-
-        if geofence.creator_matric != user_id:
-            raise HTTPException(
-                status_code=403,
-                detail="You are not authorized to view this geofence's attendance.",
-            )
+        keyset = self._decode_cursor(cursor)
+        await self._get_own_geofence_snapshot(fence_code, user_id)
         try:
-            attendance_list = []
             attendances = await self.geofenceRepository.get_geofence_attendances(
-                fence_code=fence_code
+                fence_code, limit, keyset
+            )
+            attendances, next_cursor = split_page(
+                attendances, limit, lambda row: (row.timestamp, row.id)
             )
-            for attendance in attendances:
-                attendance_list.append(
+            return {
+                "attendance": [
                     {
                         "user_matric": attendance.user_matric,
-                        "username": attendance.user.username,
+                        "username": attendance.username,
                         "fence_code": attendance.fence_code,
                     }
-                )
-            if not attendances:
-                return {"attendance": []}
-            return {"attendance": attendance_list}
+                    for attendance in attendances
+                ],
+                "next_cursor": next_cursor,
+            }
 
         except Exception as e:
             logger.error(
@@ -171,18 +425,172 @@ class GeofenceService:
                 status_code=500, detail="Something went wrong, contact admin."
             )
 
+    async def get_attendance_changes(
+        self,
+        fence_code: str,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, any]:
+        """Check-ins since `cursor`, for clients that keep a copy of the register.
+
+        The returned cursor is always set, so the next call picks up from here
+        even when nothing new arrived. `has_more` means another call would return
+        more rows right away.
+
+        Ids are assigned at insert, not commit, so a lower id can become visible
+        after a higher one. The page therefore stops at the first check-in written
+        in the last few seconds, and the cursor never passes an id whose
+        neighbours may still be committing.
+        """
+        try:
+            after_id = decode_id_cursor(cursor) if cursor is not None else None
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        await self._get_own_geofence_snapshot(fence_code, user_id)
+        settled_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+            seconds=settings.GEOFENCE_SYNC_SETTLE_SECONDS
+        )
+        try:
+            rows = await self.geofenceRepository.get_attendance_changes(
+                fence_code, after_id, limit, settled_before
+            )
+        except Exception as e:
+            logger.error(
+                f"Something went wrong in fetching attendance changes: {str(e)}"
+            )
+            raise HTTPException(
+                status_code=500, detail="Something went wrong, contact admin."
+            )
+
+        rows, has_more = rows[:limit], len(rows) > limit
+        unsettled = next((i for i, row in enumerate(rows) if not row.settled), None)
+        if unsettled is not None:
+            rows, has_more = rows[:unsettled], False
+        return {
+            "attendance": [
+                {
+                    "user_matric": row.user_matric,
+                    "username": row.username,
+                    "fence_code": row.fence_code,
+                    "timestamp": row.timestamp,
+                }
+                for row in rows
+            ],
+            "next_cursor": encode_id_cursor(rows[-1].id if rows else after_id or 0),
+            "has_more": has_more,
+        }
+
+    async def get_geofence_changes(
+        self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> Dict[str, any]:
+        """Geofences created or changed since `cursor`, oldest change first.
+
+        Changes from the last few seconds are held back until the next call.
+        updated_at is stamped by whichever worker made the change, before its
+        commit, so a fresh change could otherwise land behind a cursor already
+        handed out.
+        """
+        keyset = self._decode_cursor(cursor)
+        settled_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+            seconds=settings.GEOFENCE_SYNC_SETTLE_SECONDS
+        )
+        try:
+            geofences = await self.geofenceRepository.get_geofence_changes(
+                limit, keyset, settled_before
+            )
+        except Exception as e:
+            logger.error(f"Something went wrong in fetching geofence changes: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail="Something went wrong, contact admin."
+            )
+
+        geofences, has_more = geofences[:limit], len(geofences) > limit
+        return {
+            "geofences": [
+                GeofenceOut.model_validate(geofence) for geofence in geofences
+            ],
+            "next_cursor": (
+                encode_cursor(geofences[-1].updated_at, geofences[-1].id)
+                if geofences
+                else cursor
+            ),
+            "has_more": has_more,
+        }
+
+    async def get_attendance_count(self, fence_code: str, user_id: str):
+        """How many students have checked in, read from the fence's Redis attendee
+        set when it is loaded and otherwise from the counts table, as of the last
+        lifecycle round."""
+        await self._get_own_geofence_snapshot(fence_code, user_id)
+
+        attendance_count = None
+        if self.attendee_sets is not None:
+            try:
+                attendance_count = await self.attendee_sets.count(fence_code)
+            except Exception as e:
+                logger.error(f"Attendee set unavailable for {fence_code}: {str(e)}")
+        if attendance_count is None:
+            attendance_count = await self.geofenceRepository.get_attendance_count(
+                fence_code
+            )
+
+        return {"fence_code": fence_code, "attendance_count": attendance_count}
+
+    async def _get_own_geofence_snapshot(
+        self, fence_code: str, user_id: str
+    ) -> GeofenceSnapshot:
+        geofence = await self._get_geofence_snapshot(fence_code)
+        if not geofence:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Geofence with fence code {fence_code} not found",
+            )
+
+        if geofence.creator_matric != user_id:
+            raise HTTPException(
+                status_code=403,
+                detail="You are not authorized to view this geofence's attendance.",
+            )
+        return geofence
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]):
+        if cursor is None:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     async def record_geofence_attendance(
         self,
         attendance: AttendanceRecordModel,
         user_matric: str,
-        user_service: Annotated[UserService, Depends(get_user_service)],
+        username: Optional[str] = None,
     ):
-        user = await user_service.get_user_by_email_or_matric(matric=user_matric)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found.")
-        geofence = await self.geofenceRepository.get_geofence_by_fence_code(
-            attendance.fence_code
-        )
+        """Records a check-in with one lean fence lookup and one INSERT.
+
+        The student comes from their session, so there is no user lookup, and
+        duplicates are rejected by the INSERT itself rather than a prior SELECT.
+        """
+        now = datetime.now(ZoneInfo("UTC"))
+        if attendance.fence_code is None:
+            located_geofence = None
+            if self.geofence_index is not None:
+                located_geofence = self.geofence_index.find(
+                    attendance.lat, attendance.long, now
+                )
+            if located_geofence is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail="No active geofence found at your location.",
+                )
+            attendance = attendance.model_copy(
+                update={"fence_code": located_geofence.fence_code}
+            )
+
+        geofence = await self._get_geofence_snapshot(attendance.fence_code)
         if not geofence:
             raise HTTPException(
                 status_code=404,
@@ -190,31 +598,33 @@ class GeofenceService:
             )
 
         try:
-            if geofence.status.lower() != "active":
+            # The stored status only catches up with the clock on the next
+            # lifecycle round, so the fence's times decide. The status still
+            # rules out fences that were ended early.
+            if geofence.status.lower() == "inactive" or not (
+                geofence.start_time <= now < geofence.end_time
+            ):
                 raise GeofenceStatusException("Geofence is not active for attendance.")
 
-            matric_fence_code = geofence.fence_code + user["user_matric"]
-            existing_record = await self.geofenceRepository.get_attendance_record_for_student_for_geofence(
-                matric_fence_code
-            )
-            if existing_record:
-                raise AlreadyRecordedAttendanceException(
-                    "You have already recorded attendance for this class",
-                )
-
-            if not check_user_in_circular_geofence(
-                attendance.lat, attendance.long, geofence
-            ):
+            if not check_user_in_geofence(attendance.lat, attendance.long, geofence):
                 raise UserNotInGeofenceException(
                     "User is not within geofence, attendance not recorded",
                 )
 
-            await self.geofenceRepository.record_geofence_attendance(
-                attendance=attendance,
-                user_matric=user["user_matric"],
-                geofence_name=geofence.name,
-                matric_fence_code=matric_fence_code,
-            )
+            matric_fence_code = geofence.fence_code + user_matric
+            if self.attendance_stream is not None:
+                recorded = await self._queue_geofence_attendance(
+                    geofence, user_matric, matric_fence_code
+                )
+            else:
+                recorded = await self._write_geofence_attendance(
+                    geofence, user_matric, matric_fence_code
+                )
+            if not recorded:
+                raise AlreadyRecordedAttendanceException(
+                    "You have already recorded attendance for this class",
+                )
+            await self._publish_attendance(geofence, user_matric, username)
             return {"message": "Attendance recorded successfully"}
 
         except GeofenceStatusException as e:
@@ -229,10 +639,158 @@ class GeofenceService:
                 status_code=500, detail="Something went wrong, contact admin"
             )
 
+    async def _claim_attendee_seat(
+        self,
+        geofence: GeofenceSnapshot,
+        user_matric: str,
+        stream_record: Optional[dict] = None,
+    ) -> bool:
+        """Adds the student to the fence's Redis attendee set.
+
+        Returns False if they were already in it. A set that expired or was
+        evicted is rebuilt from MySQL once and the claim retried.
+        """
+        result = await self.attendee_sets.claim(
+            geofence.fence_code, user_matric, geofence.end_time, stream_record
+        )
+        if result == CLAIM_NOT_LOADED:
+            user_matrics = await self.geofenceRepository.get_geofence_attendee_matrics(
+                geofence.fence_code
+            )
+            await self.attendee_sets.load(
+                geofence.fence_code, user_matrics, geofence.end_time
+            )
+            result = await self.attendee_sets.claim(
+                geofence.fence_code, user_matric, geofence.end_time, stream_record
+            )
+        return result == CLAIM_ACCEPTED
+
+    async def _write_geofence_attendance(
+        self, geofence: GeofenceSnapshot, user_matric: str, matric_fence_code: str
+    ) -> bool:
+        """Synchronous path: the attendee set screens out duplicates, the INSERT
+        stays authoritative."""
+        claimed = None
+        if self.attendee_sets is not None:
+            try:
+                claimed = await self._claim_attendee_seat(geofence, user_matric)
+            except Exception as e:
+                logger.error(f"Attendee set unavailable, using MySQL only: {str(e)}")
+            if claimed is False:
+                return False
+
+        try:
+            recorded = await self.geofenceRepository.record_geofence_attendance(
+                fence_code=geofence.fence_code,
+                user_matric=user_matric,
+                geofence_name=geofence.name,
+                matric_fence_code=matric_fence_code,
+            )
+        except Exception:
+            if claimed:
+                await self.attendee_sets.release(geofence.fence_code, user_matric)
+            raise
+
+        if recorded and self.records_cache is not None:
+            try:
+                await self.records_cache.invalidate([user_matric])
+            except Exception as e:
+                logger.error(f"Failed to invalidate records of {user_matric}: {str(e)}")
+        return recorded
+
+    async def _queue_geofence_attendance(
+        self, geofence: GeofenceSnapshot, user_matric: str, matric_fence_code: str
+    ) -> bool:
+        """Write-behind path: acknowledges the check-in once it is on the stream.
+
+        With attendee sets, the duplicate check and the stream append are one
+        atomic script call. Without them, records already in MySQL are rejected
+        and a duplicate still waiting in the stream is collapsed by the unique
+        index when the batch is flushed.
+        """
+        record = AttendanceStream.encode(
+            user_matric=user_matric,
+            fence_code=geofence.fence_code,
+            geofence_name=geofence.name,
+            matric_fence_code=matric_fence_code,
+            timestamp=datetime.now(ZoneInfo("UTC")),
+        )
+        if self.attendee_sets is not None:
+            return await self._claim_attendee_seat(geofence, user_matric, record)
+
+        if await self.geofenceRepository.attendance_exists(matric_fence_code):
+            return False
+
+        await self.attendance_stream.append(record)
+        return True
+
+    async def _publish_attendance(
+        self, geofence: GeofenceSnapshot, user_matric: str, username: Optional[str]
+    ):
+        if self.redis_client is None:
+            return
+        try:
+            await publish_attendance_event(
+                self.redis_client,
+                geofence.fence_code,
+                {
+                    "user_matric": user_matric,
+                    "username": username,
+                    "fence_code": geofence.fence_code,
+                    "timestamp": datetime.now(ZoneInfo("UTC")).isoformat(),
+                },
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to publish check-in to {geofence.fence_code}: {str(e)}"
+            )
+
+    async def get_attendance_feed(self, fence_code: str, user_id: str):
+        """Server-Sent Events stream of check-ins to one of the admin's fences, as
+        they are accepted, until the fence closes."""
+        geofence = await self._get_own_geofence_snapshot(fence_code, user_id)
+        if self.attendance_feed is None:
+            raise HTTPException(status_code=503, detail="Live feed is unavailable.")
+
+        return StreamingResponse(
+            self._relay_attendance_feed(geofence),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def _relay_attendance_feed(
+        self, geofence: GeofenceSnapshot
+    ) -> AsyncIterator[str]:
+        queue = self.attendance_feed.subscribe(geofence.fence_code)
+        try:
+            while True:
+                seconds_left = (
+                    geofence.end_time - datetime.now(ZoneInfo("UTC"))
+                ).total_seconds()
+                if seconds_left <= 0:
+                    break
+                heartbeat = settings.ATTENDANCE_FEED_HEARTBEAT_SECONDS
+                try:
+                    raw_event = await asyncio.wait_for(
+                        queue.get(), min(seconds_left, heartbeat)
+                    )
+                except asyncio.TimeoutError:
+                    if seconds_left > heartbeat:
+                        # Comment line, keeps proxies from closing an idle connection
+                        yield ": keep-alive\n\n"
+                    continue
+                yield f"event: attendance\ndata: {raw_event}\n\n"
+            yield "event: closed\ndata: {}\n\n"
+        finally:
+            # Also runs when the client disconnects and the response is cancelled
+            self.attendance_feed.unsubscribe(geofence.fence_code, queue)
+
     async def deactivate_geofence(
         self, geofence_name: str, date: datetime, user_matric: str
     ):
-        geofence = await self.geofenceRepository.get_geofence(geofence_name, date)
+        geofence = await self.geofenceRepository.get_geofence_snapshot_for_day(
+            geofence_name, date
+        )
 
         if geofence is None:
             raise HTTPException(
@@ -247,9 +805,8 @@ class GeofenceService:
             if geofence.status == "inactive":
                 raise GeofenceStatusException("Geofence is already inactive")
 
-            await self.geofenceRepository.deactivate_geofence(
-                geofence_name=geofence.name, date=date
-            )
+            await self.geofenceRepository.deactivate_geofence(geofence.fence_code)
+            await self._unindex_geofence(geofence.fence_code)
             return {"message": "Geofence deactivated successfully"}
 
         except GeofenceStatusException as e:
@@ -264,5 +821,23 @@ class GeofenceService:
 # Dependency Resolver function
 def get_geofence_service(
     geofence_repository: GeofenceRepositoryDependency,
+    redis_client: RedisClientDependency,
+    geofence_index: GeofenceIndexDependency,
+    geofence_cache: GeofenceCacheDependency,
+    attendance_stream: AttendanceStreamDependency,
+    attendee_sets: AttendeeSetDependency,
+    records_cache: StudentRecordsCacheDependency,
+    attendance_feed: AttendanceFeedDependency,
 ) -> GeofenceService:
-    return GeofenceService(geofence_repository=geofence_repository)
+    return GeofenceService(
+        geofence_repository=geofence_repository,
+        redis_client=redis_client,
+        geofence_index=geofence_index,
+        geofence_cache=geofence_cache,
+        attendance_stream=(
+            attendance_stream if settings.ATTENDANCE_WRITE_BEHIND else None
+        ),
+        attendee_sets=attendee_sets,
+        records_cache=records_cache,
+        attendance_feed=attendance_feed,
+    )
@@ -1,3 +1,4 @@
+import json
 import logging
 import random
 from typing import Annotated, Optional, Dict, Any, Union
@@ -6,13 +7,17 @@ from datetime import timedelta, datetime
 
 from redis.asyncio import Redis
 from fastapi import BackgroundTasks, HTTPException, Depends
-from passlib.context import CryptContext
 from pydantic import EmailStr
 from jose import JWTError, jwt
 
 from ..models import User
-from ..redis import get_redis_client
+from ..redis import (
+    get_redis_client,
+    StudentRecordsCache,
+    get_student_records_cache,
+)
 from .EmailService import send_email
+from ..auth.sessions import SessionStore
 from ..exceptions import *
 from ..repositories import (
     PasswordResetTokenRepository,
@@ -20,20 +25,29 @@ from ..repositories import (
     UserRepository,
     get_user_repository,
 )
-from ..schemas import UserCreateModel
+from ..schemas import UserCreateModel, AttendanceSummaryOut
 from ..utils import (
     PASSWORD_RESET_TOKEN_EXPIRY_MINUTES,
     EMAIL_SUBJECTS,
     PASSWORD_MIN_LENGTH,
     get_app_settings
 )
+from ..utils.Pagination import (
+    DEFAULT_PAGE_SIZE,
+    InvalidCursorError,
+    decode_cursor,
+    naive_utc,
+    split_page,
+)
+from ..utils.PasswordHasher import PasswordHasher, password_hasher
 
-# Create a password context for hashing
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 logger = logging.getLogger("uvicorn")
 settings = get_app_settings()
 # Dependencies
 RedisClientDependency = Annotated[Redis, Depends(get_redis_client)]
+StudentRecordsCacheDependency = Annotated[
+    StudentRecordsCache, Depends(get_student_records_cache)
+]
 UserRepositoryDependency = Annotated[UserRepository, Depends(get_user_repository)]
 PRTDependency = Annotated[
     PasswordResetTokenRepository, Depends(get_password_reset_token_repository)
@@ -46,8 +60,12 @@ class UserService:
         redis_client: Optional[Redis] = None,
         user_repository: UserRepository = None,
         password_reset_token_repository: Optional[PasswordResetTokenRepository] = None,
+        records_cache: Optional[StudentRecordsCache] = None,
+        password_hasher: PasswordHasher = password_hasher,
     ):
         self.redis_client: Redis = redis_client
+        self.password_hasher: PasswordHasher = password_hasher
+        self.records_cache: StudentRecordsCache = records_cache
         self.user_repository: UserRepository = user_repository
         self.password_reset_token_repository: PasswordResetTokenRepository = (
             password_reset_token_repository
@@ -77,7 +95,7 @@ class UserService:
             if int(cached_code) != int(user_data.verification_code):
                 raise VerificationCodeError("Invalid verification code")
 
-            hashed_password = bcrypt_context.hash(user_data.password)
+            hashed_password = await self.password_hasher.hash(user_data.password)
 
             return await self.user_repository.create_new_user(
                 user_data, hashed_password
@@ -157,7 +175,9 @@ class UserService:
             )
 
         try:
-            user = await self.user_repository.get_user_by_email_or_matric(email, matric)
+            user = await self.user_repository.get_user_by_email_or_matric(
+                email, matric, with_attendances=True
+            )
             if user is None:
                 raise UserNotFoundError(
                     f"User with email {email} or matric {matric} not found"
@@ -184,33 +204,52 @@ class UserService:
             )
 
     async def get_user_records(
-        self, user_matric: str, course_title: Optional[str] = None
+        self,
+        user_matric: str,
+        course_title: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Retrieve user attendance records, optionally filtered by course"""
+        """Retrieve a page of user attendance records, optionally filtered by course
+        and check-in time. Pages are cached per student until their next check-in."""
         try:
-            user = await self.user_repository.get_user_by_email_or_matric(
-                matric=user_matric
-            )
-
-            if not user:
-                raise UserNotFoundError(f"User with matric {user_matric} not found")
-
-            if not user.attendances:
-                return {"attendance": []}
-
-            if course_title is None:
-                return {"attendance": user.attendances}
+            keyset = decode_cursor(cursor) if cursor is not None else None
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-            filtered_attendances = [
-                attendance
-                for attendance in user.attendances
-                if attendance.course_title == course_title
-            ]
-            return {"attendance": filtered_attendances}
+        # Identifies this page among the student's cached pages
+        query = json.dumps([course_title, start, end, limit, cursor], default=str)
+        version = None
+        if self.records_cache is not None:
+            try:
+                version = await self.records_cache.version(user_matric)
+                cached_page = await self.records_cache.get(user_matric, version, query)
+                if cached_page is not None:
+                    return cached_page
+            except Exception as e:
+                logger.error(f"Records cache unavailable for {user_matric}: {str(e)}")
 
-        except UserNotFoundError as e:
-            logger.warning(str(e))
-            raise HTTPException(status_code=404, detail=str(e))
+        try:
+            rows = await self.user_repository.get_user_attendances(
+                user_matric,
+                limit,
+                keyset,
+                geofence_name=course_title,
+                start=naive_utc(start),
+                end=naive_utc(end),
+            )
+            rows, next_cursor = split_page(
+                rows, limit, lambda row: (row.timestamp, row.id)
+            )
+            page = {
+                "attendance": [
+                    AttendanceSummaryOut.model_validate(row).model_dump(mode="json")
+                    for row in rows
+                ],
+                "next_cursor": next_cursor,
+            }
         except Exception as e:
             logger.error(
                 f"Error fetching records for user {user_matric}", exc_info=True
@@ -219,6 +258,13 @@ class UserService:
                 status_code=500, detail="Something went wrong, contact admin."
             )
 
+        if version is not None:
+            try:
+                await self.records_cache.set(user_matric, version, query, page)
+            except Exception as e:
+                logger.error(f"Records cache write failed for {user_matric}: {str(e)}")
+        return page
+
     async def _generate_password_reset_token(
         self,
         email: EmailStr,
@@ -497,7 +543,7 @@ class UserService:
     ) -> Dict[str, str]:
         """Send password reset email to user"""
         try:
-            user = await self.get_user_by_email_or_matric(email=user_email)
+            user = await self.user_repository.get_user_credentials(email=user_email)
             if user is None:
                 # Return success even if user doesn't exist for security reasons
                 return {
@@ -506,23 +552,23 @@ class UserService:
 
             # Generate token and reset link
             token = await self._generate_password_reset_token(
-                email=user["user_email"],
-                username=user["user_username"],
-                user_matric=user["user_matric"],
+                email=user.email,
+                username=user.username,
+                user_matric=user.user_matric,
             )
 
             reset_link = f"{settings.BASE_URL}user/student/reset_password?token={token}"
 
             # Generate email body
             body = await self._get_password_reset_email_template(
-                username=user["user_username"], reset_link=reset_link
+                username=user.username, reset_link=reset_link
             )
 
             # Send email as background task
             background_tasks.add_task(
                 send_email,
                 subject=EMAIL_SUBJECTS["PASSWORD_RESET"],
-                recipients=[user["user_email"]],
+                recipients=[user.email],
                 body=body,
             )
 
@@ -559,13 +605,13 @@ class UserService:
             user = await self._decode_password_reset_token(token)
 
             # Hash and update password
-            new_hashed_password = bcrypt_context.hash(new_password)
+            new_hashed_password = await self.password_hasher.hash(new_password)
             change_password_message = await self.user_repository.change_user_password(
                 user_email=user["email"], new_hashed_password=new_hashed_password
             )
 
             # Deactivate all user sessions for security
-            await self.redis_client.delete(f"user:{user['user_matric']}")
+            await SessionStore(self.redis_client).end_user_session(user["user_matric"])
 
             # Send confirmation email
             body = await self._get_password_changed_email_template(
@@ -595,9 +641,11 @@ def get_user_service(
     redis_client: RedisClientDependency,
     user_repository: UserRepositoryDependency,
     password_reset_token_repository: PRTDependency,
+    records_cache: StudentRecordsCacheDependency,
 ) -> UserService:
     return UserService(
         redis_client=redis_client,
         user_repository=user_repository,
         password_reset_token_repository=password_reset_token_repository,
+        records_cache=records_cache,
     )
@@ -1,2 +1,7 @@
 from .UserService import UserService, get_user_service
 from .GeofenceService import GeofenceService, get_geofence_service
+
+from .AttendanceFlusher import AttendanceFlusher
+from .GeofenceLifecycle import GeofenceLifecycleScheduler
+from .AttendanceExporter import AttendanceExporter, get_attendance_exporter
+from .AnalyticsService import AnalyticsService, get_analytics_service
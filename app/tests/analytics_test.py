@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AttendanceRecord, Geofence
+from ..repositories import AnalyticsRepository
+from ..services import AnalyticsService
+
+START = datetime(2025, 3, 24, 8, 0)
+TERM = (datetime(2025, 3, 1), datetime(2025, 7, 1))
+
+
+def fence(fence_code, name, start_time, creator_matric="lecturer"):
+    return Geofence(
+        fence_code=fence_code,
+        name=name,
+        latitude=7.4,
+        longitude=3.9,
+        radius=50,
+        fence_type="circle",
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=1),
+        status="inactive",
+        creator_matric=creator_matric,
+    )
+
+
+def check_in(fence_code, name, user_matric):
+    return AttendanceRecord(
+        user_matric=user_matric,
+        fence_code=fence_code,
+        geofence_name=name,
+        timestamp=START,
+        matric_fence_code=fence_code + user_matric,
+    )
+
+
+async def seed(session):
+    session.add_all(
+        [
+            fence("w1", "CSC 101", START),
+            fence("w2", "CSC 101", START + timedelta(days=7)),
+            fence("w3", "CSC 101", START + timedelta(days=14)),
+            fence("x1", "CSC 101", START, creator_matric="someone else"),
+            fence("m1", "MTH 101", START),
+            fence("m2", "MTH 101", START + timedelta(days=1)),
+        ]
+    )
+    session.add_all(
+        [
+            check_in("w1", "CSC 101", "2021/1"),
+            check_in("w2", "CSC 101", "2021/1"),
+            check_in("w3", "CSC 101", "2021/1"),
+            check_in("w2", "CSC 101", "2021/2"),
+            check_in("x1", "CSC 101", "2021/3"),
+            check_in("m1", "MTH 101", "2021/1"),
+        ]
+    )
+    await session.commit()
+
+
+class DictCache:
+    def __init__(self):
+        self.states = {}
+
+    async def get(self, *scope):
+        return self.states.get(scope)
+
+    async def set(self, *args):
+        self.states[args[:-1]] = args[-1]
+
+
+@pytest.mark.asyncio
+async def test_course_matrix_and_rates(engine):
+    async with AsyncSession(engine) as session:
+        await seed(session)
+        service = AnalyticsService(analytics_repository=AnalyticsRepository(session))
+        analytics = await service.get_course_analytics("lecturer", "CSC 101", *TERM)
+
+    assert [s["fence_code"] for s in analytics["sessions"]] == ["w1", "w2", "w3"]
+    assert analytics["matrix"] == {"2021/1": [1, 1, 1], "2021/2": [0, 1, 0]}
+    assert analytics["students"] == [
+        {"user_matric": "2021/1", "attended": 3, "attendance_rate": 1.0},
+        {"user_matric": "2021/2", "attended": 1, "attendance_rate": 0.3333},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cached_course_state_is_refreshed_incrementally(engine):
+    course_cache = DictCache()
+    async with AsyncSession(engine) as session:
+        await seed(session)
+        repository = AnalyticsRepository(session)
+        service = AnalyticsService(
+            analytics_repository=repository,
+            course_cache=course_cache,
+            watermark_lookback=0,
+        )
+        await service.get_course_analytics("lecturer", "CSC 101", *TERM)
+        (state,) = course_cache.states.values()
+        assert state["watermark"] == 4
+
+        session.add(check_in("w3", "CSC 101", "2021/2"))
+        await session.commit()
+
+        repository.get_session_attendees = AsyncMock(
+            wraps=repository.get_session_attendees
+        )
+        analytics = await service.get_course_analytics("lecturer", "CSC 101", *TERM)
+
+    # Only check-ins above the watermark are read again
+    assert repository.get_session_attendees.await_args.args[1] == 4
+    assert analytics["matrix"]["2021/2"] == [0, 1, 1]
+    assert course_cache.states[next(iter(course_cache.states))]["watermark"] == 7
+
+
+@pytest.mark.asyncio
+async def test_student_rates_per_course(engine):
+    async with AsyncSession(engine) as session:
+        await seed(session)
+        service = AnalyticsService(analytics_repository=AnalyticsRepository(session))
+        rates = await service.get_student_attendance_rates("2021/1", *TERM)
+
+    assert rates["courses"] == [
+        {
+            "course_title": "CSC 101",
+            "creator_matric": "lecturer",
+            "attended": 3,
+            "sessions": 3,
+            "attendance_rate": 1.0,
+        },
+        {
+            "course_title": "MTH 101",
+            "creator_matric": "lecturer",
+            "attended": 1,
+            "sessions": 2,
+            "attendance_rate": 0.5,
+        },
+    ]
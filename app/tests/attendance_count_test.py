@@ -0,0 +1,132 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Geofence
+from ..repositories import GeofenceRepository
+from ..repositories.GeofenceRepository import (
+    _insert_new_attendance,
+    _recount_attendance,
+)
+
+START = datetime(2025, 3, 24, 8, 0)
+
+
+def record(fence_code, user_matric):
+    return {
+        "user_matric": user_matric,
+        "fence_code": fence_code,
+        "geofence_name": "CSC 101",
+        "timestamp": START,
+        "matric_fence_code": fence_code + user_matric,
+    }
+
+
+async def add_fence(session, fence_code):
+    session.add(
+        Geofence(
+            fence_code=fence_code,
+            name="CSC 101",
+            latitude=7.4,
+            longitude=3.9,
+            radius=50,
+            fence_type="circle",
+            start_time=START,
+            end_time=START,
+            status="active",
+            creator_matric="lecturer",
+        )
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_check_ins_are_counted_once_per_student_on_recount(engine):
+    async with AsyncSession(engine) as session:
+        await add_fence(session, "abc123")
+        repository = GeofenceRepository(session)
+
+        for user_matric in ["2021/1", "2021/2", "2021/1"]:
+            await repository.record_geofence_attendance(
+                "abc123", user_matric, "CSC 101", "abc123" + user_matric
+            )
+        # The check-ins themselves leave the counts table alone
+        assert await repository.get_attendance_count("abc123") == 0
+
+        await repository.recount_open_attendance(START, ["abc123"])
+
+        assert await repository.get_attendance_count("abc123") == 2
+        assert await repository.get_attendance_count("nobody") == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_flush_recounts_affected_fences_exactly(engine):
+    async with AsyncSession(engine) as session:
+        repository = GeofenceRepository(session)
+        await repository.record_geofence_attendance(
+            "abc123", "2021/1", "CSC 101", "abc1232021/1"
+        )
+
+        batch = [record("abc123", "2021/1"), record("abc123", "2021/2")]
+        batch.append(record("xyz789", "2021/1"))
+        await repository.bulk_record_geofence_attendances(batch)
+        # A redelivered batch changes nothing
+        await repository.bulk_record_geofence_attendances(batch)
+
+        assert await repository.get_attendance_count("abc123") == 2
+        assert await repository.get_attendance_count("xyz789") == 1
+
+
+@pytest.mark.asyncio
+async def test_listings_carry_the_count(engine):
+    async with AsyncSession(engine) as session:
+        await add_fence(session, "abc123")
+        await add_fence(session, "empty1")
+        await GeofenceRepository(session).bulk_record_geofence_attendances(
+            [record("abc123", "2021/1"), record("abc123", "2021/2")]
+        )
+
+        rows = await GeofenceRepository(session).get_all_geofences(10)
+
+    counts = {row.Geofence.fence_code: row.attendance_count for row in rows}
+    assert counts == {"abc123": 2, "empty1": 0}
+
+
+def test_mysql_recount_uses_on_duplicate_key_update():
+    recount = str(
+        _recount_attendance("mysql", {"abc123"}).compile(dialect=mysql.dialect())
+    )
+
+    assert (
+        "INSERT INTO geofenceattendancecounts (fence_code, attendance_count) SELECT"
+        in recount
+    )
+    assert "attendance_count = VALUES(attendance_count)" in recount
+
+
+@pytest.mark.asyncio
+async def test_only_duplicates_are_skipped(engine):
+    async with AsyncSession(engine) as session:
+        await add_fence(session, "abc123")
+        await session.execute(text("PRAGMA foreign_keys = ON"))
+        repository = GeofenceRepository(session)
+
+        with pytest.raises(IntegrityError):
+            await repository.record_geofence_attendance(
+                "nofence", "2021/1", "CSC 101", "nofence2021/1"
+            )
+        with pytest.raises(IntegrityError):
+            await repository.bulk_record_geofence_attendances(
+                [record("nofence", "2021/1")]
+            )
+
+
+def test_mysql_batches_skip_only_duplicate_keys():
+    statement = str(_insert_new_attendance("mysql").compile(dialect=mysql.dialect()))
+
+    assert "IGNORE" not in statement
+    assert "ON DUPLICATE KEY UPDATE id = attendancerecords.id" in statement
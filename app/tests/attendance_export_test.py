@@ -0,0 +1,130 @@
+import contextlib
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AttendanceRecord, Geofence, User
+from ..services import AttendanceExporter
+
+START = datetime(2025, 3, 24, 8, 0)
+
+
+async def seed(engine):
+    async with AsyncSession(engine) as session:
+        session.add_all(
+            User(
+                user_matric=f"2021/{i}",
+                email=f"{i}@example.com",
+                is_email_verified=True,
+                username=f"student {i}",
+                hashed_password="x",
+                role="student",
+            )
+            for i in range(3)
+        )
+        for fence_code, name, creator, day in [
+            ("mine1", "CSC 101", "lecturer", 0),
+            ("mine2", "CSC 102", "lecturer", 1),
+            ("theirs", "CSC 101", "someone-else", 0),
+        ]:
+            session.add(
+                Geofence(
+                    fence_code=fence_code,
+                    name=name,
+                    latitude=7.4,
+                    longitude=3.9,
+                    radius=50,
+                    fence_type="circle",
+                    start_time=START + timedelta(days=day),
+                    end_time=START + timedelta(days=day, hours=1),
+                    status="inactive",
+                    creator_matric=creator,
+                )
+            )
+            session.add_all(
+                AttendanceRecord(
+                    user_matric=f"2021/{i}",
+                    fence_code=fence_code,
+                    geofence_name=name,
+                    timestamp=START + timedelta(days=day, minutes=i),
+                    matric_fence_code=f"{fence_code}2021/{i}",
+                )
+                for i in range(3)
+            )
+        await session.commit()
+
+
+def exporter_for(engine):
+    @contextlib.asynccontextmanager
+    async def session_factory():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    return AttendanceExporter(session_factory=session_factory)
+
+
+async def collect(chunks) -> str:
+    return "".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+async def test_csv_export_covers_only_the_lecturers_fences(engine):
+    await seed(engine)
+
+    body = await collect(exporter_for(engine).stream("lecturer", "csv"))
+
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == [
+        "user_matric",
+        "username",
+        "fence_code",
+        "geofence_name",
+        "timestamp",
+    ]
+    assert [row[2] for row in rows[1:]] == ["mine1"] * 3 + ["mine2"] * 3
+    assert rows[1] == [
+        "2021/0",
+        "student 0",
+        "mine1",
+        "CSC 101",
+        "2025-03-24T08:00:00+00:00",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_filters_by_course_and_date_range(engine):
+    await seed(engine)
+    exporter = exporter_for(engine)
+
+    by_course = await collect(
+        exporter.stream("lecturer", "ndjson", course_title="CSC 102")
+    )
+    by_range = await collect(
+        exporter.stream(
+            "lecturer", "ndjson", start=START, end=START + timedelta(days=1)
+        )
+    )
+
+    assert {json.loads(line)["fence_code"] for line in by_course.splitlines()} == {
+        "mine2"
+    }
+    assert {json.loads(line)["fence_code"] for line in by_range.splitlines()} == {
+        "mine1"
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_of_no_rows_is_just_the_header(engine):
+    await seed(engine)
+
+    body = await collect(
+        exporter_for(engine).stream("lecturer", "csv", fence_code="theirs")
+    )
+
+    assert body.splitlines() == [
+        "user_matric,username,fence_code,geofence_name,timestamp"
+    ]
@@ -0,0 +1,61 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from ..redis import AttendanceFeedHub
+from ..services import GeofenceService
+
+
+def test_hub_fans_out_and_drops_for_slow_feeds():
+    hub = AttendanceFeedHub(queue_size=1)
+    first, second = hub.subscribe("abc123"), hub.subscribe("abc123")
+    other = hub.subscribe("xyz789")
+
+    hub.dispatch("abc123", "one")
+    hub.dispatch("abc123", "two")
+
+    assert first.get_nowait() == second.get_nowait() == "one"
+    assert first.empty() and other.empty()
+
+    hub.unsubscribe("abc123", first)
+    hub.unsubscribe("abc123", second)
+    assert "abc123" not in hub._feeds
+
+
+@pytest.mark.asyncio
+async def test_feed_relays_check_ins_until_the_fence_closes(make_snapshot):
+    hub = AttendanceFeedHub()
+    mock_geofence_repo = AsyncMock()
+    mock_geofence_repo.get_geofence_snapshot.return_value = make_snapshot(
+        "abc123", end_time=datetime.now(ZoneInfo("UTC")) + timedelta(milliseconds=300)
+    )
+    service = GeofenceService(
+        geofence_repository=mock_geofence_repo, attendance_feed=hub
+    )
+
+    response = await service.get_attendance_feed("abc123", "lecturer")
+    frames = response.body_iterator
+    next_frame = asyncio.ensure_future(frames.__anext__())
+    await asyncio.sleep(0)
+    hub.dispatch("abc123", '{"user_matric": "2021/1"}')
+
+    assert await next_frame == 'event: attendance\ndata: {"user_matric": "2021/1"}\n\n'
+    assert [frame async for frame in frames] == ["event: closed\ndata: {}\n\n"]
+    assert not hub._feeds
+
+
+@pytest.mark.asyncio
+async def test_feed_is_only_for_the_fence_creator(make_snapshot):
+    mock_geofence_repo = AsyncMock()
+    mock_geofence_repo.get_geofence_snapshot.return_value = make_snapshot("abc123")
+    service = GeofenceService(
+        geofence_repository=mock_geofence_repo, attendance_feed=AttendanceFeedHub()
+    )
+
+    with pytest.raises(Exception) as exc_info:
+        await service.get_attendance_feed("abc123", "someone else")
+
+    assert exc_info.value.status_code == 403
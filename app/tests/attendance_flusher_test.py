@@ -0,0 +1,224 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AttendanceRecord
+from ..redis import AttendanceStream
+from ..redis.AttendanceStream import (
+    ATTENDANCE_CONSUMER_GROUP,
+    ATTENDANCE_DEAD_STREAM,
+    ATTENDANCE_STREAM,
+)
+from ..repositories import GeofenceRepository
+from ..services import AttendanceFlusher
+
+START = datetime(2025, 3, 24, 8, 0)
+
+
+def entry(entry_id, user_matric, fence_code="abc123"):
+    return entry_id, AttendanceStream.encode(
+        user_matric, fence_code, "CSC 101", fence_code + user_matric, START
+    )
+
+
+def mock_stream(stale=(), new=()):
+    stream = AsyncMock()
+    stream.claim_stale.return_value = list(stale)
+    stream.read_new.return_value = list(new)
+    return stream
+
+
+def session_factory(engine):
+    @asynccontextmanager
+    async def factory():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    return factory
+
+
+async def stored_matrics(engine):
+    async with AsyncSession(engine) as session:
+        result = await session.execute(
+            select(AttendanceRecord.user_matric).order_by(AttendanceRecord.user_matric)
+        )
+        return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_batch_is_written_once_then_acknowledged(engine):
+    stream = mock_stream(
+        new=[entry("1-0", "2021/1"), entry("2-0", "2021/2"), entry("3-0", "2021/1")]
+    )
+    records_cache = AsyncMock()
+    flusher = AttendanceFlusher(
+        stream, session_factory=session_factory(engine), records_cache=records_cache
+    )
+
+    assert await flusher.flush_once() == 3
+
+    # The redelivered duplicate is skipped by the unique index, not an error
+    assert await stored_matrics(engine) == ["2021/1", "2021/2"]
+    stream.ack.assert_awaited_once_with(["1-0", "2-0", "3-0"])
+    records_cache.invalidate.assert_awaited_once_with({"2021/1", "2021/2"})
+    async with AsyncSession(engine) as session:
+        assert await GeofenceRepository(session).get_attendance_count("abc123") == 2
+
+
+@pytest.mark.asyncio
+async def test_replayed_batch_is_harmless(engine):
+    batch = [entry("1-0", "2021/1"), entry("2-0", "2021/2")]
+    for _ in range(2):
+        flusher = AttendanceFlusher(
+            mock_stream(new=batch), session_factory=session_factory(engine)
+        )
+        await flusher.flush_once()
+
+    assert await stored_matrics(engine) == ["2021/1", "2021/2"]
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_acknowledged_when_the_write_fails(engine, monkeypatch):
+    monkeypatch.setattr(
+        GeofenceRepository,
+        "bulk_record_geofence_attendances",
+        AsyncMock(side_effect=RuntimeError("database down")),
+    )
+    stream = mock_stream(new=[entry("1-0", "2021/1")])
+    records_cache = AsyncMock()
+    flusher = AttendanceFlusher(
+        stream, session_factory=session_factory(engine), records_cache=records_cache
+    )
+
+    with pytest.raises(RuntimeError):
+        await flusher.flush_once()
+
+    stream.ack.assert_not_awaited()
+    records_cache.invalidate.assert_not_awaited()
+
+
+def reject_poison(monkeypatch):
+    """Makes any write including the student "poison" fail like a bad row."""
+    bulk_record = GeofenceRepository.bulk_record_geofence_attendances
+
+    async def bulk_record_geofence_attendances(repository, records):
+        if any(record["user_matric"] == "poison" for record in records):
+            raise IntegrityError("INSERT", {}, Exception("foreign key"))
+        await bulk_record(repository, records)
+
+    monkeypatch.setattr(
+        GeofenceRepository,
+        "bulk_record_geofence_attendances",
+        bulk_record_geofence_attendances,
+    )
+
+
+@pytest.mark.asyncio
+async def test_bad_entry_does_not_hold_back_the_batch(engine, monkeypatch):
+    reject_poison(monkeypatch)
+    poison = entry("2-0", "poison")
+    stream = mock_stream(new=[entry("1-0", "2021/1"), poison, entry("3-0", "2021/2")])
+    stream.delivery_counts.return_value = {"2-0": 1}
+    flusher = AttendanceFlusher(stream, session_factory=session_factory(engine))
+
+    assert await flusher.flush_once() == 2
+
+    assert await stored_matrics(engine) == ["2021/1", "2021/2"]
+    stream.ack.assert_awaited_once_with(["1-0", "3-0"])
+    # Left pending, to be retried with a later claim
+    stream.dead_letter.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bad_entry_is_dead_lettered_once_out_of_deliveries(engine, monkeypatch):
+    reject_poison(monkeypatch)
+    poison = entry("1-0", "poison")
+    stream = mock_stream(stale=[poison])
+    stream.delivery_counts.return_value = {"1-0": 3}
+    flusher = AttendanceFlusher(
+        stream, session_factory=session_factory(engine), max_deliveries=3
+    )
+
+    assert await flusher.flush_once() == 0
+
+    stream.delivery_counts.assert_awaited_once_with(["1-0"])
+    stream.dead_letter.assert_awaited_once_with([poison])
+    stream.ack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_recovered_before_new_ones(engine):
+    stream = mock_stream(stale=[entry("1-0", "2021/1")], new=[entry("2-0", "2021/2")])
+    flusher = AttendanceFlusher(stream, session_factory=session_factory(engine))
+
+    assert await flusher.flush_once() == 1
+
+    stream.read_new.assert_not_awaited()
+    stream.ack.assert_awaited_once_with(["1-0"])
+    assert await stored_matrics(engine) == ["2021/1"]
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_entries_deleted_while_pending():
+    mock_redis_client = AsyncMock()
+    mock_redis_client.xautoclaim.return_value = [
+        "0-0",
+        [entry("1-0", "2021/1"), ("2-0", None)],
+        [],
+    ]
+    stream = AttendanceStream(mock_redis_client, consumer_name="worker-2")
+
+    claimed = await stream.claim_stale(count=10, min_idle_ms=60_000)
+
+    assert [entry_id for entry_id, _ in claimed] == ["1-0"]
+    assert mock_redis_client.xautoclaim.await_args.args == (
+        ATTENDANCE_STREAM,
+        ATTENDANCE_CONSUMER_GROUP,
+        "worker-2",
+    )
+
+
+@pytest.mark.asyncio
+async def test_ack_also_trims_the_stream():
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    mock_redis_client = MagicMock()
+    mock_redis_client.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    mock_redis_client.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    await AttendanceStream(mock_redis_client, consumer_name="worker").ack(
+        ["1-0", "2-0"]
+    )
+
+    pipe.xack.assert_called_once_with(
+        ATTENDANCE_STREAM, ATTENDANCE_CONSUMER_GROUP, "1-0", "2-0"
+    )
+    pipe.xdel.assert_called_once_with(ATTENDANCE_STREAM, "1-0", "2-0")
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_dead_letter_moves_entries_out_of_the_stream():
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    mock_redis_client = MagicMock()
+    mock_redis_client.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    mock_redis_client.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+    poison = entry("1-0", "poison")
+
+    await AttendanceStream(mock_redis_client, consumer_name="worker").dead_letter(
+        [poison]
+    )
+
+    pipe.xadd.assert_called_once_with(
+        ATTENDANCE_DEAD_STREAM, {**poison[1], "entry_id": "1-0"}
+    )
+    pipe.xack.assert_called_once_with(
+        ATTENDANCE_STREAM, ATTENDANCE_CONSUMER_GROUP, "1-0"
+    )
+    pipe.xdel.assert_called_once_with(ATTENDANCE_STREAM, "1-0")
@@ -0,0 +1,114 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from ..redis import AttendeeSetStore
+from ..redis.AttendeeSets import (
+    CLAIM_ACCEPTED,
+    CLAIM_DUPLICATE,
+    CLAIM_NOT_LOADED,
+    LOAD_CHUNK_SIZE,
+    LOADED_MARKER,
+)
+from ..services import GeofenceService
+
+NOW = datetime.now(ZoneInfo("UTC"))
+
+
+def attendee_set_store():
+    mock_redis_client = MagicMock()
+    claim_script, load_script = AsyncMock(), AsyncMock()
+    mock_redis_client.register_script.side_effect = [claim_script, load_script]
+    mock_redis_client.scard = AsyncMock()
+    return AttendeeSetStore(mock_redis_client), claim_script, load_script
+
+
+def service(claims, repository=None):
+    attendee_sets = AsyncMock()
+    attendee_sets.claim.side_effect = claims
+    repository = repository or AsyncMock()
+    return (
+        GeofenceService(repository, attendee_sets=attendee_sets),
+        attendee_sets,
+        repository,
+    )
+
+
+@pytest.mark.asyncio
+async def test_load_marks_the_set_as_loaded():
+    store, _, load_script = attendee_set_store()
+
+    await store.load("F1", ["2021/1", "2021/2"], NOW)
+
+    assert load_script.await_args.kwargs["keys"] == ["geofence:attendees:F1"]
+    assert load_script.await_args.kwargs["args"][1:] == [
+        LOAD_CHUNK_SIZE,
+        LOADED_MARKER,
+        "2021/1",
+        "2021/2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_count_leaves_out_the_marker():
+    store, _, _ = attendee_set_store()
+
+    store.redis_client.scard.return_value = 3
+    assert await store.count("F1") == 2
+    store.redis_client.scard.return_value = 0
+    assert await store.count("F1") is None
+
+
+@pytest.mark.asyncio
+async def test_unloaded_set_is_rebuilt_then_claimed_again(make_snapshot):
+    fence = make_snapshot()
+    geofence_service, attendee_sets, repository = service(
+        [CLAIM_NOT_LOADED, CLAIM_ACCEPTED]
+    )
+    repository.get_geofence_attendee_matrics.return_value = ["2021/2"]
+
+    assert await geofence_service._claim_attendee_seat(fence, "2021/1")
+
+    attendee_sets.load.assert_awaited_once_with("F1", ["2021/2"], fence.end_time)
+    assert attendee_sets.claim.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_duplicate_claim_skips_the_database(make_snapshot):
+    geofence_service, _, repository = service([CLAIM_DUPLICATE])
+
+    assert not await geofence_service._write_geofence_attendance(
+        make_snapshot(), "2021/1", "F12021/1"
+    )
+    repository.record_geofence_attendance.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_seat_is_released_when_the_insert_fails(make_snapshot):
+    repository = AsyncMock()
+    repository.record_geofence_attendance.side_effect = RuntimeError("database down")
+    geofence_service, attendee_sets, _ = service([CLAIM_ACCEPTED], repository)
+
+    with pytest.raises(RuntimeError):
+        await geofence_service._write_geofence_attendance(
+            make_snapshot(), "2021/1", "F12021/1"
+        )
+
+    attendee_sets.release.assert_awaited_once_with("F1", "2021/1")
+
+
+@pytest.mark.asyncio
+async def test_queued_check_in_rides_on_the_claim(make_snapshot):
+    geofence_service, attendee_sets, repository = service([CLAIM_ACCEPTED])
+    geofence_service.attendance_stream = AsyncMock()
+
+    assert await geofence_service._queue_geofence_attendance(
+        make_snapshot(), "2021/1", "F12021/1"
+    )
+
+    stream_record = attendee_sets.claim.await_args.args[3]
+    assert stream_record["matric_fence_code"] == "F12021/1"
+    geofence_service.attendance_stream.append.assert_not_awaited()
+    repository.attendance_exists.assert_not_awaited()
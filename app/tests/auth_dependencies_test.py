@@ -0,0 +1,73 @@
+from typing import Annotated
+from unittest.mock import AsyncMock
+
+from fastapi import Depends, FastAPI
+from fastapi.dependencies.utils import get_dependant
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth.sessions.sessionDependencies import (
+    authenticate_admin_user,
+    authenticate_student_user,
+)
+from ..database import get_db_session, sessionmanager
+from ..redis import get_redis_client
+
+SESSION = {
+    "user_matric": "2021/10097",
+    "email": "test@example.com",
+    "username": "Adedara",
+    "role": "student",
+}
+
+
+def dependency_calls(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency.call
+        yield from dependency_calls(dependency)
+
+
+def test_authentication_does_not_depend_on_the_database():
+    for authenticate in (authenticate_student_user, authenticate_admin_user):
+        calls = set(dependency_calls(get_dependant(path="/", call=authenticate)))
+        assert get_redis_client in calls
+        assert get_db_session not in calls
+
+
+def test_pool_checkouts_follow_what_the_route_uses():
+    app = FastAPI()
+    Student = Annotated[dict, Depends(authenticate_student_user)]
+    Database = Annotated[AsyncSession, Depends(get_db_session)]
+
+    @app.get("/redis_only")
+    async def redis_only(student: Student):
+        return student["user_matric"]
+
+    @app.get("/unused_session")
+    async def unused_session(student: Student, db_session: Database):
+        return student["user_matric"]
+
+    @app.get("/queries")
+    async def queries(student: Student, db_session: Database):
+        return (await db_session.execute(text("SELECT 1"))).scalar()
+
+    mock_redis_client = AsyncMock()
+    mock_redis_client.hgetall.return_value = SESSION
+    app.dependency_overrides[get_redis_client] = lambda: mock_redis_client
+
+    checkouts = []
+    pool = sessionmanager._engine.sync_engine.pool
+    record = lambda *args: checkouts.append(1)
+    event.listen(pool, "checkout", record)
+    try:
+        client = TestClient(app, cookies={"session_token": "token"})
+        counts = {}
+        for path in ["/redis_only", "/unused_session", "/queries"]:
+            checkouts.clear()
+            assert client.get(path).status_code == 200
+            counts[path] = len(checkouts)
+    finally:
+        event.remove(pool, "checkout", record)
+
+    assert counts == {"/redis_only": 0, "/unused_session": 0, "/queries": 1}
@@ -0,0 +1,55 @@
+import os
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# The database engine is created at import time, so point it somewhere harmless
+# before any test imports the app
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+
+@pytest_asyncio.fixture
+async def engine():
+    """A fresh in-memory SQLite database with every table created."""
+    from ..database import Base
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def make_snapshot():
+    """Builds circular geofence snapshots, open from an hour ago until an hour
+    from now unless told otherwise."""
+    from ..schemas import GeofenceSnapshot
+    from ..utils.GeofenceUtils import build_geofence_geometry
+
+    def make(
+        fence_code="F1",
+        latitude=7.4,
+        longitude=3.9,
+        radius=50,
+        start_time=None,
+        end_time=None,
+        status="active",
+        creator_matric="lecturer",
+    ):
+        now = datetime.now(ZoneInfo("UTC"))
+        return GeofenceSnapshot(
+            fence_code=fence_code,
+            name=fence_code.upper(),
+            fence_type="circle",
+            start_time=start_time or now - timedelta(hours=1),
+            end_time=end_time or now + timedelta(hours=1),
+            status=status,
+            creator_matric=creator_matric,
+            **build_geofence_geometry("circle", latitude, longitude, radius, None),
+        )
+
+    return make
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AttendanceRecord, Geofence, User
+from ..repositories import GeofenceRepository
+from ..services import GeofenceService
+from ..services.GeofenceService import settings
+
+LAST_WEEK = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=7)
+
+
+def fence(fence_code):
+    return Geofence(
+        fence_code=fence_code,
+        name="CSC 101",
+        latitude=7.4,
+        longitude=3.9,
+        radius=50,
+        fence_type="circle",
+        start_time=LAST_WEEK,
+        end_time=LAST_WEEK + timedelta(days=14),
+        status="active",
+        creator_matric="lecturer",
+        updated_at=LAST_WEEK,
+    )
+
+
+def student(i):
+    return User(
+        user_matric=f"2021/{i}",
+        email=f"{i}@example.com",
+        is_email_verified=True,
+        username=f"student {i}",
+        hashed_password="x",
+        role="student",
+    )
+
+
+def check_in(i, **columns):
+    return AttendanceRecord(
+        user_matric=f"2021/{i}",
+        fence_code="abc123",
+        geofence_name="CSC 101",
+        timestamp=LAST_WEEK,
+        matric_fence_code=f"abc1232021/{i}",
+        **columns,
+    )
+
+
+@pytest.mark.asyncio
+async def test_attendance_changes_return_only_new_check_ins(engine):
+    async with AsyncSession(engine) as session:
+        session.add_all([fence("abc123"), *(student(i) for i in range(4))])
+        session.add_all(check_in(i, created_at=LAST_WEEK) for i in range(3))
+        await session.commit()
+        service = GeofenceService(geofence_repository=GeofenceRepository(session))
+
+        first = await service.get_attendance_changes("abc123", "lecturer", limit=2)
+        second = await service.get_attendance_changes(
+            "abc123", "lecturer", limit=2, cursor=first["next_cursor"]
+        )
+        session.add(check_in(3, created_at=LAST_WEEK))
+        await session.commit()
+        third = await service.get_attendance_changes(
+            "abc123", "lecturer", cursor=second["next_cursor"]
+        )
+        idle = await service.get_attendance_changes(
+            "abc123", "lecturer", cursor=third["next_cursor"]
+        )
+
+    def matrics(page):
+        return [row["user_matric"] for row in page["attendance"]]
+
+    assert (matrics(first), first["has_more"]) == (["2021/0", "2021/1"], True)
+    assert (matrics(second), second["has_more"]) == (["2021/2"], False)
+    assert matrics(third) == ["2021/3"]
+    assert third["attendance"][0]["username"] == "student 3"
+    assert matrics(idle) == [] and idle["next_cursor"] == third["next_cursor"]
+
+
+@pytest.mark.asyncio
+async def test_check_ins_committed_out_of_order_are_not_skipped(engine, monkeypatch):
+    async with AsyncSession(engine) as session:
+        session.add_all([fence("abc123"), *(student(i) for i in range(3))])
+        session.add(check_in(0, created_at=LAST_WEEK))
+        await session.commit()
+        service = GeofenceService(geofence_repository=GeofenceRepository(session))
+        synced = await service.get_attendance_changes("abc123", "lecturer")
+
+        # Id 12 commits while id 11 is still in its transaction
+        session.add(check_in(2, id=12))
+        await session.commit()
+        early = await service.get_attendance_changes(
+            "abc123", "lecturer", cursor=synced["next_cursor"]
+        )
+        session.add(check_in(1, id=11))
+        await session.commit()
+
+        monkeypatch.setattr(settings, "GEOFENCE_SYNC_SETTLE_SECONDS", 0)
+        settled = await service.get_attendance_changes(
+            "abc123", "lecturer", cursor=early["next_cursor"]
+        )
+
+    assert early["attendance"] == [] and early["has_more"] is False
+    assert early["next_cursor"] == synced["next_cursor"]
+    assert [row["user_matric"] for row in settled["attendance"]] == [
+        "2021/1",
+        "2021/2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_geofence_changes_pick_up_updates(engine, monkeypatch):
+    monkeypatch.setattr(settings, "GEOFENCE_SYNC_SETTLE_SECONDS", 0)
+    async with AsyncSession(engine) as session:
+        session.add_all([fence("abc123"), fence("xyz789")])
+        await session.commit()
+        repository = GeofenceRepository(session)
+        service = GeofenceService(geofence_repository=repository)
+
+        full = await service.get_geofence_changes()
+        unchanged = await service.get_geofence_changes(cursor=full["next_cursor"])
+        await repository.deactivate_geofence("abc123")
+        changed = await service.get_geofence_changes(cursor=full["next_cursor"])
+
+    assert [g.fence_code for g in full["geofences"]] == ["abc123", "xyz789"]
+    assert unchanged["geofences"] == []
+    assert [(g.fence_code, g.status) for g in changed["geofences"]] == [
+        ("abc123", "inactive")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_recent_geofence_changes_wait_to_settle(engine):
+    async with AsyncSession(engine) as session:
+        session.add(fence("abc123"))
+        await session.commit()
+        repository = GeofenceRepository(session)
+        service = GeofenceService(geofence_repository=repository)
+
+        full = await service.get_geofence_changes()
+        await repository.deactivate_geofence("abc123")
+        changed = await service.get_geofence_changes(cursor=full["next_cursor"])
+
+    assert changed["geofences"] == []
+    assert changed["next_cursor"] == full["next_cursor"]
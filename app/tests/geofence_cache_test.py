@@ -0,0 +1,58 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from ..redis import GeofenceCache
+from ..services import GeofenceService
+from ..utils.TTLCache import TTLCache
+
+
+def geofence_cache(stored):
+    mock_redis_client = AsyncMock()
+    set_if_unchanged = AsyncMock(return_value=stored)
+    mock_redis_client.register_script = MagicMock(return_value=set_if_unchanged)
+    cache = GeofenceCache(mock_redis_client, TTLCache(maxsize=10, ttl_seconds=30))
+    return cache, set_if_unchanged
+
+
+@pytest.mark.asyncio
+async def test_write_back_is_conditional_on_the_version(make_snapshot):
+    cache, set_if_unchanged = geofence_cache(stored=1)
+
+    assert await cache.set(make_snapshot(), "3")
+
+    assert set_if_unchanged.await_args.kwargs["keys"] == [
+        "geofence:snapshot:F1",
+        "geofence:version:F1",
+    ]
+    assert set_if_unchanged.await_args.kwargs["args"][0] == "3"
+    assert cache.local_cache.get("F1") is not None
+
+
+@pytest.mark.asyncio
+async def test_write_back_after_an_invalidation_is_dropped(make_snapshot):
+    cache, _ = geofence_cache(stored=0)
+
+    assert not await cache.set(make_snapshot(), "3")
+    assert cache.local_cache.get("F1") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_reads_the_version_before_the_database(make_snapshot):
+    calls = []
+    geofence_cache = AsyncMock()
+    geofence_cache.get.return_value = None
+    geofence_cache.version.side_effect = (
+        lambda fence_code: calls.append("version") or "3"
+    )
+    repository = AsyncMock()
+    repository.get_geofence_snapshot.side_effect = lambda fence_code: calls.append(
+        "database"
+    ) or make_snapshot(status="scheduled")
+    service = GeofenceService(repository, geofence_cache=geofence_cache)
+
+    await service._get_geofence_snapshot("F1")
+
+    assert calls == ["version", "database"]
+    geofence_cache.set.assert_awaited_once()
+    assert geofence_cache.set.await_args.args[1] == "3"
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+from ..schemas import GeofenceSnapshot
+from ..utils.GeofenceIndex import GeofenceGridIndex
+
+NOW = datetime.now(timezone.utc)
+
+
+def test_find_returns_containing_fence(make_snapshot):
+    index = GeofenceGridIndex()
+    index.replace_all(
+        [
+            make_snapshot("lt1", 7.4443, 3.8995, 50),
+            make_snapshot("lt2", 7.4500, 3.9100, 50),
+        ]
+    )
+
+    assert index.find(7.4443, 3.8995, NOW).fence_code == "lt1"
+    assert index.find(7.4500, 3.9100, NOW).fence_code == "lt2"
+    assert index.find(7.4470, 3.9050, NOW) is None
+
+
+def test_find_prefers_smallest_overlapping_fence(make_snapshot):
+    index = GeofenceGridIndex()
+    index.upsert(make_snapshot("faculty", 7.4443, 3.8995, 500))
+    index.upsert(make_snapshot("hall", 7.4443, 3.8995, 40))
+
+    assert index.find(7.4443, 3.8995, NOW).fence_code == "hall"
+
+
+def test_fences_on_cell_boundaries_are_found_from_each_cell(make_snapshot):
+    index = GeofenceGridIndex(cell_size=0.01)
+    index.upsert(make_snapshot("edge", 7.4500, 3.9000, 200))
+
+    assert index.find(7.4495, 3.8995, NOW).fence_code == "edge"
+    assert index.find(7.4505, 3.9005, NOW).fence_code == "edge"
+
+
+def test_time_window_and_removal(make_snapshot):
+    index = GeofenceGridIndex()
+    hour = timedelta(hours=1)
+    index.upsert(
+        make_snapshot(
+            "later", 7.4443, 3.8995, 50, start_time=NOW + hour, end_time=NOW + 2 * hour
+        )
+    )
+    index.upsert(
+        make_snapshot(
+            "over", 7.5, 3.95, 50, start_time=NOW - 2 * hour, end_time=NOW - hour
+        )
+    )
+
+    assert index.find(7.4443, 3.8995, NOW) is None
+    assert index.find(7.5, 3.95, NOW) is None
+    assert "over" not in index
+
+    index.remove("later")
+    assert len(index) == 0
+    assert index.find(7.4443, 3.8995, NOW + timedelta(hours=1, minutes=5)) is None
+
+
+def test_snapshot_json_round_trip(make_snapshot):
+    snapshot = make_snapshot("lt1", 7.4443, 3.8995, 50)
+    polygon = snapshot._replace(vertices=b"\x00\x01\xff")
+
+    assert GeofenceSnapshot.from_json(snapshot.to_json()) == snapshot
+    assert GeofenceSnapshot.from_json(polygon.to_json()) == polygon
+
+
+def test_oversized_fences_are_scanned_instead_of_gridded(make_snapshot):
+    index = GeofenceGridIndex(cell_size=0.01, max_cells=16)
+    index.upsert(make_snapshot("city", 7.4443, 3.8995, 50_000))
+    index.upsert(make_snapshot("hall", 7.4443, 3.8995, 40))
+
+    assert sum(len(codes) for codes in index._cells.values()) <= 4
+    assert index.find(7.4443, 3.8995, NOW).fence_code == "hall"
+    assert index.find(7.6, 3.7, NOW).fence_code == "city"
+
+    index.remove("city")
+    assert index.find(7.6, 3.7, NOW) is None
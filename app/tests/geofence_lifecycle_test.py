@@ -0,0 +1,167 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Geofence
+from ..repositories import GeofenceRepository
+from ..schemas import AttendanceRecordModel
+from ..services import GeofenceLifecycle, GeofenceLifecycleScheduler, GeofenceService
+
+NOW = datetime.now(ZoneInfo("UTC")).replace(tzinfo=None)
+HOUR = timedelta(hours=1)
+
+
+def fence(fence_code, status, start_time, end_time):
+    return Geofence(
+        fence_code=fence_code,
+        name=fence_code,
+        latitude=7.4,
+        longitude=3.9,
+        radius=50,
+        fence_type="circle",
+        start_time=start_time,
+        end_time=end_time,
+        status=status,
+        creator_matric="lecturer",
+    )
+
+
+async def seed(session):
+    session.add_all(
+        [
+            fence("due", "scheduled", NOW - HOUR, NOW + HOUR),
+            fence("later", "scheduled", NOW + HOUR, NOW + 2 * HOUR),
+            fence("missed", "scheduled", NOW - 2 * HOUR, NOW - HOUR),
+            fence("ended", "active", NOW - 2 * HOUR, NOW - HOUR),
+            fence("running", "active", NOW - HOUR, NOW + HOUR),
+            fence("closed", "inactive", NOW - HOUR, NOW + HOUR),
+        ]
+    )
+    await session.commit()
+
+
+async def statuses(session):
+    result = await session.execute(select(Geofence.fence_code, Geofence.status))
+    return dict(result.all())
+
+
+@pytest.mark.asyncio
+async def test_statuses_follow_start_and_end_times(engine):
+    async with AsyncSession(engine) as session:
+        await seed(session)
+        activated, expired = await GeofenceRepository(
+            session
+        ).transition_geofence_statuses(datetime.now(ZoneInfo("UTC")))
+
+        assert [(s.fence_code, s.status) for s in activated] == [("due", "active")]
+        assert sorted(expired) == ["ended", "missed"]
+        assert await statuses(session) == {
+            "due": "active",
+            "later": "scheduled",
+            "missed": "inactive",
+            "ended": "inactive",
+            "running": "active",
+            "closed": "inactive",
+        }
+
+
+@pytest.mark.asyncio
+async def test_round_drops_cached_snapshots_and_updates_indexes(engine, monkeypatch):
+    publish_upserts, publish_removals = AsyncMock(), AsyncMock()
+    monkeypatch.setattr(GeofenceLifecycle, "publish_geofence_upserts", publish_upserts)
+    monkeypatch.setattr(
+        GeofenceLifecycle, "publish_geofence_removals", publish_removals
+    )
+
+    @asynccontextmanager
+    async def session_factory():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    async with session_factory() as session:
+        await seed(session)
+
+    geofence_cache = AsyncMock()
+    scheduler = GeofenceLifecycleScheduler(
+        MagicMock(), geofence_cache=geofence_cache, session_factory=session_factory
+    )
+
+    assert await scheduler.transition_once() == (1, 2)
+    assert await scheduler.transition_once() == (0, 0)
+
+    assert sorted(geofence_cache.invalidate_many.await_args.args[0]) == [
+        "due",
+        "ended",
+        "missed",
+    ]
+    assert [s.fence_code for s in publish_upserts.await_args.args[1]] == ["due"]
+    assert sorted(publish_removals.await_args.args[1]) == ["ended", "missed"]
+    assert geofence_cache.invalidate_many.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_round_recounts_fences_open_by_their_times(engine, monkeypatch):
+    monkeypatch.setattr(GeofenceLifecycle, "publish_geofence_upserts", AsyncMock())
+    monkeypatch.setattr(GeofenceLifecycle, "publish_geofence_removals", AsyncMock())
+
+    @asynccontextmanager
+    async def session_factory():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    fence_codes = ["running", "closed", "ended", "later"]
+    async with session_factory() as session:
+        await seed(session)
+        repository = GeofenceRepository(session)
+        for fence_code in fence_codes:
+            await repository.record_geofence_attendance(
+                fence_code, "2021/1", fence_code, fence_code + "2021/1"
+            )
+
+    await GeofenceLifecycleScheduler(
+        MagicMock(), session_factory=session_factory
+    ).transition_once()
+
+    async with session_factory() as session:
+        repository = GeofenceRepository(session)
+        counts = [await repository.get_attendance_count(code) for code in fence_codes]
+    # "closed" was ended early but is still within its times; "later" has not
+    # opened, so it waits for a later round
+    assert counts == [1, 1, 1, 0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status, starts_in, ends_in, accepted",
+    [
+        ("scheduled", -HOUR, HOUR, True),
+        ("active", -2 * HOUR, -HOUR, False),
+        ("active", HOUR, 2 * HOUR, False),
+        ("inactive", -HOUR, HOUR, False),
+    ],
+)
+async def test_check_ins_go_by_the_fence_times_not_a_lagging_status(
+    make_snapshot, status, starts_in, ends_in, accepted
+):
+    now = datetime.now(ZoneInfo("UTC"))
+    repository = AsyncMock()
+    repository.get_geofence_snapshot.return_value = make_snapshot(
+        status=status, start_time=now + starts_in, end_time=now + ends_in
+    )
+    repository.record_geofence_attendance.return_value = True
+    service = GeofenceService(repository)
+    check_in = AttendanceRecordModel(lat=7.4, long=3.9, fence_code="F1")
+
+    if accepted:
+        await service.record_geofence_attendance(check_in, "2021/1")
+        repository.record_geofence_attendance.assert_awaited_once()
+    else:
+        with pytest.raises(Exception) as exc_info:
+            await service.record_geofence_attendance(check_in, "2021/1")
+        assert exc_info.value.status_code == 403
+        repository.record_geofence_attendance.assert_not_awaited()
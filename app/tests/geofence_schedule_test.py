@@ -0,0 +1,109 @@
+from datetime import date, time, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Geofence
+from ..repositories import GeofenceRepository
+from ..schemas import GeofenceScheduleModel
+from ..services import GeofenceService
+from ..utils.Recurrence import expand_weekly_rule
+
+NEXT_MONDAY = date.today() + timedelta(days=7 - date.today().weekday())
+
+
+def test_weekly_rule_expands_in_order():
+    occurrences = expand_weekly_rule(
+        date(2025, 3, 3), ["wed", "mon"], time(10, 0), timedelta(hours=2), weeks=2
+    )
+
+    assert [start.isoformat() for start, _ in occurrences] == [
+        "2025-03-03T10:00:00+00:00",
+        "2025-03-05T10:00:00+00:00",
+        "2025-03-10T10:00:00+00:00",
+        "2025-03-12T10:00:00+00:00",
+    ]
+    assert all(end - start == timedelta(hours=2) for start, end in occurrences)
+
+
+def test_weekly_rule_keeps_local_time_across_dst():
+    # New York moves its clocks forward on 2025-03-09
+    occurrences = expand_weekly_rule(
+        date(2025, 3, 3),
+        ["mon"],
+        time(10, 0),
+        timedelta(hours=1),
+        weeks=2,
+        time_zone="America/New_York",
+    )
+
+    assert [start.hour for start, _ in occurrences] == [15, 14]
+
+
+def schedule(**overrides):
+    fields = {
+        "name": "CSC 101",
+        "latitude": 7.4,
+        "longitude": 3.9,
+        "radius": 50,
+        "fence_type": "circle",
+        "starts_on": NEXT_MONDAY,
+        "days": ["mon", "wed"],
+        "start_time": "10:00",
+        "duration_minutes": 90,
+        "weeks": 14,
+    }
+    return GeofenceScheduleModel(**(fields | overrides))
+
+
+@pytest.mark.asyncio
+async def test_schedule_is_inserted_in_bulk(engine):
+    async with AsyncSession(engine) as session:
+        service = GeofenceService(geofence_repository=GeofenceRepository(session))
+        result = await service.create_geofence_schedule("lecturer", schedule())
+
+        rows = (
+            await session.execute(
+                select(Geofence.status, func.count()).group_by(Geofence.status)
+            )
+        ).all()
+
+    codes = [geofence["Code"] for geofence in result["geofences"]]
+    assert len(codes) == len(set(codes)) == 28
+    assert rows == [("scheduled", 28)]
+
+
+@pytest.mark.asyncio
+async def test_schedule_clashing_with_an_existing_day_is_rejected(engine):
+    async with AsyncSession(engine) as session:
+        service = GeofenceService(geofence_repository=GeofenceRepository(session))
+        await service.create_geofence_schedule("lecturer", schedule(weeks=1))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.create_geofence_schedule(
+                "lecturer", schedule(days=["wed", "fri"])
+            )
+        count = await session.scalar(select(func.count()).select_from(Geofence))
+
+    assert exc_info.value.status_code == 400
+    assert (NEXT_MONDAY + timedelta(days=2)).isoformat() in exc_info.value.detail
+    assert count == 2
+
+
+@pytest.mark.asyncio
+async def test_colliding_fence_codes_are_regenerated():
+    mock_geofence_repo = AsyncMock()
+    rounds = iter([True, False])
+    # Every code in the first round is taken, none in the second
+    mock_geofence_repo.get_taken_fence_codes.side_effect = lambda codes: (
+        set(codes) if next(rounds) else set()
+    )
+    service = GeofenceService(geofence_repository=mock_geofence_repo)
+
+    codes = await service._generate_fence_codes(5)
+
+    assert len(set(codes)) == 5
+    assert mock_geofence_repo.get_taken_fence_codes.await_count == 2
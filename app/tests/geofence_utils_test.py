@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ..utils.GeofenceUtils import (
+    EARTH_RADIUS_METERS,
+    build_geofence_geometry,
+    check_user_in_circular_geofence,
+    check_user_in_geofence,
+    check_users_in_circular_geofences,
+    get_fence_projection,
+    get_polygon_shape,
+    haversine,
+    unpack_vertices,
+)
+
+
+def make_geofence(latitude, longitude, radius):
+    return SimpleNamespace(latitude=latitude, longitude=longitude, radius=radius)
+
+
+def random_points(rng, geofence, count, spread=0.01):
+    lats = geofence.latitude + rng.uniform(-spread, spread, count)
+    lngs = geofence.longitude + rng.uniform(-spread, spread, count)
+    return lats, lngs
+
+
+def test_batch_check_matches_scalar_check():
+    rng = np.random.default_rng(7)
+    geofence = make_geofence(7.4443, 3.8995, 500)
+    lats, lngs = random_points(rng, geofence, 1000)
+
+    inside, distances = check_users_in_circular_geofences(lats, lngs, geofence)
+
+    for lat, lng, flag, distance in zip(lats, lngs, inside, distances):
+        assert flag == check_user_in_circular_geofence(lat, lng, geofence)
+        assert distance == pytest.approx(
+            haversine(lat, lng, geofence.latitude, geofence.longitude)
+        )
+
+
+def test_batch_check_pairwise_and_grid():
+    geofences = [make_geofence(7.4443, 3.8995, 100), make_geofence(6.5244, 3.3792, 100)]
+    lats = [7.4443, 6.5244]
+    lngs = [3.8995, 3.3792]
+
+    pairwise, _ = check_users_in_circular_geofences(lats, lngs, geofences, pairwise=True)
+    grid, distances = check_users_in_circular_geofences(lats, lngs, geofences)
+
+    assert pairwise.tolist() == [True, True]
+    assert grid.tolist() == [[True, False], [False, True]]
+    assert distances.shape == (2, 2)
+
+
+def test_batch_check_rejects_mismatched_input():
+    geofences = [make_geofence(7.4443, 3.8995, 100)]
+
+    with pytest.raises(ValueError):
+        check_users_in_circular_geofences([1.0, 2.0], [1.0], geofences)
+    with pytest.raises(ValueError):
+        check_users_in_circular_geofences([1.0, 2.0], [1.0, 2.0], geofences, pairwise=True)
+
+
+def make_polygon_geofence(vertices):
+    geometry = build_geofence_geometry("polygon", None, None, None, vertices)
+    return SimpleNamespace(fence_type="polygon", **geometry)
+
+
+# An L-shaped hall, so the concave corner is exercised
+L_SHAPED_HALL = [
+    (7.4440, 3.8990),
+    (7.4440, 3.9000),
+    (7.4445, 3.9000),
+    (7.4445, 3.8995),
+    (7.4450, 3.8995),
+    (7.4450, 3.8990),
+]
+
+
+def test_polygon_geofence_containment():
+    geofence = make_polygon_geofence(L_SHAPED_HALL)
+
+    assert check_user_in_geofence(7.4442, 3.8992, geofence)
+    assert check_user_in_geofence(7.4442, 3.8998, geofence)
+    assert check_user_in_geofence(7.4448, 3.8992, geofence)
+    # Inside the bounding box but in the cut-out corner
+    assert not check_user_in_geofence(7.4448, 3.8998, geofence)
+    # Outside the bounding box
+    assert not check_user_in_geofence(7.4460, 3.8992, geofence)
+
+
+def test_polygon_batch_check_matches_scalar_check():
+    rng = np.random.default_rng(11)
+    geofence = make_polygon_geofence(L_SHAPED_HALL)
+    lats = rng.uniform(7.4435, 7.4455, 500)
+    lngs = rng.uniform(3.8985, 3.9005, 500)
+
+    shape = get_polygon_shape(geofence.vertices)
+    expected = [check_user_in_geofence(lat, lng, geofence) for lat, lng in zip(lats, lngs)]
+
+    assert shape.contains_many(lats, lngs).tolist() == expected
+
+
+def test_polygon_geometry_is_packed_and_bounded():
+    geofence = make_polygon_geofence(L_SHAPED_HALL)
+
+    assert unpack_vertices(geofence.vertices) == L_SHAPED_HALL
+    assert (geofence.min_latitude, geofence.max_latitude) == (7.4440, 7.4450)
+    assert (geofence.min_longitude, geofence.max_longitude) == (3.8990, 3.9000)
+    for lat, lng in L_SHAPED_HALL:
+        assert haversine(lat, lng, geofence.latitude, geofence.longitude) <= (
+            geofence.radius + 1e-6
+        )
+
+
+@pytest.mark.parametrize("latitude", [0.0, 7.4443, -33.9, 51.5, 70.0])
+@pytest.mark.parametrize("radius", [15, 100, 1000, 10000])
+def test_projected_check_agrees_with_haversine(latitude, radius):
+    rng = np.random.default_rng(int(abs(latitude) * 100) + radius)
+    projection = get_fence_projection(latitude, 3.8995, radius)
+    # Points spread around the boundary, where the approximation matters most
+    bearings = rng.uniform(0, 2 * np.pi, 2000)
+    distances = radius * rng.uniform(0.9, 1.1, 2000)
+    lats = latitude + np.degrees(distances * np.cos(bearings) / EARTH_RADIUS_METERS)
+    lng_scale = EARTH_RADIUS_METERS * np.cos(np.radians(latitude))
+    lngs = 3.8995 + np.degrees(distances * np.sin(bearings) / lng_scale)
+
+    for lat, lng in zip(lats, lngs):
+        expected = haversine(lat, lng, latitude, 3.8995) <= radius
+        assert projection.contains(lat, lng) == expected
+
+
+def test_large_or_polar_fences_fall_back_to_haversine():
+    assert get_fence_projection(7.4443, 3.8995, 100).projectable
+    assert not get_fence_projection(88.0, 3.8995, 10000).projectable
@@ -0,0 +1,130 @@
+import contextlib
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AttendanceRecord, Geofence, User
+from ..repositories import GeofenceRepository, SessionRepository, UserRepository
+from ..schemas import GeofenceSnapshot, UserCredentials
+
+START = datetime(2025, 3, 24, 8, 0)
+
+
+@contextlib.contextmanager
+def captured_statements(engine):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def seed(session):
+    session.add(
+        User(
+            user_matric="2021/10097",
+            email="test@example.com",
+            is_email_verified=True,
+            username="Adedara",
+            hashed_password="hash",
+            role="student",
+        )
+    )
+    session.add(
+        Geofence(
+            fence_code="abc123",
+            name="CSC 101",
+            latitude=7.4,
+            longitude=3.9,
+            radius=50,
+            fence_type="circle",
+            start_time=START,
+            end_time=START,
+            status="active",
+            creator_matric="lecturer",
+        )
+    )
+    session.add(
+        AttendanceRecord(
+            user_matric="2021/10097",
+            fence_code="abc123",
+            geofence_name="CSC 101",
+            timestamp=START,
+            matric_fence_code="abc1232021/10097",
+        )
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_login_lookup_is_one_narrow_select(engine):
+    async with AsyncSession(engine) as session:
+        await seed(session)
+
+        with captured_statements(engine) as statements:
+            credentials = await SessionRepository(session).get_user_credentials(
+                matric="2021/10097"
+            )
+
+    assert credentials == UserCredentials(
+        "2021/10097", "test@example.com", "Adedara", "student", "hash"
+    )
+    assert len(statements) == 1
+    assert "attendancerecords" not in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_user_lookup_loads_attendances_only_when_asked(engine):
+    async with AsyncSession(engine) as session:
+        await seed(session)
+        repository = UserRepository(session)
+
+        with captured_statements(engine) as lean:
+            await repository.get_user_by_email_or_matric(matric="2021/10097")
+        with captured_statements(engine) as eager:
+            user = await repository.get_user_by_email_or_matric(
+                matric="2021/10097", with_attendances=True
+            )
+
+    assert len(lean) == 1
+    assert len(eager) == 2
+    assert [record.fence_code for record in user.attendances] == ["abc123"]
+
+
+@pytest.mark.asyncio
+async def test_course_day_lookups_skip_attendances(engine):
+    async with AsyncSession(engine) as session:
+        await seed(session)
+        repository = GeofenceRepository(session)
+
+        with captured_statements(engine) as statements:
+            snapshot = await repository.get_geofence_snapshot_for_day("CSC 101", START)
+            await repository.get_geofence("CSC 101", START)
+            await repository.get_geofence_by_fence_code("abc123")
+
+    assert isinstance(snapshot, GeofenceSnapshot)
+    assert snapshot.creator_matric == "lecturer"
+    assert len(statements) == 3
+    assert not any("attendancerecords" in statement for statement in statements)
+
+
+@pytest.mark.asyncio
+async def test_deactivate_is_a_single_update(engine):
+    async with AsyncSession(engine) as session:
+        await seed(session)
+        repository = GeofenceRepository(session)
+
+        with captured_statements(engine) as statements:
+            await repository.deactivate_geofence("abc123")
+
+        snapshot = await repository.get_geofence_snapshot("abc123")
+
+    assert [statement.split()[0] for statement in statements] == ["UPDATE"]
+    assert snapshot.status == "inactive"
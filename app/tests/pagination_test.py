@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AttendanceRecord, Geofence, User
+from ..repositories import GeofenceRepository
+from ..utils.Pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+
+START = datetime(2025, 3, 24, 8, 0)
+
+
+def test_cursor_round_trips():
+    assert decode_cursor(encode_cursor(START, 42)) == (START, 42)
+
+
+def test_aware_cursor_decodes_to_naive_utc():
+    aware = datetime.fromisoformat("2025-03-24T09:00:00+01:00")
+    assert decode_cursor(encode_cursor(aware, 7)) == (START, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(START, 1)[:-3]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_split_page_only_returns_cursor_when_more_rows_follow():
+    rows = [(START, row_id) for row_id in range(3)]
+    assert split_page(rows, 3, lambda row: row) == (rows, None)
+
+    page, next_cursor = split_page(rows, 2, lambda row: row)
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor) == (START, 1)
+
+
+async def walk(fetch, limit, cursor_of):
+    pages, cursor = [], None
+    while True:
+        rows, next_cursor = split_page(await fetch(limit, cursor), limit, cursor_of)
+        pages.append(rows)
+        if next_cursor is None:
+            return pages
+        cursor = decode_cursor(next_cursor)
+
+
+@pytest.mark.asyncio
+async def test_geofence_pages_cover_every_fence_once_newest_first(engine):
+    async with AsyncSession(engine) as session:
+        # Pairs of fences share a start_time, so ties have to be broken on id
+        session.add_all(
+            Geofence(
+                fence_code=f"f{i}",
+                name=f"CSC {i}",
+                latitude=7.4,
+                longitude=3.9,
+                radius=50,
+                fence_type="circle",
+                start_time=START + timedelta(hours=i // 2),
+                end_time=START + timedelta(hours=i // 2, minutes=50),
+                status="inactive",
+                creator_matric="2021/10097",
+            )
+            for i in range(7)
+        )
+        await session.commit()
+
+        repository = GeofenceRepository(session)
+        pages = await walk(
+            repository.get_all_geofences,
+            3,
+            lambda row: (row.Geofence.start_time, row.Geofence.id),
+        )
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    fences = [row.Geofence for page in pages for row in page]
+    assert [geofence.fence_code for geofence in fences] == [
+        "f6",
+        "f5",
+        "f4",
+        "f3",
+        "f2",
+        "f1",
+        "f0",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_attendance_pages_follow_check_in_order(engine):
+    async with AsyncSession(engine) as session:
+        session.add_all(
+            User(
+                user_matric=f"2021/{i}",
+                email=f"{i}@example.com",
+                is_email_verified=True,
+                username=f"student{i}",
+                hashed_password="x",
+                role="student",
+            )
+            for i in range(5)
+        )
+        session.add_all(
+            AttendanceRecord(
+                user_matric=f"2021/{i}",
+                fence_code="abc123",
+                geofence_name="CSC 101",
+                timestamp=START + timedelta(seconds=i // 2),
+                matric_fence_code=f"abc1232021/{i}",
+            )
+            for i in range(5)
+        )
+        await session.commit()
+
+        repository = GeofenceRepository(session)
+        pages = await walk(
+            lambda limit, cursor: repository.get_geofence_attendances(
+                "abc123", limit, cursor
+            ),
+            2,
+            lambda row: (row.timestamp, row.id),
+        )
+
+    assert [row.username for page in pages for row in page] == [
+        f"student{i}" for i in range(5)
+    ]
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ..utils import PasswordHasher as password_hasher_module
+from ..utils.PasswordHasher import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hashes_round_trip():
+    hasher = PasswordHasher(ThreadPoolExecutor(max_workers=1), max_concurrency=1)
+
+    hashed_password = await hasher.hash("a password")
+
+    assert await hasher.verify("a password", hashed_password)
+    assert not await hasher.verify("another password", hashed_password)
+    assert hasher.metrics()["completed"] == 3
+    hasher.close()
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency_and_records_waits(monkeypatch):
+    release = threading.Event()
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def slow_hash(password):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        release.wait(5)
+        with lock:
+            running -= 1
+        return password
+
+    monkeypatch.setattr(password_hasher_module, "_hash", slow_hash)
+    hasher = PasswordHasher(ThreadPoolExecutor(max_workers=4), max_concurrency=2)
+
+    hashes = [asyncio.create_task(hasher.hash(str(i))) for i in range(5)]
+    await asyncio.sleep(0.05)
+
+    # The event loop stays free while hashes are queued
+    assert hasher.metrics()["running"] == 2
+    assert hasher.metrics()["waiting"] == 3
+
+    release.set()
+    assert await asyncio.gather(*hashes) == ["0", "1", "2", "3", "4"]
+    assert peak == 2
+    assert hasher.metrics()["max_wait_seconds"] > 0
+    assert hasher.metrics()["waiting"] == 0
+    hasher.close()
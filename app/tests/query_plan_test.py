@@ -0,0 +1,188 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..repositories import GeofenceRepository, UserRepository
+
+DAY = datetime(2025, 3, 24, 10, 0, tzinfo=timezone.utc)
+CURSOR = (datetime(2025, 3, 24, 10, 0), 42)
+
+
+async def query_plans(engine, run_queries) -> list[str]:
+    """Runs the repository calls and returns EXPLAIN QUERY PLAN rows for each SELECT."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    async with AsyncSession(engine) as session:
+        await run_queries(session)
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert statements, "no SELECT was issued"
+    plans = []
+    async with engine.connect() as connection:
+        for statement, parameters in statements:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            plans.extend(row.detail for row in result)
+    return plans
+
+
+def assert_uses_index(plans: list[str]):
+    full_scans = [detail for detail in plans if detail.startswith("SCAN")]
+    assert not full_scans, f"full table scan in plan: {plans}"
+    assert any("USING" in detail for detail in plans), plans
+
+
+@pytest.mark.asyncio
+async def test_get_geofence_by_course_and_day_seeks_name_start_time(engine):
+    plans = await query_plans(
+        engine, lambda session: GeofenceRepository(session).get_geofence("CSC 101", DAY)
+    )
+    assert_uses_index(plans)
+    # The day must be part of the seek, not a filter applied to every row of the course
+    assert any(
+        "ix_geofences_name_start_time (name=? AND start_time>? AND start_time<?)"
+        in detail
+        for detail in plans
+    ), plans
+
+
+@pytest.mark.asyncio
+async def test_geofence_pages_walk_start_time_index(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: GeofenceRepository(session).get_all_geofences(50, CURSOR),
+    )
+    assert_uses_index(plans)
+    assert any("ix_geofences_start_time" in detail for detail in plans)
+    # Rows come off the index already ordered, with no sort step
+    assert not any("TEMP B-TREE" in detail for detail in plans), plans
+
+
+@pytest.mark.asyncio
+async def test_get_geofences_by_creator_uses_index(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: GeofenceRepository(session).get_all_geofences_by_user(
+            "2021/10097", 50, CURSOR
+        ),
+    )
+    assert_uses_index(plans)
+    assert any("ix_geofences_creator_matric_start_time" in detail for detail in plans)
+    assert not any("TEMP B-TREE" in detail for detail in plans), plans
+
+
+@pytest.mark.asyncio
+async def test_open_geofence_snapshots_use_status_index(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: GeofenceRepository(session).get_open_geofence_snapshots(DAY),
+    )
+    assert_uses_index(plans)
+    assert any("ix_geofences_status_end_time" in detail for detail in plans)
+
+
+@pytest.mark.asyncio
+async def test_geofence_snapshot_seeks_fence_code(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: GeofenceRepository(session).get_geofence_snapshot("abc123"),
+    )
+    assert_uses_index(plans)
+
+
+@pytest.mark.asyncio
+async def test_geofence_attendances_use_fence_code_index(engine):
+    async def run_queries(session):
+        repository = GeofenceRepository(session)
+        await repository.get_geofence_attendances("abc123", 50, CURSOR)
+        await repository.get_geofence_attendee_matrics("abc123")
+
+    plans = await query_plans(engine, run_queries)
+    assert_uses_index(plans)
+    assert any("ix_attendancerecords_fence_code_timestamp" in d for d in plans)
+    assert not any("TEMP B-TREE" in detail for detail in plans), plans
+
+
+@pytest.mark.asyncio
+async def test_attendance_changes_seek_fence_code_id(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: GeofenceRepository(session).get_attendance_changes(
+            "abc123", 42, 50, datetime(2025, 3, 25)
+        ),
+    )
+    assert_uses_index(plans)
+    assert any(
+        "ix_attendancerecords_fence_code_id (fence_code=? AND id>?)" in d for d in plans
+    ), plans
+    assert not any("TEMP B-TREE" in detail for detail in plans), plans
+
+
+@pytest.mark.asyncio
+async def test_geofence_changes_walk_updated_at_index(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: GeofenceRepository(session).get_geofence_changes(
+            50, CURSOR, datetime(2025, 3, 25)
+        ),
+    )
+    assert_uses_index(plans)
+    assert any("ix_geofences_updated_at_id" in d for d in plans), plans
+    assert not any("TEMP B-TREE" in detail for detail in plans), plans
+
+
+@pytest.mark.asyncio
+async def test_lifecycle_transitions_seek_status_indexes(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: GeofenceRepository(session).transition_geofence_statuses(DAY),
+    )
+    assert_uses_index(plans)
+    # Without statistics SQLite may pick either status index for activations;
+    # both seek on status rather than reading every fence
+    assert all("ix_geofences_status_" in d and "(status=?" in d for d in plans), plans
+
+
+@pytest.mark.asyncio
+async def test_attendance_lookup_seeks_matric_fence_code(engine):
+    async def run_queries(session):
+        repository = GeofenceRepository(session)
+        await repository.attendance_exists("2021/10097abc123")
+        await repository.get_attendance_record_for_student_for_geofence(
+            "2021/10097abc123"
+        )
+
+    plans = await query_plans(engine, run_queries)
+    assert_uses_index(plans)
+
+
+@pytest.mark.asyncio
+async def test_user_lookup_seeks_email_or_matric(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: UserRepository(session).get_user_by_email_or_matric(
+            email="test@example.com", matric="2021/10097"
+        ),
+    )
+    assert_uses_index(plans)
+
+
+@pytest.mark.asyncio
+async def test_student_records_walk_user_matric_timestamp_index(engine):
+    plans = await query_plans(
+        engine,
+        lambda session: UserRepository(session).get_user_attendances(
+            "2021/10097", 50, CURSOR, geofence_name="CSC 101", start=DAY, end=DAY
+        ),
+    )
+    assert_uses_index(plans)
+    assert any("ix_attendancerecords_user_matric_timestamp" in d for d in plans)
+    assert not any("TEMP B-TREE" in detail for detail in plans), plans
@@ -0,0 +1,86 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import BackgroundTasks
+
+from ..auth.sessions import SessionHandler
+from ..redis.SessionCache import SESSION_INVALIDATION_CHANNEL
+from ..services import UserService
+from ..utils.TTLCache import TTLCache
+
+SESSION = {
+    "user_matric": "2021/10097",
+    "email": "test@example.com",
+    "username": "Adedara",
+    "role": "student",
+}
+
+
+def mock_scripts(mock_redis_client, result):
+    script = AsyncMock(return_value=result)
+    mock_redis_client.register_script = MagicMock(return_value=script)
+    return script
+
+
+def session_handler(mock_redis_client):
+    return SessionHandler(
+        sessionRepository=AsyncMock(),
+        redis_client=mock_redis_client,
+        local_cache=TTLCache(maxsize=10, ttl_seconds=30),
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeat_lookups_skip_redis():
+    mock_redis_client = AsyncMock()
+    mock_redis_client.hgetall.return_value = SESSION
+    handler = session_handler(mock_redis_client)
+
+    assert await handler.get_user_by_session("token") == SESSION
+    assert await handler.get_user_by_session("token") == SESSION
+    mock_redis_client.hgetall.assert_awaited_once_with("session:token")
+
+
+@pytest.mark.asyncio
+async def test_unknown_session_is_none_and_not_cached():
+    mock_redis_client = AsyncMock()
+    mock_redis_client.hgetall.return_value = {}
+    handler = session_handler(mock_redis_client)
+
+    assert await handler.get_user_by_session("token") is None
+    assert len(handler.local_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_logout_is_broadcast():
+    mock_redis_client = AsyncMock()
+    mock_redis_client.hgetall.return_value = SESSION
+    destroy_session = mock_scripts(mock_redis_client, 1)
+    handler = session_handler(mock_redis_client)
+    await handler.get_user_by_session("token")
+
+    await handler.deactivate_session("token")
+
+    assert len(handler.local_cache) == 0
+    destroy_session.assert_awaited_once_with(
+        keys=["session:token"],
+        args=["token", "user:", SESSION_INVALIDATION_CHANNEL],
+    )
+
+
+@pytest.mark.asyncio
+async def test_password_change_ends_the_session():
+    mock_redis_client = AsyncMock()
+    end_session = mock_scripts(mock_redis_client, "token")
+    service = UserService(
+        user_repository=AsyncMock(),
+        redis_client=mock_redis_client,
+    )
+    service._decode_password_reset_token = AsyncMock(return_value=SESSION)
+    service._get_password_changed_email_template = AsyncMock(return_value="")
+
+    await service.change_password("a new password", "reset", BackgroundTasks())
+
+    end_session.assert_awaited_once_with(
+        keys=["user:2021/10097"], args=["session:", SESSION_INVALIDATION_CHANNEL]
+    )
@@ -0,0 +1,77 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from ..auth.sessions import SessionStore
+from ..auth.sessions.SessionStore import settings
+from ..redis import SessionRevocations
+from ..redis.SessionRevocations import REVOKED_SESSIONS_KEY
+
+SESSION = {
+    "user_matric": "2021/10097",
+    "email": "test@example.com",
+    "username": "2021/10097",
+    "role": "student",
+}
+
+
+@pytest.fixture
+def revocations(monkeypatch):
+    monkeypatch.setattr(settings, "SECRET_KEY", "secret")
+    monkeypatch.setattr(settings, "ALGORITHM", "HS256")
+    revocations = SessionRevocations()
+    revocations.refreshed_at = float("inf")
+    return revocations
+
+
+def signed_store(mock_redis_client, revocations):
+    return SessionStore(mock_redis_client, revocations=revocations, signed_tokens=True)
+
+
+@pytest.mark.asyncio
+async def test_signed_tokens_are_checked_without_redis(revocations):
+    mock_redis_client = AsyncMock()
+    store = signed_store(mock_redis_client, revocations)
+
+    session_token = await store.create_new_session(
+        SESSION["user_matric"], SESSION["email"], SESSION["role"]
+    )
+
+    assert await store.get_user_by_session(session_token) == SESSION
+    assert await store.get_user_by_session(session_token[:-2] + "xx") is None
+    assert mock_redis_client.mock_calls == []
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_the_token(revocations):
+    mock_redis_client = AsyncMock()
+    store = signed_store(mock_redis_client, revocations)
+    session_token = await store.create_new_session(
+        SESSION["user_matric"], SESSION["email"], SESSION["role"]
+    )
+
+    await store.deactivate_session(session_token)
+
+    assert await store.get_user_by_session(session_token) is None
+    assert mock_redis_client.zadd.await_args.args[0] == REVOKED_SESSIONS_KEY
+
+
+@pytest.mark.asyncio
+async def test_ending_user_sessions_revokes_earlier_tokens(revocations):
+    mock_redis_client = AsyncMock()
+    mock_redis_client.register_script = MagicMock(return_value=AsyncMock())
+    store = signed_store(mock_redis_client, revocations)
+    old_token = await store.create_new_session(
+        SESSION["user_matric"], SESSION["email"], SESSION["role"]
+    )
+
+    await store.end_user_session(SESSION["user_matric"])
+    # Tokens issued in the same clock tick as the change count as ended
+    await asyncio.sleep(0.02)
+    new_token = await store.create_new_session(
+        SESSION["user_matric"], SESSION["email"], SESSION["role"]
+    )
+
+    assert await store.get_user_by_session(old_token) is None
+    assert await store.get_user_by_session(new_token) == SESSION
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AttendanceRecord
+from ..repositories import UserRepository
+from ..services import UserService
+
+START = datetime(2025, 3, 24, 8, 0)
+
+
+async def seed(session):
+    session.add_all(
+        AttendanceRecord(
+            user_matric=user_matric,
+            fence_code=f"f{day}{name[-1]}",
+            geofence_name=name,
+            timestamp=START + timedelta(days=day),
+            matric_fence_code=f"f{day}{name[-1]}{user_matric}",
+        )
+        for user_matric in ["2021/1", "2021/2"]
+        for day in range(4)
+        for name in ["CSC 101", "CSC 102"]
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_records_are_filtered_and_paged_in_sql(engine):
+    async with AsyncSession(engine) as session:
+        await seed(session)
+        service = UserService(user_repository=UserRepository(session))
+
+        first = await service.get_user_records(
+            "2021/1",
+            course_title="CSC 101",
+            start=datetime(2025, 3, 25, 9, 0, tzinfo=timezone(timedelta(hours=1))),
+            limit=2,
+        )
+        second = await service.get_user_records(
+            "2021/1", course_title="CSC 101", limit=2, cursor=first["next_cursor"]
+        )
+
+    assert [record["fence_code"] for record in first["attendance"]] == ["f31", "f21"]
+    assert {record["user_matric"] for record in first["attendance"]} == {"2021/1"}
+    assert [record["fence_code"] for record in second["attendance"]] == ["f11", "f01"]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_cached_page_skips_the_database():
+    mock_user_repo = AsyncMock()
+    mock_records_cache = AsyncMock()
+    mock_records_cache.version.return_value = "3"
+    mock_records_cache.get.return_value = {"attendance": [], "next_cursor": None}
+
+    service = UserService(
+        user_repository=mock_user_repo, records_cache=mock_records_cache
+    )
+    page = await service.get_user_records("2021/1", course_title="CSC 101")
+
+    assert page == {"attendance": [], "next_cursor": None}
+    mock_user_repo.get_user_attendances.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_missed_page_is_cached_under_the_version_it_was_read_at():
+    mock_user_repo = AsyncMock()
+    mock_user_repo.get_user_attendances.return_value = []
+    mock_records_cache = AsyncMock()
+    mock_records_cache.version.return_value = "3"
+    mock_records_cache.get.return_value = None
+
+    service = UserService(
+        user_repository=mock_user_repo, records_cache=mock_records_cache
+    )
+    await service.get_user_records("2021/1")
+
+    user_matric, version, _, page = mock_records_cache.set.await_args.args
+    assert (user_matric, version) == ("2021/1", "3")
+    assert page == {"attendance": [], "next_cursor": None}
@@ -0,0 +1,132 @@
+import math
+from datetime import datetime
+
+from .GeofenceUtils import check_user_in_geofence, circle_bounding_box
+
+# Roughly 1.1 km per cell at the equator, so a lecture hall touches one to four cells
+DEFAULT_CELL_SIZE_DEGREES = 0.01
+# Fences spanning more cells than this are kept aside and checked on every lookup,
+# so one very large fence cannot flood the grid
+MAX_CELLS_PER_FENCE = 64
+
+
+class GeofenceGridIndex:
+    """In-memory uniform grid of the geofences students can currently check into.
+
+    Each fence is registered in every cell its bounding box overlaps, so finding
+    the fence around a point is a dict lookup followed by exact checks against
+    the handful of fences sharing that cell. Entries are snapshots (see
+    `GeofenceSnapshot`); the index never touches the database itself.
+
+    Fences covering more than `max_cells` cells are not gridded but scanned on
+    every lookup; there should only ever be a few of them.
+    """
+
+    def __init__(
+        self,
+        cell_size: float = DEFAULT_CELL_SIZE_DEGREES,
+        max_cells: int = MAX_CELLS_PER_FENCE,
+    ):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self._cells: dict[tuple[int, int], set[str]] = {}
+        self._fences: dict[str, object] = {}
+        self._fence_cells: dict[str, list[tuple[int, int]]] = {}
+        self._oversized: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._fences)
+
+    def __contains__(self, fence_code: str) -> bool:
+        return fence_code in self._fences
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_size), math.floor(lng / self.cell_size)
+
+    def _covering_cells(self, geofence) -> list[tuple[int, int]] | None:
+        """The cells the fence's bounding box overlaps, or None if there are
+        more than `max_cells` of them."""
+        if geofence.min_latitude is not None:
+            min_lat, max_lat = geofence.min_latitude, geofence.max_latitude
+            min_lng, max_lng = geofence.min_longitude, geofence.max_longitude
+        else:
+            min_lat, max_lat, min_lng, max_lng = circle_bounding_box(
+                geofence.latitude, geofence.longitude, geofence.radius
+            )
+        low_row, low_col = self._cell(min_lat, min_lng)
+        high_row, high_col = self._cell(max_lat, max_lng)
+        if (high_row - low_row + 1) * (high_col - low_col + 1) > self.max_cells:
+            return None
+        return [
+            (row, col)
+            for row in range(low_row, high_row + 1)
+            for col in range(low_col, high_col + 1)
+        ]
+
+    def upsert(self, geofence) -> None:
+        """Adds a fence, or replaces the entry for a fence with the same code."""
+        self.remove(geofence.fence_code)
+        if geofence.status == "inactive":
+            return
+
+        self._fences[geofence.fence_code] = geofence
+        cells = self._covering_cells(geofence)
+        if cells is None:
+            self._oversized.add(geofence.fence_code)
+            return
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(geofence.fence_code)
+        self._fence_cells[geofence.fence_code] = cells
+
+    def remove(self, fence_code: str) -> None:
+        self._fences.pop(fence_code, None)
+        self._oversized.discard(fence_code)
+        for cell in self._fence_cells.pop(fence_code, ()):
+            codes = self._cells.get(cell)
+            if codes is not None:
+                codes.discard(fence_code)
+                if not codes:
+                    del self._cells[cell]
+
+    def replace_all(self, geofences) -> None:
+        self._cells.clear()
+        self._fences.clear()
+        self._fence_cells.clear()
+        self._oversized.clear()
+        for geofence in geofences:
+            self.upsert(geofence)
+
+    def find(self, lat: float, lng: float, now: datetime):
+        """Returns the open fence containing the point, or None.
+
+        When fences overlap, the smallest one wins since it is the most specific.
+        Fences whose window has closed are dropped from the index on the way.
+        """
+        codes = self._cells.get(self._cell(lat, lng), set()) | self._oversized
+        if not codes:
+            return None
+
+        best = None
+        expired = []
+        for fence_code in codes:
+            geofence = self._fences[fence_code]
+            if geofence.end_time <= now:
+                expired.append(fence_code)
+                continue
+            if geofence.start_time > now:
+                continue
+            if not check_user_in_geofence(lat, lng, geofence):
+                continue
+            if best is None or geofence.radius < best.radius:
+                best = geofence
+
+        for fence_code in expired:
+            self.remove(fence_code)
+        return best
+
+
+geofence_index = GeofenceGridIndex()
+
+
+def get_geofence_index() -> GeofenceGridIndex:
+    return geofence_index
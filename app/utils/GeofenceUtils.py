@@ -5,7 +5,18 @@
 import math
 import random
 import string
+from functools import lru_cache
 
+import numpy as np
+
+EARTH_RADIUS_METERS = 6371 * 1000
+METERS_PER_DEGREE = EARTH_RADIUS_METERS * math.pi / 180
+
+FENCE_TYPE_CIRCLE = "circle"
+FENCE_TYPE_POLYGON = "polygon"
+
+# Polygon vertices are stored as packed little-endian float64 (lat, lng) pairs.
+VERTEX_DTYPE = np.dtype("<f8")
 
 
 def haversine(lat1, lon1, lat2, lon2):
@@ -22,12 +33,279 @@ def haversine(lat1, lon1, lat2, lon2):
     )  # Convert to meters
 
 
+# ----------------------------------------Local projection--------------------------------------------
+# Near a fence the sphere is flat enough to measure offsets in meters with a
+# plain equirectangular projection around the centre. Its relative error against
+# haversine is about tan(|lat0|) * d / R for a point d meters away, i.e. under
+# 0.3% for fences up to 10 km radius below 60 degrees of latitude. Points whose
+# projected distance lands within PROJECTION_BAND_FRACTION * radius +
+# PROJECTION_BAND_METERS of the boundary are re-checked with haversine, so while
+# the projection error stays inside that band the answer is identical to
+# haversine. Fences too large or too close to the poles for that to hold (with a
+# 2x margin) skip the projection and always use haversine.
+PROJECTION_BAND_FRACTION = 0.01
+PROJECTION_BAND_METERS = 0.5
+
+
+class CircularFenceProjection:
+    """Constants for checking points against one circular fence without trig calls."""
+
+    __slots__ = (
+        "latitude",
+        "longitude",
+        "radius",
+        "cos_latitude",
+        "meters_per_degree_lng",
+        "radius_squared",
+        "inner_squared",
+        "outer_squared",
+        "projectable",
+    )
+
+    def __init__(self, latitude: float, longitude: float, radius: float):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius = radius
+        self.cos_latitude = math.cos(math.radians(latitude))
+        self.meters_per_degree_lng = METERS_PER_DEGREE * self.cos_latitude
+        self.radius_squared = radius * radius
+
+        band = radius * PROJECTION_BAND_FRACTION + PROJECTION_BAND_METERS
+        self.inner_squared = max(radius - band, 0.0) ** 2
+        self.outer_squared = (radius + band) ** 2
+
+        # Worst-case relative error at the boundary, with a 2x safety margin
+        worst_error = (
+            2 * abs(math.tan(math.radians(latitude))) * radius / EARTH_RADIUS_METERS
+        )
+        self.projectable = (
+            abs(latitude) < 89 and worst_error * (radius + band) < band
+        )
+
+    def contains(self, lat: float, lng: float) -> bool:
+        dlng = lng - self.longitude
+        if not self.projectable or not -90 < dlng < 90:
+            return haversine(lat, lng, self.latitude, self.longitude) <= self.radius
+
+        dy = (lat - self.latitude) * METERS_PER_DEGREE
+        dx = dlng * self.meters_per_degree_lng
+        distance_squared = dx * dx + dy * dy
+        if distance_squared <= self.inner_squared:
+            return True
+        if distance_squared > self.outer_squared:
+            return False
+        return haversine(lat, lng, self.latitude, self.longitude) <= self.radius
+
+
+@lru_cache(maxsize=4096)
+def get_fence_projection(latitude, longitude, radius) -> CircularFenceProjection:
+    return CircularFenceProjection(latitude, longitude, radius)
+
+
 def check_user_in_circular_geofence(user_lat, user_lng, geofence):
-    latitude = geofence.latitude
-    longitude = geofence.longitude
-    radius = geofence.radius
-    distance = haversine(user_lat, user_lng, latitude, longitude)
-    return distance <= radius
+    projection = get_fence_projection(
+        geofence.latitude, geofence.longitude, geofence.radius
+    )
+    return projection.contains(user_lat, user_lng)
+
+
+# ----------------------------------------Batch (vectorised) checks--------------------------------------------
+
+
+def haversine_batch(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorised haversine distance in meters.
+
+    Arguments can be scalars or arrays and are broadcast against each other,
+    so one call covers many points against one fence, one point per fence, or
+    a full points x fences grid.
+    """
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = np.radians(np.subtract(lat2, lat1))
+    dlambda = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def geofence_arrays(geofences) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Packs the centres and radii of a sequence of geofences into arrays."""
+    count = len(geofences)
+    latitudes = np.fromiter((g.latitude for g in geofences), np.float64, count)
+    longitudes = np.fromiter((g.longitude for g in geofences), np.float64, count)
+    radii = np.fromiter((g.radius for g in geofences), np.float64, count)
+    return latitudes, longitudes, radii
+
+
+def check_users_in_circular_geofences(
+    user_lats, user_lngs, geofences, pairwise: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    """Batch version of `check_user_in_circular_geofence`.
+
+    `geofences` is either a single geofence, checked against every point, or a
+    sequence of geofences. With a sequence, `pairwise=True` checks point i
+    against geofence i; otherwise every point is checked against every
+    geofence and the results have shape (n_points, n_geofences).
+
+    Returns a tuple of (inside mask, distances in meters).
+    """
+    lats = np.atleast_1d(np.asarray(user_lats, dtype=np.float64))
+    lngs = np.atleast_1d(np.asarray(user_lngs, dtype=np.float64))
+    if lats.ndim != 1 or lats.shape != lngs.shape:
+        raise ValueError("user_lats and user_lngs must be 1-D arrays of equal length")
+
+    if hasattr(geofences, "latitude"):
+        fence_lats = geofences.latitude
+        fence_lngs = geofences.longitude
+        radii = geofences.radius
+    else:
+        fence_lats, fence_lngs, radii = geofence_arrays(geofences)
+        if pairwise:
+            if fence_lats.shape != lats.shape:
+                raise ValueError("pairwise checks need one geofence per point")
+        else:
+            lats = lats[:, np.newaxis]
+            lngs = lngs[:, np.newaxis]
+
+    distances = haversine_batch(lats, lngs, fence_lats, fence_lngs)
+    return distances <= radii, distances
+
+
+# ----------------------------------------Polygon geofences--------------------------------------------
+
+
+def is_polygon_geofence(geofence) -> bool:
+    return (geofence.fence_type or "").lower() == FENCE_TYPE_POLYGON and bool(
+        geofence.vertices
+    )
+
+
+def pack_vertices(vertices) -> bytes:
+    return np.asarray(vertices, dtype=VERTEX_DTYPE).reshape(-1, 2).tobytes()
+
+
+def unpack_vertices(packed: bytes) -> list[tuple[float, float]]:
+    points = np.frombuffer(packed, dtype=VERTEX_DTYPE).reshape(-1, 2)
+    return [(float(lat), float(lng)) for lat, lng in points]
+
+
+class PolygonShape:
+    """A polygon preprocessed for repeated point-in-polygon checks.
+
+    Edges are kept both as plain tuples, for the scalar check, and as arrays,
+    for batch checks. Latitude/longitude are treated as planar coordinates,
+    which is accurate enough at the size of a lecture hall.
+    """
+
+    __slots__ = (
+        "min_lat",
+        "max_lat",
+        "min_lng",
+        "max_lng",
+        "edges",
+        "lat1",
+        "lat2",
+        "lng1",
+        "inv_slope",
+    )
+
+    def __init__(self, vertices: np.ndarray):
+        lat1 = vertices[:, 0]
+        lng1 = vertices[:, 1]
+        lat2 = np.roll(lat1, -1)
+        lng2 = np.roll(lng1, -1)
+        dlat = lat2 - lat1
+        # Horizontal edges never satisfy the crossing test, so their slope is unused
+        safe_dlat = np.where(dlat == 0, 1.0, dlat)
+        inv_slope = np.where(dlat == 0, 0.0, (lng2 - lng1) / safe_dlat)
+
+        self.min_lat, self.max_lat = float(lat1.min()), float(lat1.max())
+        self.min_lng, self.max_lng = float(lng1.min()), float(lng1.max())
+        self.lat1, self.lat2, self.lng1, self.inv_slope = lat1, lat2, lng1, inv_slope
+        self.edges = tuple(
+            zip(lat1.tolist(), lat2.tolist(), lng1.tolist(), inv_slope.tolist())
+        )
+
+    def contains(self, lat: float, lng: float) -> bool:
+        if not (
+            self.min_lat <= lat <= self.max_lat and self.min_lng <= lng <= self.max_lng
+        ):
+            return False
+
+        inside = False
+        for lat1, lat2, lng1, inv_slope in self.edges:
+            if (lat1 > lat) != (lat2 > lat) and lng < lng1 + (lat - lat1) * inv_slope:
+                inside = not inside
+        return inside
+
+    def contains_many(self, lats, lngs) -> np.ndarray:
+        lats = np.asarray(lats, dtype=np.float64)[:, np.newaxis]
+        lngs = np.asarray(lngs, dtype=np.float64)[:, np.newaxis]
+        crosses = (self.lat1 > lats) != (self.lat2 > lats)
+        left_of_edge = lngs < self.lng1 + (lats - self.lat1) * self.inv_slope
+        return np.count_nonzero(crosses & left_of_edge, axis=1) % 2 == 1
+
+
+@lru_cache(maxsize=1024)
+def get_polygon_shape(packed_vertices: bytes) -> PolygonShape:
+    return PolygonShape(np.frombuffer(packed_vertices, dtype=VERTEX_DTYPE).reshape(-1, 2))
+
+
+def check_user_in_polygon_geofence(user_lat, user_lng, geofence):
+    # Cheap rejection with the stored bounding box before touching the edges
+    if geofence.min_latitude is not None and not (
+        geofence.min_latitude <= user_lat <= geofence.max_latitude
+        and geofence.min_longitude <= user_lng <= geofence.max_longitude
+    ):
+        return False
+    return get_polygon_shape(geofence.vertices).contains(user_lat, user_lng)
+
+
+def check_user_in_geofence(user_lat, user_lng, geofence):
+    if is_polygon_geofence(geofence):
+        return check_user_in_polygon_geofence(user_lat, user_lng, geofence)
+    return check_user_in_circular_geofence(user_lat, user_lng, geofence)
+
+
+def circle_bounding_box(latitude, longitude, radius) -> tuple[float, float, float, float]:
+    """Returns (min_lat, max_lat, min_lng, max_lng) enclosing a circular fence."""
+    dlat = radius / METERS_PER_DEGREE
+    dlng = dlat / max(math.cos(math.radians(latitude)), 1e-6)
+    return latitude - dlat, latitude + dlat, longitude - dlng, longitude + dlng
+
+
+def build_geofence_geometry(fence_type, latitude, longitude, radius, vertices) -> dict:
+    """Preprocesses a fence's shape into the columns stored on `Geofence`.
+
+    Polygons are packed into a blob and get a centroid and bounding radius, so
+    code that only understands circles still sees a sensible enclosing circle.
+    Both shapes get a bounding box for cheap rejection.
+    """
+    if (fence_type or "").lower() == FENCE_TYPE_POLYGON:
+        points = np.asarray(vertices, dtype=np.float64)
+        latitude = float(points[:, 0].mean())
+        longitude = float(points[:, 1].mean())
+        radius = float(
+            haversine_batch(latitude, longitude, points[:, 0], points[:, 1]).max()
+        )
+        packed = pack_vertices(points)
+        min_lat, min_lng = points.min(axis=0).tolist()
+        max_lat, max_lng = points.max(axis=0).tolist()
+    else:
+        packed = None
+        min_lat, max_lat, min_lng, max_lng = circle_bounding_box(
+            latitude, longitude, radius
+        )
+
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius": radius,
+        "vertices": packed,
+        "min_latitude": min_lat,
+        "max_latitude": max_lat,
+        "min_longitude": min_lng,
+        "max_longitude": max_lng,
+    }
 
 
 def generate_alphanumeric_code(length=6):
@@ -0,0 +1,58 @@
+import base64
+from datetime import datetime, timezone
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    """Converts a bound for comparison with stored timestamps, which are naive UTC."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just past the row with this (sort value, id)."""
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        sort_value = datetime.fromisoformat(sort_value)
+        row_id = int(row_id)
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+    return naive_utc(sort_value), row_id
+
+
+def split_page(rows: list, limit: int, cursor_of) -> tuple[list, str | None]:
+    """Trims a `limit + 1` fetch to one page and builds the cursor for the next.
+
+    `cursor_of(row)` returns the (sort value, id) pair of a row.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*cursor_of(page[-1]))
+
+
+def encode_id_cursor(row_id: int) -> str:
+    """Opaque cursor for feeds ordered by id alone."""
+    return base64.urlsafe_b64encode(str(row_id).encode()).decode().rstrip("=")
+
+
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded).decode())
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
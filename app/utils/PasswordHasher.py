@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from .config import get_app_settings
+
+logger = logging.getLogger("uvicorn")
+settings = get_app_settings()
+
+bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Module-level so a process pool can pickle them
+def _hash(password: str) -> str:
+    return bcrypt_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return bcrypt_context.verify(password, hashed_password)
+
+
+def _make_executor(kind: str, workers: int) -> Executor:
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    # bcrypt releases the GIL while hashing, so threads run in parallel too
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop, so a burst of logins cannot stall other
+    requests on the worker.
+
+    At most `max_concurrency` hashes run at once; further calls wait their turn
+    on the event loop, and how long they wait is recorded.
+    """
+
+    def __init__(
+        self,
+        executor: Executor = None,
+        max_concurrency: int = settings.PASSWORD_HASH_WORKERS,
+        slow_wait_seconds: float = settings.PASSWORD_HASH_SLOW_WAIT_SECONDS,
+    ):
+        self.executor = executor or _make_executor(
+            settings.PASSWORD_HASH_EXECUTOR, max_concurrency
+        )
+        self.max_concurrency = max_concurrency
+        self.slow_wait_seconds = slow_wait_seconds
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, password, hashed_password)
+
+    def metrics(self) -> dict:
+        return {
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "mean_wait_seconds": (
+                self.total_wait_seconds / self.completed if self.completed else 0.0
+            ),
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, function, *args):
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - queued_at
+        if waited >= self.slow_wait_seconds:
+            logger.warning(
+                f"Password hash waited {waited:.2f}s for a worker, "
+                f"{self.waiting} still waiting"
+            )
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, function, *args
+            )
+        finally:
+            self.running -= 1
+            self._slots.release()
+            self.completed += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+password_hasher = PasswordHasher()
+
+
+def get_password_hasher() -> PasswordHasher:
+    return password_hasher
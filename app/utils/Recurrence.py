@@ -0,0 +1,30 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def expand_weekly_rule(
+    starts_on: date,
+    days: list[str],
+    start_time: time,
+    duration: timedelta,
+    weeks: int,
+    time_zone: str = "UTC",
+) -> list[tuple[datetime, datetime]]:
+    """Every (start, end) of a weekly rule, in UTC and in chronological order.
+
+    Occurrences fall on the given weekdays within `weeks` weeks from `starts_on`
+    inclusive. The wall-clock `start_time` is kept in `time_zone`, so classes
+    stay at 10:00 local time across a DST change.
+    """
+    zone = ZoneInfo(time_zone)
+    weekdays = {WEEKDAYS.index(day) for day in days}
+    occurrences = []
+    for offset in range(weeks * 7):
+        day = starts_on + timedelta(days=offset)
+        if day.weekday() not in weekdays:
+            continue
+        start = datetime.combine(day, start_time, tzinfo=zone).astimezone(timezone.utc)
+        occurrences.append((start, start + duration))
+    return occurrences
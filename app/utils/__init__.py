@@ -1,5 +1,11 @@
 from .config import get_app_settings, get_email_settings, Settings, EmailSettings
-from .GeofenceUtils import check_user_in_circular_geofence
+from .GeofenceUtils import (
+    check_user_in_circular_geofence,
+    check_user_in_geofence,
+    check_users_in_circular_geofences,
+    haversine_batch,
+    build_geofence_geometry,
+)
 from .constants import (
     PASSWORD_MIN_LENGTH,
     PASSWORD_RESET_TOKEN_EXPIRY_MINUTES,
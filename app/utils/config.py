@@ -15,6 +15,57 @@ class Settings:
     BASE_URL: str = os.getenv("BASE_URL", "")
     COOKIE_DOMAIN: str = os.getenv("COOKIE_DOMAIN", "")
     REDIS_URL: str = os.getenv("REDIS_URL", "")
+    GEOFENCE_CACHE_LOCAL_MAXSIZE: int = int(
+        os.getenv("GEOFENCE_CACHE_LOCAL_MAXSIZE", "1024")
+    )
+    GEOFENCE_CACHE_LOCAL_TTL_SECONDS: float = float(
+        os.getenv("GEOFENCE_CACHE_LOCAL_TTL_SECONDS", "30")
+    )
+    ATTENDANCE_WRITE_BEHIND: bool = (
+        os.getenv("ATTENDANCE_WRITE_BEHIND", "false").lower() == "true"
+    )
+    ATTENDANCE_FLUSH_BATCH_SIZE: int = int(
+        os.getenv("ATTENDANCE_FLUSH_BATCH_SIZE", "500")
+    )
+    ATTENDANCE_FLUSH_BLOCK_MS: int = int(os.getenv("ATTENDANCE_FLUSH_BLOCK_MS", "1000"))
+    STUDENT_RECORDS_CACHE_TTL_SECONDS: int = int(
+        os.getenv("STUDENT_RECORDS_CACHE_TTL_SECONDS", "300")
+    )
+    COURSE_ANALYTICS_CACHE_TTL_SECONDS: int = int(
+        os.getenv("COURSE_ANALYTICS_CACHE_TTL_SECONDS", "86400")
+    )
+    ATTENDANCE_FEED_QUEUE_SIZE: int = int(
+        os.getenv("ATTENDANCE_FEED_QUEUE_SIZE", "100")
+    )
+    ATTENDANCE_FEED_HEARTBEAT_SECONDS: float = float(
+        os.getenv("ATTENDANCE_FEED_HEARTBEAT_SECONDS", "15")
+    )
+    GEOFENCE_SYNC_SETTLE_SECONDS: float = float(
+        os.getenv("GEOFENCE_SYNC_SETTLE_SECONDS", "2")
+    )
+    GEOFENCE_LIFECYCLE_INTERVAL_SECONDS: float = float(
+        os.getenv("GEOFENCE_LIFECYCLE_INTERVAL_SECONDS", "30")
+    )
+    SESSION_CACHE_LOCAL_MAXSIZE: int = int(
+        os.getenv("SESSION_CACHE_LOCAL_MAXSIZE", "10000")
+    )
+    SESSION_CACHE_LOCAL_TTL_SECONDS: float = float(
+        os.getenv("SESSION_CACHE_LOCAL_TTL_SECONDS", "30")
+    )
+    # "thread" or "process"
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(
+        os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    PASSWORD_HASH_SLOW_WAIT_SECONDS: float = float(
+        os.getenv("PASSWORD_HASH_SLOW_WAIT_SECONDS", "1")
+    )
+    SIGNED_SESSION_TOKENS: bool = (
+        os.getenv("SIGNED_SESSION_TOKENS", "false").lower() == "true"
+    )
+    SESSION_REVOCATION_REFRESH_SECONDS: float = float(
+        os.getenv("SESSION_REVOCATION_REFRESH_SECONDS", "5")
+    )
 
 
 @dataclass
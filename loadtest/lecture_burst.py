@@ -0,0 +1,349 @@
+"""Lecture-start burst load test.
+
+Seeds one admin, N students and one or more active geofences, logs everyone in
+through /auth/token and then fires every student's check-in at
+/geofence/record_attendance at once, the way a class does when the lecturer
+says "mark yourselves present". Latency percentiles, throughput and an error
+breakdown are printed per endpoint.
+
+By default the app runs in-process (through httpx's ASGI transport, with its
+lifespan) against a throwaway SQLite file and a local Redis:
+
+    python -m loadtest.lecture_burst --students 500
+
+Point --database-url at a local MySQL to measure the real database, or pass
+--base-url to drive an already running server. Seeding always writes straight to
+--database-url, so it must be the database that server uses.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import httpx
+
+DEFAULT_DATABASE_URL = "sqlite+aiosqlite:///./loadtest.db"
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+LOADTEST_API_KEY = "loadtest-key"
+# Near the University of Ibadan; any location works
+FENCE_ORIGIN = (7.4443, 3.8995)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies_ms: list[float] = []
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.started = math.inf
+        self.finished = 0.0
+
+    def record(self, started: float, finished: float, status, detail=None):
+        self.latencies_ms.append((finished - started) * 1000)
+        self.statuses[status] += 1
+        if status != 200:
+            self.errors[f"{status} {detail}" if detail else str(status)] += 1
+        self.started = min(self.started, started)
+        self.finished = max(self.finished, finished)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.latencies_ms)
+        rank = max(math.ceil(p / 100 * len(ordered)) - 1, 0)
+        return ordered[rank]
+
+    def summary(self) -> dict:
+        count = len(self.latencies_ms)
+        wall = max(self.finished - self.started, 1e-9)
+        return {
+            "requests": count,
+            "ok": self.statuses.get(200, 0),
+            "throughput_rps": round(count / wall, 1),
+            "p50_ms": round(self.percentile(50), 1),
+            "p95_ms": round(self.percentile(95), 1),
+            "p99_ms": round(self.percentile(99), 1),
+            "max_ms": round(max(self.latencies_ms), 1),
+            "errors": dict(self.errors),
+        }
+
+
+async def timed_request(stats, endpoint, client, method, url, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except Exception as e:
+        stats[endpoint].record(started, time.perf_counter(), type(e).__name__)
+        return None
+
+    detail = None
+    if response.status_code != 200:
+        try:
+            detail = response.json().get("detail")
+        except ValueError:
+            detail = response.text[:80]
+    stats[endpoint].record(started, time.perf_counter(), response.status_code, detail)
+    return response
+
+
+async def seed(args, password_hash: str) -> tuple[list[str], list[dict]]:
+    """Creates the users and fences for this run, replacing any earlier run's."""
+    from sqlalchemy import delete, select
+
+    from app.database import Base, sessionmanager
+    from app.models import AttendanceRecord, Geofence, GeofenceAttendanceCount, User
+    from app.redis import AttendeeSetStore, GeofenceCache, get_redis_client
+    from app.utils import build_geofence_geometry
+
+    async with sessionmanager.connect() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    prefix = "LT/"
+    students = [f"{prefix}{i:05d}" for i in range(args.students)]
+    now = datetime.now(ZoneInfo("UTC"))
+    fences = []
+    for i in range(args.fences):
+        latitude = FENCE_ORIGIN[0] + 0.01 * i
+        longitude = FENCE_ORIGIN[1]
+        fences.append(
+            {
+                "fence_code": f"lt{i:04d}",
+                "name": f"LOADTEST {i}",
+                "latitude": latitude,
+                "longitude": longitude,
+                "radius": args.radius,
+            }
+        )
+
+    async with sessionmanager.session() as session:
+        earlier_fence_codes = (
+            await session.scalars(
+                select(Geofence.fence_code).where(
+                    Geofence.creator_matric.like(f"{prefix}%")
+                )
+            )
+        ).all()
+        await session.execute(
+            delete(AttendanceRecord).where(
+                AttendanceRecord.user_matric.like(f"{prefix}%")
+            )
+        )
+        # Counters reference the fences, so they go first
+        await session.execute(
+            delete(GeofenceAttendanceCount).where(
+                GeofenceAttendanceCount.fence_code.in_(
+                    select(Geofence.fence_code).where(
+                        Geofence.creator_matric.like(f"{prefix}%")
+                    )
+                )
+            )
+        )
+        await session.execute(
+            delete(Geofence).where(Geofence.creator_matric.like(f"{prefix}%"))
+        )
+        await session.execute(delete(User).where(User.user_matric.like(f"{prefix}%")))
+
+        admin_matric = f"{prefix}admin"
+        users = [(admin_matric, "admin")] + [(matric, "student") for matric in students]
+        session.add_all(
+            User(
+                user_matric=matric,
+                email=f"{matric.replace('/', '.')}@loadtest.invalid",
+                is_email_verified=True,
+                username=matric,
+                hashed_password=password_hash,
+                role=role,
+            )
+            for matric, role in users
+        )
+        await session.flush()
+        session.add_all(
+            Geofence(
+                fence_code=fence["fence_code"],
+                name=fence["name"],
+                fence_type="circle",
+                start_time=now - timedelta(minutes=5),
+                end_time=now + timedelta(hours=2),
+                status="active",
+                time_created=now,
+                creator_matric=admin_matric,
+                **build_geofence_geometry(
+                    "circle",
+                    fence["latitude"],
+                    fence["longitude"],
+                    fence["radius"],
+                    None,
+                ),
+            )
+            for fence in fences
+        )
+        await session.commit()
+
+    # Fence codes repeat between runs, and an earlier run's attendee sets and
+    # cached snapshots outlive its rows, so they would reject or misjudge this
+    # run's check-ins
+    fence_codes = sorted(
+        set(earlier_fence_codes) | {fence["fence_code"] for fence in fences}
+    )
+    redis_client = get_redis_client()
+    await redis_client.delete(*(AttendeeSetStore.key(code) for code in fence_codes))
+    await GeofenceCache(redis_client).invalidate_many(fence_codes)
+
+    return students, fences
+
+
+def random_point_in(fence: dict, radius_fraction: float = 0.8) -> tuple[float, float]:
+    distance = fence["radius"] * radius_fraction * math.sqrt(random.random())
+    bearing = random.uniform(0, 2 * math.pi)
+    dlat = distance * math.cos(bearing) / 111_195
+    dlng = (
+        distance
+        * math.sin(bearing)
+        / (111_195 * math.cos(math.radians(fence["latitude"])))
+    )
+    return fence["latitude"] + dlat, fence["longitude"] + dlng
+
+
+async def run_burst(args, client: httpx.AsyncClient, students, fences) -> dict:
+    stats = defaultdict(EndpointStats)
+    limiter = asyncio.Semaphore(args.concurrency)
+    headers = {"x-api-key": args.api_key}
+
+    async def login(matric):
+        async with limiter:
+            response = await timed_request(
+                stats,
+                "POST /auth/token",
+                client,
+                "POST",
+                "/auth/token",
+                data={"username": matric, "password": args.password},
+                headers=headers,
+            )
+        if response is not None and response.status_code == 200:
+            return response.json()["session_token"]
+        return None
+
+    tokens = await asyncio.gather(*(login(matric) for matric in students))
+
+    async def check_in(index, token):
+        fence = fences[index % len(fences)]
+        lat, lng = random_point_in(fence)
+        body = {"lat": lat, "long": lng}
+        if not args.codeless:
+            body["fence_code"] = fence["fence_code"]
+        async with limiter:
+            await timed_request(
+                stats,
+                "POST /geofence/record_attendance",
+                client,
+                "POST",
+                "/geofence/record_attendance",
+                json=body,
+                cookies={"session_token": token},
+            )
+
+    await asyncio.gather(
+        *(check_in(i, token) for i, token in enumerate(tokens) if token is not None)
+    )
+    return {
+        endpoint: endpoint_stats.summary() for endpoint, endpoint_stats in stats.items()
+    }
+
+
+def print_report(report: dict):
+    columns = (
+        "requests",
+        "ok",
+        "throughput_rps",
+        "p50_ms",
+        "p95_ms",
+        "p99_ms",
+        "max_ms",
+    )
+    print(f"{'endpoint':<36}" + "".join(f"{column:>15}" for column in columns))
+    for endpoint, summary in report.items():
+        print(f"{endpoint:<36}" + "".join(f"{summary[c]:>15}" for c in columns))
+        for error, count in summary["errors"].items():
+            print(f"{'':<4}{count:>6} x {error}")
+
+
+async def main(args) -> dict:
+    # Settings are read at import time, so configure the app before importing it
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["REDIS_URL"] = args.redis_url
+    if args.base_url is None:
+        os.environ["API_KEYS"] = args.api_key
+
+    from passlib.context import CryptContext
+
+    from app.database import sessionmanager
+
+    password_hash = CryptContext(schemes=["bcrypt"]).hash(args.password)
+    students, fences = await seed(args, password_hash)
+    print(
+        f"Seeded {len(students)} students and {len(fences)} geofences", file=sys.stderr
+    )
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+    if args.base_url is not None:
+        async with httpx.AsyncClient(
+            base_url=args.base_url, limits=limits, timeout=timeout
+        ) as client:
+            report = await run_burst(args, client, students, fences)
+    else:
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://loadtest", timeout=timeout
+            ) as client:
+                report = await run_burst(args, client, students, fences)
+
+    await sessionmanager.close()
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--fences", type=int, default=1)
+    parser.add_argument(
+        "--radius", type=float, default=60.0, help="fence radius in meters"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=500, help="max requests in flight"
+    )
+    parser.add_argument(
+        "--codeless", action="store_true", help="check in by coordinates only"
+    )
+    parser.add_argument(
+        "--database-url", default=os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+    )
+    parser.add_argument(
+        "--redis-url", default=os.getenv("REDIS_URL", DEFAULT_REDIS_URL)
+    )
+    parser.add_argument(
+        "--base-url", help="drive a running server instead of in-process"
+    )
+    parser.add_argument("--api-key", default=LOADTEST_API_KEY)
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    result = asyncio.run(main(arguments))
+    if arguments.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)